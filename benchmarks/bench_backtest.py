@@ -0,0 +1,47 @@
+"""Time a vectorized signal backtest over a long daily history
+
+Run from the repo root:  python -m benchmarks.bench_backtest
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import BACKTEST_MODES, FactorBacktest
+
+
+def make_inputs(n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2010-01-01', periods=n_days)
+    prices = pd.DataFrame({
+        'HYG': 80 * np.cumprod(1 + rng.normal(0, 0.005, n_days)),
+        'LQD': 110 * np.cumprod(1 + rng.normal(0, 0.004, n_days)),
+    }, index=index)
+    return pd.Series(rng.normal(0, 1, n_days), index=index), prices
+
+
+def run(n_days=15 * 252, repeats=20):
+    signal, prices = make_inputs(n_days)
+    results = {'days': n_days}
+    for mode in BACKTEST_MODES:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            FactorBacktest(signal, prices, mode=mode).metrics()
+        results[f'{mode}_s'] = (time.perf_counter() - start) / repeats
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=15 * 252)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    r = run(args.days, args.repeats)
+    for mode in BACKTEST_MODES:
+        print(f"{mode:<15} {r['days']:>7,} days  {r[mode + '_s'] * 1e3:7.2f}ms per run + metrics")
+
+
+if __name__ == '__main__':
+    main()
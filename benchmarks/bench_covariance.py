@@ -0,0 +1,91 @@
+"""Per-tick cost of the streaming EWMA factor covariance against recomputing it
+
+For each tick the dashboard needs the latest covariance, parametric
+portfolio vol and factor contributions. Compares folding one new bar into
+EWMACovariance with recomputing the EWMA covariance from full history in
+pandas, and the cached eigen/Cholesky decomposition with redoing it on
+every tick, for the loader's 9 factors and a wider synthetic factor set.
+
+Run from the repo root:  python -m benchmarks.bench_covariance
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from src.stress_testing import EWMA_DECAY, EWMACovariance, factor_moves
+
+
+def _moves(n_bars, n_factors, seed=0):
+    moves = factor_moves(synthetic.market_data(n_bars + 1, seed=seed))
+    if n_factors <= moves.shape[1]:
+        return moves.iloc[:, :n_factors]
+    # Extra factors as noisy mixes of the real ones, so they stay correlated
+    rng = np.random.default_rng(seed)
+    mix = rng.normal(size=(moves.shape[1], n_factors - moves.shape[1]))
+    extra = moves.to_numpy() @ mix + rng.normal(0, moves.to_numpy().std(), (len(moves), mix.shape[1]))
+    return pd.concat([moves, pd.DataFrame(extra, index=moves.index).add_prefix('f')], axis=1)
+
+
+def _per_tick(fn, ticks):
+    start = time.perf_counter()
+    for bar in ticks:
+        fn(bar)
+    return (time.perf_counter() - start) / len(ticks) * 1e6
+
+
+def run(n_bars=4000, n_ticks=250, factor_counts=(9, 100)):
+    rows = []
+    for k in factor_counts:
+        moves = _moves(n_bars + n_ticks, k)
+        history, ticks = moves.iloc[:n_bars], moves.iloc[n_bars:].to_numpy()
+        exposures = pd.Series(1e6, index=moves.columns)
+
+        start = time.perf_counter()
+        engine = EWMACovariance.from_moves(history)
+        prime_s = time.perf_counter() - start
+
+        def streaming(bar):
+            engine.update(bar)
+            engine.portfolio_vol(exposures)
+            engine.factor_contributions(exposures)
+
+        grown = [history]
+
+        def recompute(bar):
+            grown.append(pd.DataFrame([bar], columns=moves.columns))
+            data = pd.concat(grown, ignore_index=True)
+            cov = data.ewm(alpha=1 - EWMA_DECAY, adjust=False).cov(bias=True).iloc[-k:].to_numpy()
+            w = exposures.to_numpy()
+            marginal = cov @ w
+            return w * marginal / np.sqrt(w @ marginal)
+
+        stream_us = _per_tick(streaming, ticks)
+        # Full recompute is slow; time a slice of the ticks
+        recompute_us = _per_tick(recompute, ticks[:max(5, n_ticks // 25)])
+
+        cached = EWMACovariance.from_moves(history)
+        always = EWMACovariance.from_moves(history, tolerance=0)
+        cached_us = _per_tick(lambda bar: cached.update(bar).principal_contributions(exposures), ticks)
+        always_us = _per_tick(lambda bar: always.update(bar).principal_contributions(exposures), ticks)
+
+        rows.append({
+            'factors': k, 'prime_s': prime_s, 'tick_stream_us': stream_us, 'tick_recompute_us': recompute_us,
+            'pca_cached_us': cached_us, 'pca_always_us': always_us,
+            'decompositions': f'{cached.decompositions}/{always.decompositions}',
+        })
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bars', type=int, default=4000)
+    parser.add_argument('--ticks', type=int, default=250)
+    args = parser.parse_args()
+    print(run(args.bars, args.ticks).to_string(index=False, float_format='{:,.3f}'.format))
+
+
+if __name__ == '__main__':
+    main()
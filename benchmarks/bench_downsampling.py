@@ -0,0 +1,69 @@
+"""Chart payload size and build/serialise time with and without downsampling
+
+Browser render time scales with the number of points in the figure JSON, so
+payload bytes and server-side build + serialise time are reported as its
+proxy.
+
+Run from the repo root:  python -m benchmarks.bench_downsampling
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from src.visualization import DEFAULT_WIDTH, Downsampler, downsample
+
+
+def make_series(n_points, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2010-01-01', periods=n_points, freq='min')
+    return pd.DataFrame({'signal': rng.normal(0, 1, n_points).cumsum()}, index=index)
+
+
+def _figure_payload(frame):
+    start = time.perf_counter()
+    payload = px.line(frame, x=frame.index, y='signal').to_json()
+    return len(payload), time.perf_counter() - start
+
+
+def run(n_points=1_000_000, width=DEFAULT_WIDTH):
+    frame = make_series(n_points)
+    results = {'points': n_points}
+    results['full_bytes'], results['full_s'] = _figure_payload(frame)
+
+    for method in ['minmax', 'lttb']:
+        start = time.perf_counter()
+        reduced = downsample(frame, ['signal'], width, method)
+        downsample_s = time.perf_counter() - start
+        size, build_s = _figure_payload(reduced)
+        results[f'{method}_points'] = len(reduced)
+        results[f'{method}_bytes'] = size
+        results[f'{method}_s'] = downsample_s + build_s
+
+    # Repeated zoom range hits the per-range cache
+    sampler = Downsampler(frame)
+    sampler.view(frame.index[0], frame.index[n_points // 2], width)
+    start = time.perf_counter()
+    sampler.view(frame.index[0], frame.index[n_points // 2], width)
+    results['cached_view_s'] = time.perf_counter() - start
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=1_000_000)
+    parser.add_argument('--width', type=int, default=DEFAULT_WIDTH)
+    args = parser.parse_args()
+
+    r = run(args.points, args.width)
+    print(f"full:   {r['points']:>9,} pts  {r['full_bytes'] / 1e6:8.2f} MB  {r['full_s']:.3f}s")
+    for method in ['minmax', 'lttb']:
+        print(f"{method:<6}: {r[method + '_points']:>9,} pts  {r[method + '_bytes'] / 1e6:8.2f} MB  "
+              f"{r[method + '_s']:.3f}s")
+    print(f"cached zoom view: {r['cached_view_s'] * 1e6:.0f}us")
+
+
+if __name__ == '__main__':
+    main()
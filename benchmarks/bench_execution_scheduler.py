@@ -0,0 +1,44 @@
+"""Throughput of ExecutionScheduler with many concurrent simulated orders
+
+Run from the repo root:  python -m benchmarks.bench_execution_scheduler
+"""
+import argparse
+import asyncio
+import time
+
+from src.execution_engine import ExecutionScheduler
+
+
+def run(n_orders=1000, quantity=10000, interval=0.0, seed=0):
+    scheduler = ExecutionScheduler(interval=interval, seed=seed)
+    for i in range(n_orders):
+        scheduler.submit(f'SYM{i % 50}', quantity)
+
+    start = time.perf_counter()
+    fills = asyncio.run(scheduler.run())
+    elapsed = time.perf_counter() - start
+
+    return {
+        'orders': n_orders,
+        'fills': len(fills),
+        'seconds': elapsed,
+        'orders_per_sec': n_orders / elapsed,
+        'fills_per_sec': len(fills) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=1000)
+    parser.add_argument('--quantity', type=int, default=10000)
+    parser.add_argument('--interval', type=float, default=0.0,
+                        help='per-slice pause in seconds (0 = simulated pacing)')
+    args = parser.parse_args()
+
+    result = run(args.orders, args.quantity, args.interval)
+    print(f"{result['orders']:,} orders, {result['fills']:,} fills in {result['seconds']:.3f}s")
+    print(f"{result['orders_per_sec']:,.0f} orders/s, {result['fills_per_sec']:,.0f} fills/s")
+
+
+if __name__ == '__main__':
+    main()
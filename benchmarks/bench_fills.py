@@ -0,0 +1,99 @@
+"""Fill storage: dict-per-fill list against FillStore, and FillLog replay into attribution
+
+Compares appending fills one at a time (list of dicts then DataFrame, the
+old live TWAP path) with FillStore.append, compares the memory of a
+broadcast fills frame with the record array, and times writing a large
+log and replaying it chunk by chunk into PnLAttributor.
+
+Run from the repo root:  python -m benchmarks.bench_fills
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks import synthetic
+from src.execution_engine import FILL_COLUMNS
+from src.fills import FillLog, FillStore
+
+CONSTANTS = {'beta': 0.8, 'duration': 7.0, 'credit_duration': 3.8, 'vega': 25000.0}
+
+
+def make_fills(n, seed=0, dates=None):
+    return synthetic.fills(n, seed, dates=dates)[FILL_COLUMNS]
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def run(n_append=100_000, n_log=10_000_000, chunk=1_000_000):
+    factors = synthetic.market_data(2520)
+    fills = make_fills(n_append, dates=factors.index)
+    records = fills.to_dict('records')
+
+    def dict_list():
+        rows = []
+        for r in records:
+            rows.append(dict(r))
+        frame = pd.DataFrame(rows)
+        return frame.assign(**CONSTANTS)
+
+    def fill_store():
+        store = FillStore()
+        for r in records:
+            store.append(r)
+        return store
+
+    dict_s, frame = _timed(dict_list)
+    store_s, store = _timed(fill_store)
+    frame_mb = frame.memory_usage(deep=True).sum() / 1e6
+
+    results = [
+        {'case': f'append {n_append:,} fills', 'dicts_s': dict_s, 'store_s': store_s},
+        {'case': f'memory {n_append:,} fills (MB)', 'dicts_s': frame_mb, 'store_s': store.nbytes / 1e6},
+    ]
+
+    with tempfile.TemporaryDirectory() as root:
+        log = FillLog(os.path.join(root, 'fills.bin'))
+        start = time.perf_counter()
+        step = 1_000_000
+        for i in range(0, n_log, step):
+            part = FillStore.from_frame(make_fills(min(step, n_log - i), seed=i, dates=factors.index)
+                                        .assign(order_id=lambda f, i=i: f['order_id'] + i // 20),
+                                        attributes=CONSTANTS)
+            log.append(part)
+        write_s = time.perf_counter() - start
+
+        replay_s, totals = _timed(lambda: FillLog(log.path).attribute(factors, chunk_size=chunk))
+        # Traced separately (tracing slows replay); heap allocations only, as
+        # memory-mapped pages are file cache rather than owned memory
+        tracemalloc.start()
+        FillLog(log.path).attribute(factors, chunk_size=chunk)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        results += [
+            {'case': f'log write {n_log:,} fills (s)', 'dicts_s': None, 'store_s': write_s},
+            {'case': f'log replay+attribute (s)', 'dicts_s': None, 'store_s': replay_s},
+            {'case': 'log file size (MB)', 'dicts_s': None, 'store_s': os.path.getsize(log.path) / 1e6},
+            {'case': 'replay peak allocation (MB)', 'dicts_s': None, 'store_s': peak_mb},
+        ]
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--append', type=int, default=100_000)
+    parser.add_argument('--log', type=int, default=10_000_000)
+    parser.add_argument('--chunk', type=int, default=1_000_000)
+    args = parser.parse_args()
+    print(run(args.append, args.log, args.chunk).to_string(index=False, float_format='{:.3f}'.format))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Per-call overhead of the instrumentation decorator, off and on
+
+Run from the repo root:  python -m benchmarks.bench_instrumentation
+"""
+import argparse
+import time
+
+from src.instrumentation import Tracer, instrument, use_tracer
+
+
+def _plain(x):
+    return x
+
+
+_traced = instrument('bench')(_plain)
+
+
+def _per_call(func, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - start) / calls
+
+
+def run(calls=200_000):
+    tracer = Tracer()
+    with use_tracer(tracer):
+        results = {'plain_ns': _per_call(_plain, calls) * 1e9, 'disabled_ns': _per_call(_traced, calls) * 1e9}
+        tracer.enable()
+        results['enabled_ns'] = _per_call(_traced, calls // 10) * 1e9
+        tracer.clear().enable(memory=True)
+        results['memory_ns'] = _per_call(_traced, calls // 10) * 1e9
+        tracer.disable()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200_000)
+    args = parser.parse_args()
+
+    r = run(args.calls)
+    print(f"plain call:          {r['plain_ns']:8.0f}ns")
+    print(f"instrumented, off:   {r['disabled_ns']:8.0f}ns  (+{r['disabled_ns'] - r['plain_ns']:.0f}ns)")
+    print(f"instrumented, on:    {r['enabled_ns']:8.0f}ns")
+    print(f"on with memory:      {r['memory_ns']:8.0f}ns")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Walk-forward signal sweep: grid throughput and scaling across worker counts
+
+Run from the repo root:  python -m benchmarks.bench_optimizer
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.optimizer import SignalSweep
+
+
+def make_raw_data(n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2005-01-01', periods=n_days)
+    cols = ['SPY', 'TLT', 'HYG', 'LQD', '10y_yield', '2y_yield', 'baa_10y', 'aaa_10y', 'vix']
+    steps = rng.normal(0, 0.02, (n_days, len(cols)))
+    return pd.DataFrame(5 + np.abs(steps.cumsum(axis=0)), index=index, columns=cols)
+
+
+def run(n_days=20 * 252, n_windows=12, n_weights=11, n_caps=4, n_folds=5, worker_counts=None):
+    sweep = SignalSweep(
+        make_raw_data(n_days),
+        windows=np.linspace(21, 252, n_windows).astype(int),
+        weights=[(w, 1 - w) for w in np.linspace(0, 1, n_weights)],
+        caps=np.linspace(1, 3, n_caps),
+        n_folds=n_folds,
+    )
+    curve = sweep.scaling_curve(worker_counts)
+    combos = n_windows * n_weights * n_caps
+    return {'combos': combos, 'folds': n_folds, 'curve': curve, 'best': sweep.best_params()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=20 * 252)
+    parser.add_argument('--workers', type=int, nargs='*', default=None)
+    args = parser.parse_args()
+
+    r = run(args.days, worker_counts=args.workers)
+    print(f"{r['combos']} parameter sets x {r['folds']} folds")
+    print(r['curve'].to_string(float_format='{:.3f}'.format))
+    print(r['best'].to_string(float_format='{:.3f}'.format))
+
+
+if __name__ == '__main__':
+    main()
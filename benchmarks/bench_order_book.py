@@ -0,0 +1,92 @@
+"""Event throughput and TWAP market impact on the limit order book simulator
+
+Replays a synthetic quote stream through MarketSimulator three ways: a TWAP
+that only takes liquidity on a liquid-name stream of 5,000 events a second
+(the replay skips ahead between slices), a
+passive agent that always keeps a bid and an ask resting at the touch (every
+quote and trade is applied to the book), and TWAPs of growing size to show
+the implementation shortfall the book produces.
+
+Run from the repo root:  python -m benchmarks.bench_order_book
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.execution_engine import AdaptiveTWAP
+from src.order_book import BUY, SELL, TICK, MarketSimulator, QuoteStream
+
+
+def _throughput(market, drive):
+    start = time.perf_counter()
+    drive(market)
+    elapsed = time.perf_counter() - start
+    return {'events': market.events, 'seconds': elapsed, 'events_per_sec': market.events / elapsed}
+
+
+def _twap(market):
+    # Unbounded size, slicing until the stream runs out
+    minutes = (market.stream.quote_time[-1] - market.now) / 60e9
+    AdaptiveTWAP('LQD', 10**12, duration_min=minutes, market=market).execute()
+
+
+def _passive(market, size=200):
+    end = int(market.stream.quote_time[-1])
+
+    def quote(side):
+        touch = market.book.best(side)
+        if touch is not None:
+            market.submit(side, size, limit=touch * TICK, on_fill=requote)
+
+    def requote(fill):
+        # Join the touch again once an order is completely filled
+        if fill['order_id'] not in market.book.orders:
+            quote(fill['side'])
+
+    market.schedule(market.now, quote, BUY)
+    market.schedule(market.now, quote, SELL)
+
+    market.run(until=end)
+
+
+def shortfall(quantity, seeds=range(5), n_events=200_000):
+    """Mean buy VWAP against the arrival mid, in bps, across seeds"""
+    bps = []
+    for seed in seeds:
+        market = MarketSimulator(QuoteStream.synthetic(n_events, seed=seed))
+        arrival = market.mid
+        fills = AdaptiveTWAP('LQD', quantity, market=market).execute()
+        vwap = np.average(fills['price'], weights=fills['shares'])
+        bps.append((vwap / arrival - 1) * 1e4)
+    return float(np.mean(bps)), int(fills['shares'].sum())
+
+
+def run(n_events=5_000_000, n_passive=500_000, quantities=(10_000, 100_000, 1_000_000)):
+    rows = [
+        {'case': f'TWAP replay, {n_events:,} events',
+         **_throughput(MarketSimulator(QuoteStream.synthetic(n_events, seed=0, event_rate=5000)), _twap)},
+        {'case': f'passive quotes, {n_passive:,} events',
+         **_throughput(MarketSimulator(QuoteStream.synthetic(n_passive, seed=0)), _passive)},
+    ]
+    impact = []
+    for quantity in quantities:
+        bps, filled = shortfall(quantity)
+        impact.append({'quantity': quantity, 'filled (last seed)': filled, 'shortfall_bps': bps})
+    return pd.DataFrame(rows), pd.DataFrame(impact)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=5_000_000)
+    parser.add_argument('--passive', type=int, default=500_000)
+    args = parser.parse_args()
+    throughput, impact = run(args.events, args.passive)
+    print(throughput.to_string(index=False, float_format='{:,.3f}'.format))
+    print()
+    print(impact.to_string(index=False, float_format='{:,.2f}'.format))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""End-of-day reports for many books: cold build, full cache hit, and one changed section
+
+Every book shares the market signal chart; PnL, risk and stress sections
+are per book. The "pnl changed" pass regenerates each book's PnL while
+risk, stress and signals come from the artifact cache. Peak RSS is the
+parent process's high-water mark and stays flat as the book count grows,
+since books are generated lazily and built in memory-budgeted batches.
+
+Run from the repo root:  python -m benchmarks.bench_reports
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from src.data_loader import InstitutionalDataLoader
+from src.report_generator import ReportBuilder, risk_limit_frame
+from src.risk_system import BarclaysRiskSystem
+from src.stress_testing import CrisisSimulator
+
+PNL_FACTORS = ['rates', 'credit', 'volatility', 'equity']
+
+
+def make_books(n_books, n_days=2520, pnl_seed=0):
+    """Lazily yield books; ``pnl_seed`` changes only the PnL sections"""
+    loader = InstitutionalDataLoader(cache_dir=None)
+    loader.raw_data = synthetic.market_data(n_days)
+    processed = loader.process_signals().processed_data
+    risk = BarclaysRiskSystem()
+    for i in range(n_books):
+        rng = np.random.default_rng((pnl_seed, i))
+        book = synthetic.portfolio(50, seed=i)
+        positions = {'notional': book['notional'].abs().sum(), 'duration': book['duration'].mean(),
+                     'spread_duration': book['spread_duration'].mean()}
+        yield {
+            'name': f'book-{i:04d}',
+            'processed_data': processed,
+            'pnl_breakdown': pd.DataFrame(rng.normal(0, 1e3, (len(processed), len(PNL_FACTORS))),
+                                          index=processed.index, columns=PNL_FACTORS),
+            'risk_limits': risk_limit_frame(risk.calculate_exposures(positions), risk.limits),
+            'stress_results': CrisisSimulator(book).run_scenarios(),
+        }
+
+
+def run(n_books=100, workers=None, memory_mb=64):
+    rows = []
+    with tempfile.TemporaryDirectory() as root:
+        builder = ReportBuilder(os.path.join(root, 'reports'), os.path.join(root, 'cache'),
+                                workers=workers, memory_mb=memory_mb)
+        for label, seed in [('cold', 0), ('all cached', 0), ('pnl changed', 1)]:
+            start = time.perf_counter()
+            report = builder.build_many(make_books(n_books, pnl_seed=seed))
+            rows.append({
+                'pass': label,
+                'seconds': time.perf_counter() - start,
+                'books_per_s': n_books / (time.perf_counter() - start),
+                'rendered': int(report['rendered'].sum()),
+                'cached': int(report['cached'].sum()),
+                'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3,
+            })
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--books', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--memory-mb', type=float, default=64)
+    args = parser.parse_args()
+    print(run(args.books, args.workers, args.memory_mb).to_string(index=False, float_format='{:.2f}'.format))
+
+
+if __name__ == '__main__':
+    main()
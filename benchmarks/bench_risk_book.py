@@ -0,0 +1,90 @@
+"""Latency of RiskBook.would_breach pre-trade checks against a large book
+
+Also times one full check_book_limits rescan and exits non-zero when it takes
+longer than the budget (1s for 300k positions by default).
+
+Run from the repo root:  python -m benchmarks.bench_risk_book
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.risk_system import BarclaysRiskSystem, RiskBook
+
+# Wall-clock budget for a full check_book_limits rescan
+RESCAN_BUDGET_S = 1.0
+RESCAN_POSITIONS = 300_000
+
+
+def make_book(n_positions, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'desk': rng.choice(['Credit', 'Rates', 'Macro', 'EM'], n_positions),
+        'book': rng.choice([f'B{i:03d}' for i in range(200)], n_positions),
+        'notional': rng.normal(0, 1e6, n_positions),
+        'duration': rng.uniform(0, 10, n_positions),
+        'spread_duration': rng.uniform(0, 8, n_positions),
+    })
+
+
+def run(n_positions=100_000, n_checks=20_000, seed=0, rescan_positions=RESCAN_POSITIONS):
+    book = make_book(n_positions, seed)
+    risk = BarclaysRiskSystem(hierarchy=['desk', 'book'])
+    for desk in book['desk'].unique():
+        risk.set_limit('desk', desk, 'DV01', 5e5)
+    for name in book['book'].unique():
+        risk.set_limit('book', name, 'CS01', 5e4)
+
+    risk_book = RiskBook(risk).load(book)
+
+    rng = np.random.default_rng(seed + 1)
+    ids = rng.integers(0, n_positions, n_checks)
+    sizes = rng.normal(0, 1e5, n_checks)
+
+    latencies = np.empty(n_checks)
+    for i in range(n_checks):
+        order = {'position': int(ids[i]), 'notional': float(sizes[i])}
+        start = time.perf_counter_ns()
+        risk_book.would_breach(order)
+        latencies[i] = time.perf_counter_ns() - start
+
+    rescan_book = make_book(rescan_positions, seed)
+    risk.check_book_limits(rescan_book)  # warm-up
+    start = time.perf_counter()
+    risk.check_book_limits(rescan_book)
+    rescan = time.perf_counter() - start
+
+    return {
+        'positions': n_positions,
+        'checks': n_checks,
+        'p50_us': np.percentile(latencies, 50) / 1e3,
+        'p99_us': np.percentile(latencies, 99) / 1e3,
+        'rescan_positions': rescan_positions,
+        'full_rescan_ms': rescan * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--positions', type=int, default=100_000)
+    parser.add_argument('--checks', type=int, default=20_000)
+    parser.add_argument('--rescan-positions', type=int, default=RESCAN_POSITIONS)
+    parser.add_argument('--rescan-budget', type=float, default=RESCAN_BUDGET_S, help="seconds")
+    args = parser.parse_args()
+
+    result = run(args.positions, args.checks, rescan_positions=args.rescan_positions)
+    print(f"{result['positions']:,} positions, {result['checks']:,} would_breach checks")
+    print(f"p50 {result['p50_us']:.1f}us  p99 {result['p99_us']:.1f}us")
+    print(f"full check_book_limits rescan of {result['rescan_positions']:,} positions: "
+          f"{result['full_rescan_ms']:.1f}ms")
+    if result['full_rescan_ms'] > args.rescan_budget * 1e3:
+        print(f"rescan over the {args.rescan_budget:.2f}s budget")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
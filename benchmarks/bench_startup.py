@@ -0,0 +1,87 @@
+"""Cold-start cost of the headless pipeline, per stage
+
+Each measurement is a fresh interpreter running
+``main.py --offline --stages <stage>`` under ``-X importtime`` in a scratch
+directory seeded with synthetic fixtures. The stage cache is wiped between
+runs, so every stage really runs. Reports wall time, time spent importing,
+and the heaviest top-level imports. ``import`` is ``import main`` alone.
+
+Run from the repo root:  python -m benchmarks.bench_startup
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks import synthetic
+from src.data_loader import InstitutionalDataLoader
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STAGES = ['import', 'risk', 'stress', 'execute', 'backtest', 'attribution', 'all']
+
+
+def make_fixtures(directory, start='2015-01-01'):
+    """Synthetic raw data from ``start`` to today, recorded as offline fixtures"""
+    rows = len(pd.bdate_range(start, pd.Timestamp.today()))
+    loader = InstitutionalDataLoader(cache_dir=None)
+    loader.raw_data = synthetic.market_data(rows, start=start)
+    loader.record_fixtures(os.path.join(directory, 'data', 'fixtures'))
+
+
+def parse_importtime(stderr):
+    """Top-level imports and their cumulative seconds from ``-X importtime`` output"""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if len(name) - len(name.lstrip()) == 1:
+            imports[name.strip()] = imports.get(name.strip(), 0) + int(cumulative) / 1e6
+    return pd.Series(imports, dtype=float).sort_values(ascending=False)
+
+
+def command(stage):
+    if stage == 'import':
+        return [sys.executable, '-X', 'importtime', '-c', 'import main']
+    cmd = [sys.executable, '-X', 'importtime', os.path.join(ROOT, 'main.py'), '--offline']
+    return cmd if stage == 'all' else cmd + ['--stages', stage]
+
+
+def measure(stage, directory, repeats=3):
+    best = None
+    for _ in range(repeats):
+        for state in ('cache', 'store'):
+            shutil.rmtree(os.path.join(directory, 'data', state), ignore_errors=True)
+        start = time.perf_counter()
+        proc = subprocess.run(command(stage), cwd=directory, capture_output=True, text=True,
+                              env=dict(os.environ, PYTHONPATH=ROOT), check=True)
+        wall = time.perf_counter() - start
+        if best is None or wall < best[0]:
+            best = (wall, parse_importtime(proc.stderr))
+    wall, imports = best
+    heaviest = ', '.join(f'{name} {sec * 1e3:.0f}ms' for name, sec in imports.head(3).items())
+    return {'stage': stage, 'wall_s': wall, 'import_s': imports.sum(), 'heaviest': heaviest}
+
+
+def run(stages=STAGES, repeats=3):
+    with tempfile.TemporaryDirectory() as directory:
+        make_fixtures(directory)
+        return pd.DataFrame([measure(stage, directory, repeats) for stage in stages])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stages', nargs='*', default=STAGES)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    print(run(args.stages, args.repeats).to_string(index=False, float_format='{:.3f}'.format))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Point-in-time store: one-month / one-column reads against full-history reads
+
+Run from the repo root:  python -m benchmarks.bench_store
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.store import SignalStore
+
+
+def make_signals(n_days, n_columns, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2005-01-01', periods=n_days).astype('datetime64[ns]')
+    return pd.DataFrame(rng.normal(0, 1, (n_days, n_columns)), index=index,
+                        columns=[f'feature_{i}' for i in range(n_columns)])
+
+
+def _timed(fn, repeats=5):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        out = fn()
+    return (time.perf_counter() - start) / repeats, out
+
+
+def run(n_days=20 * 252, n_columns=20):
+    frame = make_signals(n_days, n_columns)
+    with tempfile.TemporaryDirectory() as root:
+        store = SignalStore(root)
+        start = time.perf_counter()
+        store.append('processed', frame)
+        write_s = time.perf_counter() - start
+
+        month = frame.index[len(frame) // 2].strftime('%Y-%m')
+        lo, hi = pd.Timestamp(month + '-01'), pd.Timestamp(month + '-01') + pd.offsets.MonthEnd(0)
+        full_s, full = _timed(lambda: store.read('processed'))
+        month_s, sliced = _timed(lambda: store.read('processed', columns=['feature_0'], start=lo, end=hi))
+        files = len(store._parts('processed', lo, hi))
+    return {'rows': n_days, 'columns': n_columns, 'write_s': write_s, 'full_s': full_s,
+            'full_rows': len(full), 'month_s': month_s, 'month_rows': len(sliced), 'month_files': files}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=20 * 252)
+    parser.add_argument('--columns', type=int, default=20)
+    args = parser.parse_args()
+
+    r = run(args.days, args.columns)
+    print(f"write {r['rows']:,} rows x {r['columns']} cols: {r['write_s']:.3f}s")
+    print(f"full history read:       {r['full_rows']:>6,} rows  {r['full_s'] * 1e3:7.1f}ms")
+    print(f"one month, one column:   {r['month_rows']:>6,} rows  {r['month_s'] * 1e3:7.1f}ms "
+          f"({r['month_files']} part file)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""ScenarioEngine vs the per-scenario CrisisSimulator loop
+
+Run from the repo root:  python -m benchmarks.bench_stress_testing
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.stress_testing import CrisisSimulator, ScenarioEngine
+
+
+def make_portfolio(n_positions, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'symbol': rng.choice([f'SYM{i}' for i in range(500)], n_positions),
+        'shares': rng.integers(100, 10000, n_positions),
+        'price': rng.uniform(20, 500, n_positions),
+        'spread': rng.uniform(0.005, 0.03, n_positions),
+        'liquidity_factor': rng.uniform(0.8, 1.0, n_positions),
+    })
+
+
+def make_scenarios(n_scenarios, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        f'S{i}': {
+            'equity_shock': rng.uniform(-0.5, 0.1),
+            'credit_spread_widen': rng.uniform(0, 0.5),
+        }
+        for i in range(n_scenarios)
+    }
+
+
+def run(n_positions=50_000, n_scenarios=1000, seed=0):
+    portfolio = make_portfolio(n_positions, seed)
+    scenarios = make_scenarios(n_scenarios, seed)
+
+    simulator = CrisisSimulator(portfolio)
+    simulator.SCENARIOS = scenarios
+    start = time.perf_counter()
+    legacy = simulator.run_scenarios()
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine = ScenarioEngine(portfolio)
+    totals = engine.run(scenarios)
+    engine_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine.run_grid(scenarios, by='symbol')
+    grid_s = time.perf_counter() - start
+
+    np.testing.assert_allclose(totals['Equity'], legacy['PnL Impact'], rtol=1e-9)
+    return {
+        'positions': n_positions,
+        'scenarios': n_scenarios,
+        'loop_s': legacy_s,
+        'matrix_s': engine_s,
+        'grid_s': grid_s,
+        'speedup': legacy_s / engine_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--positions', type=int, default=50_000)
+    parser.add_argument('--scenarios', type=int, default=1000)
+    args = parser.parse_args()
+
+    result = run(args.positions, args.scenarios)
+    print(f"{result['positions']:,} positions x {result['scenarios']:,} scenarios")
+    print(f"CrisisSimulator loop: {result['loop_s']:.3f}s")
+    print(f"ScenarioEngine.run:   {result['matrix_s'] * 1e3:.1f}ms ({result['speedup']:,.0f}x)")
+    print(f"ScenarioEngine.run_grid by symbol: {result['grid_s'] * 1e3:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Feature time and memory for the universe signal stage as the universe grows
+
+Run from the repo root:  python -m benchmarks.bench_universe
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.universe import PricePanel, UniverseSignals
+
+
+def make_panel(n_dates, n_instruments, seed=0):
+    rng = np.random.default_rng(seed)
+    values = 100 * np.cumprod(1 + rng.normal(0, 0.01, (n_dates, n_instruments)), axis=0)
+    symbols = [f'S{i:05d}' for i in range(n_instruments)]
+    return PricePanel(values, pd.bdate_range('2010-01-01', periods=n_dates), symbols)
+
+
+def run(n_dates=15 * 252, sizes=(100, 500, 1000, 2000), workers=1):
+    rows = []
+    for n in sizes:
+        panel = make_panel(n_dates, n)
+        start = time.perf_counter()
+        signals = UniverseSignals(panel).compute(workers=workers)
+        elapsed = time.perf_counter() - start
+        feature_mb = sum(a.nbytes for a in signals.features.values()) / 1e6
+        rows.append({'instruments': n, 'seconds': elapsed, 'panel_mb': panel.values.nbytes / 1e6,
+                     'feature_mb': feature_mb, 'us_per_instrument': elapsed / n * 1e6})
+    return pd.DataFrame(rows).set_index('instruments')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=15 * 252)
+    parser.add_argument('--sizes', type=int, nargs='*', default=[100, 500, 1000, 2000])
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+    print(run(args.days, args.sizes, args.workers).to_string(float_format='{:.2f}'.format))
+
+
+if __name__ == '__main__':
+    main()
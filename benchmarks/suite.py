@@ -0,0 +1,192 @@
+"""Benchmark suite over the pipeline stages on synthetic data, with baselines
+
+Times each stage on seeded synthetic inputs at every requested row count,
+saves the results as JSON, and optionally compares them with an earlier
+run. Input generation and one warm-up call per size are not timed.
+
+Run from the repo root:
+    python -m benchmarks.suite --sizes 1e3 1e4 1e5 --save benchmarks/results/baseline.json
+    python -m benchmarks.suite --sizes 1e3 1e4 1e5 --baseline benchmarks/results/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from src.data_loader import InstitutionalDataLoader
+from src.execution_engine import SLICE_INTERVAL, SLICE_SIZE, AdaptiveTWAP, simulate_twap_batch
+from src.pnl_attribution import PnLAttributor
+from src.risk_system import BarclaysRiskSystem
+from src.stress_testing import CrisisSimulator, ScenarioEngine
+
+RESULTS_DIR = os.path.join('benchmarks', 'results')
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# A case slower than baseline by more than this fraction is a regression
+DEFAULT_TOLERANCE = 0.25
+
+
+def _signals(n, seed):
+    loader = InstitutionalDataLoader(cache_dir=None)
+    raw = synthetic.market_data(n, seed)
+
+    def run():
+        loader.raw_data = raw
+        loader.process_signals()
+    return run
+
+
+def _twap(n, seed):
+    # One parent order long enough to produce n slices
+    minutes = n * SLICE_INTERVAL.total_seconds() / 60 + 1
+    algo = AdaptiveTWAP('LQD', n * SLICE_SIZE, duration_min=minutes, seed=seed)
+    return algo.execute
+
+
+def _twap_batch(n, seed):
+    orders = [('LQD', 20 * SLICE_SIZE, 5)] * max(n // 20, 1)
+    return lambda: simulate_twap_batch(orders, start='2024-01-02 14:30', seed=seed)
+
+
+def _attribution(n, seed):
+    factors = synthetic.market_data(2520, seed)
+    trades = synthetic.fills(n, seed, dates=factors.index)
+    return lambda: PnLAttributor(trades, factors).attribute()
+
+
+def _risk(n, seed):
+    book = synthetic.portfolio(n, seed)
+    risk = BarclaysRiskSystem(hierarchy=['desk', 'book'])
+    for desk in synthetic.DESKS:
+        risk.set_limit('desk', desk, 'DV01', 5e5)
+    return lambda: risk.check_book_limits(book)
+
+
+def _stress(n, seed):
+    book = synthetic.portfolio(n, seed)
+    return lambda: CrisisSimulator(book).run_scenarios()
+
+
+def _scenario_engine(n, seed):
+    book = synthetic.portfolio(n, seed)
+    return lambda: ScenarioEngine(book).run()
+
+
+# name: (setup(n, seed) -> timed callable, largest size run by default)
+CASES = {
+    'signals': (_signals, 1_000_000),
+    'twap': (_twap, 10_000_000),
+    'twap_batch': (_twap_batch, 10_000_000),
+    'attribution': (_attribution, 10_000_000),
+    'risk_limits': (_risk, 10_000_000),
+    'stress': (_stress, 10_000_000),
+    'scenario_engine': (_scenario_engine, 10_000_000),
+}
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    return {
+        'timestamp': pd.Timestamp.now('UTC').isoformat(),
+        'commit': _git_commit(),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def run(cases=None, sizes=DEFAULT_SIZES, repeats=3, seed=0, force=False):
+    rows = []
+    for name in cases or CASES:
+        setup, max_rows = CASES[name]
+        for n in sizes:
+            if n > max_rows and not force:
+                continue
+            fn = setup(n, seed)
+            fn()  # warm-up: imports, allocator and caches
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                fn()
+                timings.append(time.perf_counter() - start)
+            best = min(timings)
+            rows.append({'case': name, 'rows': n, 'best_s': best, 'median_s': statistics.median(timings),
+                         'rows_per_s': n / best if best > 0 else np.nan})
+    return pd.DataFrame(rows, columns=['case', 'rows', 'best_s', 'median_s', 'rows_per_s'])
+
+
+def save(results, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    payload = {'environment': environment(), 'results': results.to_dict(orient='records')}
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=1)
+    return path
+
+
+def load(path):
+    with open(path) as f:
+        return pd.DataFrame(json.load(f)['results'])
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Best times against a baseline; ``ratio`` > 1 means slower now"""
+    merged = results.merge(baseline[['case', 'rows', 'best_s']], on=['case', 'rows'],
+                           how='left', suffixes=('', '_baseline'))
+    merged['ratio'] = merged['best_s'] / merged['best_s_baseline']
+    merged['regression'] = merged['ratio'] > 1 + tolerance
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cases', nargs='*', choices=list(CASES), default=None)
+    parser.add_argument('--sizes', nargs='*', type=float, default=DEFAULT_SIZES)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--force', action='store_true', help="run sizes above each case's default cap")
+    parser.add_argument('--save', help="results path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--baseline', help="earlier results to compare against")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    results = run(args.cases, [int(s) for s in args.sizes], args.repeats, args.seed, args.force)
+    path = args.save or os.path.join(RESULTS_DIR, pd.Timestamp.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    print(f"Results saved to {save(results, path)}")
+
+    fmt = {'best_s': '{:.4f}'.format, 'median_s': '{:.4f}'.format, 'rows_per_s': '{:,.0f}'.format,
+           'best_s_baseline': '{:.4f}'.format, 'ratio': '{:.2f}'.format}
+    if not args.baseline:
+        print(results.to_string(index=False, formatters=fmt))
+        return 0
+
+    compared = compare(results, load(args.baseline), args.tolerance)
+    print(compared.to_string(index=False, formatters=fmt))
+    regressions = compared[compared['regression']]
+    if len(regressions):
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
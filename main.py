@@ -1,72 +1,177 @@
+import argparse
 
 import pandas as pd
-from src.data_loader import InstitutionalDataLoader
-from src.risk_system import BarclaysRiskSystem
-from src.execution_engine import AdaptiveTWAP
-from src.pnl_attribution import PnLAttributor
-from src.stress_testing import CrisisSimulator
-from src.visualization import PortfolioVisualizer
-
-def main():
-    print("Barclays Quant Research Project - Running Full Pipeline")
-    
-    # 1. Load and process data
-    print("Loading market data...")
-    data_loader = InstitutionalDataLoader(start_date='2015-01-01')
+from src.instrumentation import TRACER, summarize
+from src.pipeline import Pipeline, Stage
+
+# Sample book used by the risk and stress stages
+POSITIONS = {
+    'notional': 5000000,
+    'duration': 4.2,
+    'spread_duration': 3.8
+}
+
+PORTFOLIO = pd.DataFrame({
+    'symbol': ['SPY', 'TLT', 'HYG'],
+    'shares': [1000, 2000, 1500],
+    'price': [400, 120, 78],
+    'spread': [0.01, 0.02, 0.035],
+    'spread_duration': [0.0, 0.0, 3.5],
+    'liquidity_factor': [0.95, 0.85, 0.8]
+})
+
+
+# Pipeline stages
+#
+# Each stage imports what it needs when it runs, so a job that only runs
+# e.g. the stress test never loads the data-source, storage or plotting
+# dependencies.
+
+def load_data(start_date, offline):
+    """Load and process market data"""
+    from src.data_loader import InstitutionalDataLoader
+    from src.store import SignalStore
+
+    data_loader = InstitutionalDataLoader(start_date=start_date, offline=offline)
     data_loader.load_raw_data().process_signals()
-    processed_data = data_loader.processed_data
-    
-    # 2. Generate sample positions
-    positions = {
-        'notional': 5000000,
-        'duration': 4.2,
-        'spread_duration': 3.8
-    }
-    
-    # 3. Risk checks
-    print("Running risk checks...")
-    risk_system = BarclaysRiskSystem()
-    violations = risk_system.check_limits(positions)
-    print(f"Risk Limit Violations: {violations}")
-    
-    # 4. Execute sample trade
-    print("Executing sample trade...")
-    algo = AdaptiveTWAP('LQD', 10000)
-    executions = algo.execute()
-    
-    # Add sample attributes for PnL attribution
-    executions['credit_duration'] = 3.8
-    executions['vega'] = 25000
-    executions['beta'] = 0.8
+
+    # Keep a point-in-time history of what each run saw
+    store = SignalStore()
+    store.sync('raw', data_loader.raw_data).sync('processed', data_loader.processed_data)
+    return data_loader.raw_data, data_loader.processed_data
+
+
+def check_risk(positions):
+    from src.risk_system import BarclaysRiskSystem
+    return BarclaysRiskSystem().check_limits(positions)
+
+
+def execute_trade(symbol, quantity):
+    from src.execution_engine import AdaptiveTWAP
+    from src.order_book import MarketSimulator, QuoteStream
+
+    # Ten minutes of synthetic quotes; slices pay the spread and walk the book
+    market = MarketSimulator(QuoteStream.synthetic(60_000, seed=0, symbol=symbol))
+
+    # Sample sensitivities for PnL attribution
+    executions = AdaptiveTWAP(symbol, quantity, market=market).execute().assign(
+        credit_duration=3.8, vega=25000, beta=0.8
+    )
     executions['notional'] = 100 * executions['price']
-    
-    # 5. PnL attribution
-    print("Running PnL attribution...")
-    attributor = PnLAttributor(executions)
-    pnl_breakdown = attributor.attribute()
-    print("PnL Attribution Summary:")
-    print(pnl_breakdown.sum())
-    
-    # 6. Stress testing
-    print("Running stress tests...")
-    portfolio = pd.DataFrame({
-        'symbol': ['SPY', 'TLT'],
-        'shares': [1000, 2000],
-        'price': [400, 120],
-        'spread': [0.01, 0.02],
-        'liquidity_factor': [0.95, 0.85]
-    })
-    simulator = CrisisSimulator(portfolio)
-    stress_results = simulator.run_scenarios()
-    print("Stress Test Results:")
-    print(stress_results)
-    
-    # 7. Visualization
-    print("Generating visualizations...")
-    visualizer = PortfolioVisualizer(pnl_breakdown)
-    visualizer.create_dashboard()
-    
+    return executions
+
+
+def attribute_pnl(executions, processed_data):
+    from src.pnl_attribution import PnLAttributor
+    return PnLAttributor(executions, processed_data).attribute()
+
+
+def stress_test(portfolio):
+    from src.stress_testing import ScenarioEngine
+    return ScenarioEngine(portfolio).run()
+
+
+def value_at_risk(raw_data, portfolio, mc_paths):
+    from src.stress_testing import VaRService, factor_moves, portfolio_exposures
+    var_service = VaRService(factor_moves(raw_data))
+    exposures = portfolio_exposures(portfolio, var_service.moves.columns)
+    # None keeps monte_carlo's own default (stress_testing.MC_PATHS)
+    mc_kwargs = {} if mc_paths is None else {'n_paths': mc_paths}
+    return var_service.report(exposures, **mc_kwargs)
+
+
+def backtest_signal(raw_data, processed_data):
+    from src.backtest import FactorBacktest
+    prices = raw_data[['HYG', 'LQD']]
+    return {
+        mode: FactorBacktest(processed_data['signal'], prices, mode=mode).metrics()
+        for mode in ['long_short', 'market_neutral']
+    }
+
+
+def visualize(pnl_breakdown, processed_data, positions, stress_results):
+    from src.report_generator import risk_limit_frame
+    from src.risk_system import BarclaysRiskSystem
+    from src.visualization import PortfolioVisualizer
+
+    risk = BarclaysRiskSystem()
+    return PortfolioVisualizer(pnl_breakdown).create_dashboard(
+        'LQD', processed_data=processed_data, stress_results=stress_results,
+        risk_limits=risk_limit_frame(risk.calculate_exposures(positions), risk.limits)
+    )
+
+
+STAGES = [
+    Stage('load', load_data, ['start_date', 'offline'], ['raw_data', 'processed_data'], cache=False),
+    Stage('risk', check_risk, ['positions'], ['violations']),
+    Stage('execute', execute_trade, ['symbol', 'quantity'], ['executions'], cache=False),
+    Stage('attribution', attribute_pnl, ['executions', 'processed_data'], ['pnl_breakdown']),
+    Stage('stress', stress_test, ['portfolio'], ['stress_results']),
+    Stage('var', value_at_risk, ['raw_data', 'portfolio', 'mc_paths'], ['var_report']),
+    Stage('backtest', backtest_signal, ['raw_data', 'processed_data'], ['backtest_metrics']),
+    Stage('visualize', visualize, ['pnl_breakdown', 'processed_data', 'positions', 'stress_results'], ['report'],
+          cache=False),
+]
+
+
+STAGE_NAMES = [stage.name for stage in STAGES]
+
+
+def main(trace=None, profile=False, stages=None, offline=False, mc_paths=None):
+    """Run ``stages`` (names from STAGE_NAMES, default all) and what they depend on"""
+    print("Barclays Quant Research Project - Running Full Pipeline")
+    if trace:
+        TRACER.enable(memory=True, profile=profile)
+
+    # Independent stages run in parallel; unchanged inputs are served from cache
+    pipeline = Pipeline(STAGES)
+    targets = None
+    if stages is not None:
+        targets = [output for stage in STAGES if stage.name in stages for output in stage.outputs]
+    results = pipeline.run(
+        targets, start_date='2015-01-01', offline=offline, positions=POSITIONS, symbol='LQD', quantity=10000,
+        portfolio=PORTFOLIO, mc_paths=mc_paths
+    )
+
+    if 'violations' in results:
+        print(f"Risk Limit Violations: {results['violations']}")
+    if 'pnl_breakdown' in results:
+        print("PnL Attribution Summary:")
+        print(results['pnl_breakdown'].sum())
+    if 'stress_results' in results:
+        print("Stress Test Results:")
+        print(results['stress_results'])
+    if 'var_report' in results:
+        print("Daily 99% VaR / Expected Shortfall:")
+        print(results['var_report'])
+    if 'backtest_metrics' in results:
+        print("Signal backtest:")
+        for mode, metrics in results['backtest_metrics'].items():
+            print(f"{mode}: " + ", ".join(f"{k}={v:.3f}" for k, v in metrics.items()))
+
+    if 'report' in results:
+        print(f"Report written to {results['report']}")
+
+    print("Stage timings:")
+    print(pipeline.report.to_string(index=False, columns=['stage', 'status', 'start', 'seconds'],
+                                    float_format='{:.3f}'.format))
+
+    if trace:
+        TRACER.disable()
+        print("Hot paths:")
+        print(summarize(TRACER.to_frame()).to_string(float_format='{:.3f}'.format))
+        print(f"Trace written to {TRACER.export(trace)}")
     print("Pipeline execution complete!")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Run the full research pipeline")
+    parser.add_argument('--stages', nargs='+', choices=STAGE_NAMES,
+                        help="run only these stages (plus the stages they depend on)")
+    parser.add_argument('--offline', action='store_true', help="replay recorded fixtures instead of fetching")
+    parser.add_argument('--trace', help="write a per-stage trace to this .json or .csv path")
+    parser.add_argument('--profile', action='store_true', help="sample call stacks into the trace")
+    parser.add_argument('--mc-paths', type=int,
+                        help="Monte Carlo VaR paths, default stress_testing.MC_PATHS "
+                             "(more than one 100k chunk runs on a process pool)")
+    args = parser.parse_args()
+    main(stages=args.stages, trace=args.trace, profile=args.profile, offline=args.offline, mc_paths=args.mc_paths)
@@ -0,0 +1,399 @@
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.fetcher import ConcurrentFetcher, FetchError, FixtureSource
+from src.instrumentation import instrument
+
+ETF_SYMBOLS = ['SPY', 'TLT', 'HYG', 'LQD']
+
+FRED_SERIES = {
+    'BAA10Y': 'baa_10y',
+    'AAA10Y': 'aaa_10y',
+    'DGS10': '10y_yield',
+    'DGS2': '2y_yield',
+    'VIXCLS': 'vix'
+}
+
+DEFAULT_CACHE_DIR = os.path.join('data', 'cache')
+DEFAULT_FIXTURE_DIR = os.path.join('data', 'fixtures')
+
+ONE_DAY = pd.Timedelta(days=1)
+
+# Signal construction
+SIGNAL_WINDOW = 126
+ZSCORE_COLUMNS = ['quality_spread', 'term_spread', 'vix']
+SIGNAL_WEIGHTS = (0.7, 0.3)  # quality_spread_z, term_spread_z
+
+
+def prune_cache(directory, keep, suffix=''):
+    """Delete all but the ``keep`` most recently used files ending in ``suffix``
+
+    Readers touch an entry on every hit, so modification time orders the
+    files by last use. Returns the removed paths.
+    """
+    if not os.path.isdir(directory):
+        return []
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith(suffix):
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                continue  # removed by a concurrent prune
+    entries.sort(reverse=True)
+    removed = [path for _, path in entries[keep:]]
+    for path in removed:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+class MarketDataCache:
+    """On-disk cache of daily series keyed by source and symbol/series.
+
+    Each series is stored as a pair of .npy files (dates and values) that are
+    opened with ``mmap_mode='r'`` so cached history is read without copying,
+    plus a small JSON sidecar recording the date range already fetched.
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR):
+        self.root = root
+
+    def _path(self, source, key, suffix):
+        return os.path.join(self.root, source, f'{key}.{suffix}')
+
+    def coverage(self, source, key):
+        """Return the (start, end) date range fetched for a series, or None"""
+        path = self._path(source, key, 'json')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            meta = json.load(f)
+        return pd.Timestamp(meta['start']), pd.Timestamp(meta['end'])
+
+    def read(self, source, key):
+        """Load a cached series backed by memory-mapped arrays"""
+        dates = np.load(self._path(source, key, 'dates.npy'), mmap_mode='r')
+        values = np.load(self._path(source, key, 'values.npy'), mmap_mode='r')
+        return pd.Series(values, index=pd.DatetimeIndex(dates), name=key, copy=False)
+
+    def write(self, source, key, series, start, end):
+        """Persist a full series and the date range it covers"""
+        os.makedirs(os.path.join(self.root, source), exist_ok=True)
+        series = series[~series.index.duplicated(keep='last')].sort_index()
+        arrays = {
+            'dates.npy': series.index.values.astype('datetime64[ns]'),
+            'values.npy': series.to_numpy(dtype=np.float64),
+        }
+        # Write to temp files first so a crash never leaves a torn entry
+        for suffix, arr in arrays.items():
+            path = self._path(source, key, suffix)
+            with open(path + '.tmp', 'wb') as f:
+                np.save(f, arr)
+            os.replace(path + '.tmp', path)
+        meta = {'start': str(start.date()), 'end': str(end.date()), 'rows': len(series)}
+        with open(self._path(source, key, 'json'), 'w') as f:
+            json.dump(meta, f)
+
+
+def fetch_yahoo(symbols, start, end):
+    """Download daily closes from yfinance (end date inclusive)"""
+    # Imported on first download: yfinance alone is ~0.3s of startup
+    import yfinance as yf
+
+    etfs = yf.download(symbols, start=start, end=end + ONE_DAY, progress=False)
+    if etfs.empty:
+        return pd.DataFrame(columns=symbols, dtype=float)
+    close = etfs['Close']
+    if isinstance(close, pd.Series):
+        close = close.to_frame(symbols[0])
+    return close.reindex(columns=symbols)
+
+
+def fetch_fred(series, start, end):
+    """Download daily series from FRED (end date inclusive)"""
+    import pandas_datareader.data as web
+
+    macro = web.DataReader(series, 'fred', start, end)
+    return macro.reindex(columns=series)
+
+
+FETCHERS = {
+    'yahoo': fetch_yahoo,
+    'fred': fetch_fred,
+}
+
+
+class ChunkedFrame:
+    """Append-only frame that defers concatenation until it is read
+
+    Appending keeps a list of chunks, so each append costs O(new rows) rather
+    than copying the full history; the chunks are concatenated once, on the
+    next read, and the result replaces them.
+    """
+
+    def __init__(self, frame=None):
+        self.chunks = [] if frame is None else [frame]
+
+    def append(self, frame):
+        self.chunks.append(frame)
+
+    def frame(self):
+        if not self.chunks:
+            return None
+        if len(self.chunks) > 1:
+            self.chunks = [pd.concat(self.chunks)]
+        return self.chunks[0]
+
+
+class InstitutionalDataLoader:
+    def __init__(self, start_date='2010-01-01', cache_dir=DEFAULT_CACHE_DIR,
+                 offline=False, fixture_dir=DEFAULT_FIXTURE_DIR):
+        self.start_date = start_date
+        self.cache = MarketDataCache(cache_dir) if cache_dir else None
+        self.offline = offline
+        self.fixture_dir = fixture_dir
+        self.raw_data = None
+        self.processed_data = None
+        self.signal_engine = None
+        self.fetch_report = None
+
+    @property
+    def raw_data(self):
+        return self._raw.frame()
+
+    @raw_data.setter
+    def raw_data(self, frame):
+        self._raw = ChunkedFrame(frame)
+
+    @property
+    def processed_data(self):
+        return self._processed.frame()
+
+    @processed_data.setter
+    def processed_data(self, frame):
+        self._processed = ChunkedFrame(frame)
+
+    @instrument('load_raw_data', rows=lambda loader: len(loader.raw_data))
+    def load_raw_data(self):
+        """Load market data from multiple sources"""
+        # ETF closes and FRED macro series are fetched concurrently
+        frames = self._load_sources({'yahoo': ETF_SYMBOLS, 'fred': list(FRED_SERIES)})
+        etfs = frames['yahoo']
+        macro = frames['fred'].rename(columns=FRED_SERIES)
+
+        # Merge datasets
+        self.raw_data = pd.concat([etfs, macro], axis=1).ffill().dropna()
+        return self
+
+    def load_series(self, source, keys):
+        """Daily series for any keys of one source, as a (dates x keys) frame
+
+        Goes through the same cache and fetcher as ``load_raw_data``, so only
+        the windows missing from the cache are downloaded.
+        """
+        return self._load_sources({source: list(keys)})[source]
+
+    def _fetcher(self):
+        if self.offline:
+            fetchers = {source: FixtureSource(self.fixture_dir, source) for source in FETCHERS}
+            return ConcurrentFetcher(fetchers, retries=0, rate_limits={}, concurrency={})
+        return ConcurrentFetcher(FETCHERS)
+
+    def _missing_windows(self, source, keys, start, end):
+        """Group keys by the head/tail window the cache is missing"""
+        windows = {}
+        for key in keys:
+            cov = self.cache.coverage(source, key)
+            if cov is None:
+                windows.setdefault((start, end), []).append(key)
+                continue
+            if self.offline:
+                continue
+            if start < cov[0]:
+                windows.setdefault((start, cov[0] - ONE_DAY), []).append(key)
+            if cov[1] < end:
+                windows.setdefault((cov[1] + ONE_DAY, end), []).append(key)
+        return windows
+
+    def _load_sources(self, sources):
+        """Read cached history and fetch only the missing windows of every source at once"""
+        start = pd.Timestamp(self.start_date)
+        end = pd.Timestamp.today().normalize()
+
+        requests = []
+        for source, keys in sources.items():
+            if self.cache is None:
+                requests.append((source, keys, start, end))
+                continue
+            for (lo, hi), window_keys in self._missing_windows(source, keys, start, end).items():
+                requests.append((source, window_keys, lo, hi))
+
+        fetched = self._fetcher().fetch(requests)
+        self.fetch_report = fetched.report()
+        if self.cache is not None and not self.offline:
+            for source, keys in sources.items():
+                self._update_cache(source, keys, fetched, start, end)
+
+        frames = {}
+        for source, keys in sources.items():
+            columns, missing = {}, []
+            for key in keys:
+                if self.cache is not None and self.cache.coverage(source, key) is not None:
+                    columns[key] = self.cache.read(source, key)
+                elif (source, key) in fetched.failed():
+                    missing.append(key)
+                else:
+                    columns[key] = fetched.series(source, key)
+            if missing:
+                raise FetchError(f"Could not fetch {source} series {missing}", self.fetch_report)
+            stale = sorted(k for s, k in fetched.failed(source) if k in columns)
+            if stale:
+                warnings.warn(f"Using cached {source} data for {stale} after failed refresh")
+            frames[source] = pd.concat(columns, axis=1).loc[start:]
+        return frames
+
+    def _update_cache(self, source, keys, fetched, start, end):
+        """Merge newly fetched windows into the cache"""
+        for key in keys:
+            new = fetched.series(source, key)
+            if new is None:
+                continue
+            parts = [new]
+            cov = self.cache.coverage(source, key)
+            if cov is not None:
+                parts.append(self.cache.read(source, key))
+                # An empty head download leaves the cached start where it was
+                head = new.dropna().index < cov[0]
+                lo = min(start, cov[0]) if head.any() else cov[0]
+                hi = max(end, cov[1])
+            else:
+                lo, hi = start, end
+            series = pd.concat(parts)
+            observed = series.dropna().index
+            # Failed downloads come back empty: never mark them as fetched
+            if observed.empty:
+                continue
+            last = observed.max()
+            # Only claim coverage up to the last real observation
+            hi = max(min(hi, last), cov[1]) if cov is not None else min(hi, last)
+            self.cache.write(source, key, series, lo, hi)
+
+    def record_fixtures(self, fixture_dir=None):
+        """Write the loaded raw data as CSV fixtures for offline replay"""
+        fixture_dir = fixture_dir or self.fixture_dir
+        fred_names = {v: k for k, v in FRED_SERIES.items()}
+        for col in self.raw_data.columns:
+            source, key = ('fred', fred_names[col]) if col in fred_names else ('yahoo', col)
+            os.makedirs(os.path.join(fixture_dir, source), exist_ok=True)
+            self.raw_data[col].rename(key).to_csv(
+                os.path.join(fixture_dir, source, f'{key}.csv'), index_label='date'
+            )
+        return self
+
+    @instrument('process_signals', rows=lambda loader: len(loader.processed_data))
+    def process_signals(self):
+        """Create regime-aware features and signals"""
+        df = add_spreads(self.raw_data.copy())
+
+        # Z-score normalization
+        for col in ZSCORE_COLUMNS:
+            df[f'{col}_z'] = (
+                df[col] - df[col].rolling(SIGNAL_WINDOW).mean()
+            ) / df[col].rolling(SIGNAL_WINDOW).std()
+
+        # Composite signal
+        df['signal'] = SIGNAL_WEIGHTS[0] * df['quality_spread_z'] + SIGNAL_WEIGHTS[1] * df['term_spread_z']
+
+        self.processed_data = df.dropna()
+        self.signal_engine = None
+        return self
+
+    def append_raw_data(self, new_rows):
+        """Append newly arrived raw bars and update signals incrementally
+
+        Only the new rows are processed; the rolling state is primed from the
+        last window of existing history the first time this is called.
+        Both frames are appended as chunks and only concatenated when read.
+        Returns the processed rows produced by the new bars.
+        """
+        if self.signal_engine is None:
+            self.signal_engine = IncrementalSignalEngine()
+            if self.raw_data is not None:
+                self.signal_engine.update(self.raw_data.iloc[-SIGNAL_WINDOW:])
+
+        processed = self.signal_engine.update(new_rows)
+        self._raw.append(new_rows)
+        self._processed.append(processed)
+        return processed
+
+
+def add_spreads(df):
+    """Add credit quality and term spread columns to a raw data frame"""
+    df['quality_spread'] = df['baa_10y'] - df['aaa_10y']
+    df['term_spread'] = df['10y_yield'] - df['2y_yield']
+    return df
+
+
+class IncrementalSignalEngine:
+    """Rolling z-score state for the composite signal, updated bar by bar.
+
+    Keeps a ring buffer of the last ``window`` feature values plus the running
+    mean and sum of squared deviations (sliding-window Welford), so each new bar
+    costs O(1) regardless of history length. Results match the pandas
+    ``rolling(window)`` recompute in ``process_signals`` to floating-point
+    tolerance. Input rows are expected to be complete, as ``raw_data`` is after
+    forward-fill and ``dropna``.
+    """
+
+    def __init__(self, window=SIGNAL_WINDOW, weights=SIGNAL_WEIGHTS):
+        self.window = window
+        self.weights = weights
+        k = len(ZSCORE_COLUMNS)
+        self._buffer = np.zeros((window, k))
+        self._pos = 0
+        self._count = 0
+        self._mean = np.zeros(k)
+        self._m2 = np.zeros(k)
+
+    def push(self, x):
+        """Add one bar of feature values and return their z-scores"""
+        if self._count < self.window:
+            self._count += 1
+            delta = x - self._mean
+            self._mean = self._mean + delta / self._count
+            self._m2 = self._m2 + delta * (x - self._mean)
+        else:
+            # Replace the oldest value in one step
+            old = self._buffer[self._pos]
+            old_mean = self._mean
+            self._mean = old_mean + (x - old) / self.window
+            self._m2 = self._m2 + (x - old) * (x - self._mean + old - old_mean)
+
+        self._buffer[self._pos] = x
+        self._pos = (self._pos + 1) % self.window
+
+        if self._count < self.window:
+            return np.full(len(x), np.nan)
+        std = np.sqrt(np.maximum(self._m2, 0.0) / (self.window - 1))
+        return (x - self._mean) / std
+
+    def update(self, rows):
+        """Consume newly appended raw rows and return their processed rows"""
+        df = add_spreads(rows.copy())
+        features = df[ZSCORE_COLUMNS].to_numpy(dtype=np.float64)
+
+        z = np.empty_like(features)
+        for i in range(len(features)):
+            z[i] = self.push(features[i])
+
+        for j, col in enumerate(ZSCORE_COLUMNS):
+            df[f'{col}_z'] = z[:, j]
+        df['signal'] = self.weights[0] * df['quality_spread_z'] + self.weights[1] * df['term_spread_z']
+        return df.dropna()
@@ -0,0 +1,287 @@
+import asyncio
+import itertools
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from src.instrumentation import instrument
+
+# Slice sizing: 5bps participation of 1MM ADV, never below 100 shares
+ADV = 1000000
+PARTICIPATION = 0.0005
+MIN_SLICE = 100
+SLICE_SIZE = max(MIN_SLICE, int(ADV * PARTICIPATION))
+
+# SEC-compliant pause between slices
+SLICE_INTERVAL = timedelta(seconds=0.1)
+
+# Simulated market
+MID_PRICE = 100
+MID_VOL = 0.1
+PRICE_IMPROVEMENT = 0.01
+
+# Shares are signed: positive for buys, negative for sells
+FILL_COLUMNS = ['order_id', 'timestamp', 'symbol', 'price', 'shares', 'mid']
+
+
+def simulate_twap_batch(orders, start=None, seed=None):
+    """Simulate TWAP fills for many orders on a simulated clock
+
+    ``orders`` is a sequence of (symbol, quantity, duration_min) tuples,
+    with negative quantities for sells. The whole fill schedule, mid-price path and fill prices for every order are
+    generated as flat NumPy arrays in one pass and returned as a single
+    columnar fills table with an ``order_id`` column.
+    """
+    start = pd.Timestamp(start if start is not None else datetime.now(pytz.UTC))
+    rng = np.random.default_rng(seed)
+
+    symbols = np.array([o[0] for o in orders], dtype=object)
+    signed = np.array([o[1] for o in orders], dtype=np.int64)
+    side = np.sign(signed)
+    quantity = np.abs(signed)
+    duration = np.array([o[2] for o in orders], dtype=np.float64)
+
+    # Slices per order: enough to fill, capped by how many intervals fit
+    max_slices = np.ceil(duration * 60 / SLICE_INTERVAL.total_seconds()).astype(np.int64)
+    n_slices = np.minimum(-(-quantity // SLICE_SIZE), max_slices)
+    n_slices = np.maximum(n_slices, 0)
+    total = int(n_slices.sum())
+
+    order_id = np.repeat(np.arange(len(orders)), n_slices)
+    offsets = np.cumsum(n_slices) - n_slices
+    slice_no = np.arange(total) - np.repeat(offsets, n_slices)
+
+    # Every slice is full size except whatever is left on the final one
+    remaining = quantity[order_id] - slice_no * SLICE_SIZE
+    shares = side[order_id] * np.minimum(remaining, SLICE_SIZE)
+
+    mid = MID_PRICE + rng.normal(0, MID_VOL, total)
+    price = mid + rng.uniform(-PRICE_IMPROVEMENT, PRICE_IMPROVEMENT, total)
+    timestamp = start + pd.to_timedelta(slice_no * SLICE_INTERVAL.total_seconds(), unit='s')
+
+    return pd.DataFrame({
+        'order_id': order_id,
+        'timestamp': timestamp,
+        'symbol': symbols[order_id],
+        'price': price,
+        'shares': shares,
+        'mid': mid,
+    }, columns=FILL_COLUMNS)
+
+
+class AdaptiveTWAP:
+    def __init__(self, symbol, quantity, duration_min=5, seed=None, market=None):
+        self.symbol = symbol
+        self.quantity = quantity
+        self.duration = timedelta(minutes=duration_min)
+        self.seed = seed
+        # Optional MarketSimulator to trade against instead of the random mid
+        self.market = market
+
+    @instrument('execute')
+    def execute(self, live_pacing=False):
+        """Simulate TWAP execution with market impact
+
+        By default the schedule runs on a simulated clock and returns
+        immediately. ``live_pacing=True`` keeps the wall-clock loop that
+        sleeps between slices. With a ``market`` the same schedule runs on
+        the simulator's clock against its order book.
+        """
+        if self.market is not None:
+            return self._execute_market()
+        if live_pacing:
+            return self._execute_live()
+        fills = simulate_twap_batch(
+            [(self.symbol, self.quantity, self.duration.total_seconds() / 60)],
+            seed=self.seed
+        )
+        return fills.drop(columns='order_id')
+
+    def _execute_live(self):
+        """Run the TWAP schedule in real time, pausing between slices"""
+        from src.fills import FillStore
+
+        rng = np.random.default_rng(self.seed)
+        fills = FillStore()
+        side = 1 if self.quantity > 0 else -1
+        remaining = abs(self.quantity)
+        start = datetime.now(pytz.UTC)
+
+        while remaining > 0 and datetime.now(pytz.UTC) < start + self.duration:
+            # Simulate market data
+            mid_price = MID_PRICE + rng.normal(0, MID_VOL)
+
+            # Calculate slice size
+            slice_size = min(remaining, SLICE_SIZE)
+
+            # Price improvement logic
+            fill_price = mid_price + rng.uniform(-PRICE_IMPROVEMENT, PRICE_IMPROVEMENT)
+
+            # Record fill straight into the preallocated record array
+            fills.append({
+                'timestamp': datetime.now(pytz.UTC),
+                'symbol': self.symbol,
+                'price': fill_price,
+                'shares': side * slice_size,
+                'mid': mid_price
+            })
+            remaining -= slice_size
+
+            # SEC-compliant pause
+            time.sleep(SLICE_INTERVAL.total_seconds())
+
+        return fills.to_frame().drop(columns='order_id')
+
+    def _execute_market(self):
+        """Send each slice as a market order into the simulator's book"""
+        from src.fills import FillStore
+
+        market = self.market
+        fills = FillStore()
+        side = 1 if self.quantity > 0 else -1
+        remaining = abs(self.quantity)
+        interval = int(SLICE_INTERVAL.total_seconds() * 1e9)
+        end = market.now + int(self.duration.total_seconds() * 1e9)
+
+        def record(fill):
+            nonlocal remaining
+            # Shares the book could not fill are retried in the next slice
+            remaining -= fill['shares']
+            fills.append(dict(fill, symbol=self.symbol, shares=side * fill['shares']))
+
+        def send_slice():
+            if remaining <= 0:
+                return
+            market.submit(side, min(remaining, SLICE_SIZE), on_fill=record)
+            if market.now + interval < end:
+                market.schedule(market.now + interval, send_slice)
+
+        market.schedule(market.now, send_slice)
+        market.run()
+        return fills.to_frame().drop(columns='order_id')
+
+
+class ParentOrder:
+    """State of one parent order inside the ExecutionScheduler"""
+
+    def __init__(self, order_id, symbol, quantity, duration_min, interval):
+        self.order_id = order_id
+        self.symbol = symbol
+        self.quantity = quantity
+        self.duration = timedelta(minutes=duration_min)
+        self.interval = interval
+        self.filled = 0
+        self.status = 'pending'
+        self.task = None
+
+    @property
+    def side(self):
+        return 1 if self.quantity > 0 else -1
+
+    @property
+    def remaining(self):
+        """Unsigned shares still to fill"""
+        return max(abs(self.quantity) - self.filled, 0)
+
+
+class ExecutionScheduler:
+    """Interleave TWAP slices for many parent orders on one asyncio event loop
+
+    Each order runs as its own task and pauses ``interval`` seconds between
+    slices (0 yields to the loop without waiting, which is how large
+    simulated batches are run). Orders can be cancelled or amended while the
+    scheduler is running, and every fill is pushed to subscribers as soon as
+    it happens.
+    """
+
+    def __init__(self, interval=SLICE_INTERVAL.total_seconds(), seed=None):
+        self.interval = interval
+        self.rng = np.random.default_rng(seed)
+        self.orders = {}
+        self.fills = []
+        self.subscribers = []
+        self._ids = itertools.count()
+        self._running = False
+
+    def subscribe(self, callback):
+        """Register ``callback(fill)`` to receive each fill dict as it happens"""
+        self.subscribers.append(callback)
+        return self
+
+    def submit(self, symbol, quantity, duration_min=5, interval=None):
+        """Queue a parent order and return its order id"""
+        order = ParentOrder(
+            next(self._ids), symbol, quantity, duration_min,
+            self.interval if interval is None else interval
+        )
+        self.orders[order.order_id] = order
+        if self._running:
+            order.task = asyncio.ensure_future(self._run_order(order))
+        return order.order_id
+
+    def cancel(self, order_id):
+        """Stop an order before its next slice"""
+        order = self.orders[order_id]
+        if order.status in ('pending', 'working'):
+            order.status = 'cancelled'
+
+    def amend(self, order_id, quantity=None, duration_min=None, interval=None):
+        """Change the target quantity, duration or pacing of a live order"""
+        order = self.orders[order_id]
+        if quantity is not None:
+            order.quantity = quantity
+        if duration_min is not None:
+            order.duration = timedelta(minutes=duration_min)
+        if interval is not None:
+            order.interval = interval
+
+    async def run(self):
+        """Run all submitted orders to completion and return the fills"""
+        self._running = True
+        try:
+            for order in self.orders.values():
+                if order.task is None:
+                    order.task = asyncio.ensure_future(self._run_order(order))
+            # Orders may be submitted while others are running
+            while True:
+                pending = [o.task for o in self.orders.values() if not o.task.done()]
+                if not pending:
+                    break
+                await asyncio.gather(*pending)
+        finally:
+            self._running = False
+        return pd.DataFrame(self.fills)
+
+    async def _run_order(self, order):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        if order.status == 'pending':
+            order.status = 'working'
+
+        # Duration is re-read each slice so amendments take effect
+        while (order.status == 'working' and order.remaining > 0
+               and loop.time() < started + order.duration.total_seconds()):
+            mid_price = MID_PRICE + self.rng.normal(0, MID_VOL)
+            slice_size = min(order.remaining, SLICE_SIZE)
+            fill = {
+                'order_id': order.order_id,
+                'timestamp': datetime.now(pytz.UTC),
+                'symbol': order.symbol,
+                'price': mid_price + self.rng.uniform(-PRICE_IMPROVEMENT, PRICE_IMPROVEMENT),
+                'shares': order.side * slice_size,
+                'mid': mid_price
+            }
+            order.filled += slice_size
+            self._publish(fill)
+            await asyncio.sleep(order.interval)
+
+        if order.status == 'working':
+            order.status = 'filled' if order.remaining == 0 else 'expired'
+
+    def _publish(self, fill):
+        self.fills.append(fill)
+        for callback in self.subscribers:
+            callback(fill)
@@ -0,0 +1,174 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# Requests per second and burst size allowed against each source
+RATE_LIMITS = {
+    'yahoo': (2.0, 2),
+    'fred': (5.0, 5),
+}
+
+# Requests in flight per source; yfinance keeps module-level download state,
+# so its calls must not overlap
+SOURCE_CONCURRENCY = {
+    'yahoo': 1,
+    'fred': 4,
+}
+
+# Keys per request
+CHUNK_SIZES = {
+    'yahoo': 100,
+    'fred': 20,
+}
+
+# Errors that retrying cannot fix
+PERMANENT_ERRORS = (FileNotFoundError, KeyError)
+
+FETCH_REPORT_COLUMNS = ['source', 'key', 'start', 'end', 'status', 'attempts', 'error']
+
+
+class FetchError(RuntimeError):
+    """A required series could not be fetched; ``report`` has the details"""
+
+    def __init__(self, message, report=None):
+        super().__init__(message)
+        self.report = report
+
+
+class RateLimiter:
+    """Thread-safe token bucket: ``rate`` requests per second, bursts of ``burst``"""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(burst)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self.sleep(wait)
+
+
+class FixtureSource:
+    """Fetcher that replays recorded ``<fixture_dir>/<source>/<key>.csv`` files"""
+
+    def __init__(self, fixture_dir, source):
+        self.fixture_dir = fixture_dir
+        self.source = source
+
+    def __call__(self, keys, start, end):
+        columns = {}
+        for key in keys:
+            path = os.path.join(self.fixture_dir, self.source, f'{key}.csv')
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No cached data or fixture for {self.source}/{key}: {path}")
+            columns[key] = pd.read_csv(path, index_col=0, parse_dates=True).iloc[:, 0]
+        return pd.concat(columns, axis=1).loc[start:end]
+
+
+class FetchResult:
+    """Series fetched per (source, key) plus a status row per key and window"""
+
+    def __init__(self):
+        self.parts = {}
+        self.rows = []
+
+    def series(self, source, key):
+        """Everything fetched for one key, or None if nothing came back"""
+        parts = self.parts.get((source, key))
+        return pd.concat(parts) if parts else None
+
+    def failed(self, source=None):
+        return {(r['source'], r['key']) for r in self.rows
+                if r['status'] == 'failed' and source in (None, r['source'])}
+
+    def report(self):
+        return pd.DataFrame(self.rows, columns=FETCH_REPORT_COLUMNS)
+
+
+class ConcurrentFetcher:
+    """Fetch many (source, keys, start, end) requests on a bounded thread pool
+
+    Requests are split into per-source key chunks. Each chunk waits on its
+    source's rate limiter and concurrency slot, and is retried with
+    exponential backoff and jitter on transient errors. A chunk that still
+    fails is reported per key as ``failed`` rather than aborting the others;
+    keys that return no observations are reported as ``empty``.
+
+    ``fetchers`` maps a source name to a ``fn(keys, start, end)`` returning
+    a frame with one column per key, so tests and offline runs can plug in
+    a FixtureSource or any stub.
+    """
+
+    def __init__(self, fetchers, max_workers=8, retries=3, backoff=0.5,
+                 rate_limits=None, concurrency=None, chunk_sizes=None, sleep=time.sleep):
+        self.fetchers = fetchers
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.chunk_sizes = CHUNK_SIZES if chunk_sizes is None else chunk_sizes
+        rate_limits = RATE_LIMITS if rate_limits is None else rate_limits
+        concurrency = SOURCE_CONCURRENCY if concurrency is None else concurrency
+        self.limiters = {s: RateLimiter(rate, burst) for s, (rate, burst) in rate_limits.items()}
+        self.slots = {s: threading.Semaphore(n) for s, n in concurrency.items()}
+
+    def _chunks(self, requests):
+        for source, keys, start, end in requests:
+            size = self.chunk_sizes.get(source, len(keys)) or len(keys)
+            for i in range(0, len(keys), size):
+                yield source, list(keys[i:i + size]), start, end
+
+    def _call(self, source, keys, start, end):
+        """Call one fetcher with retries; returns (frame, attempts, error)"""
+        limiter = self.limiters.get(source)
+        slot = self.slots.get(source, threading.Semaphore(self.max_workers))
+        for attempt in range(1, self.retries + 2):
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                with slot:
+                    return self.fetchers[source](keys, start, end), attempt, None
+            except PERMANENT_ERRORS as exc:
+                return None, attempt, exc
+            except Exception as exc:
+                if attempt > self.retries:
+                    return None, attempt, exc
+                self.sleep(self.backoff * 2 ** (attempt - 1) * (1 + random.random()))
+
+    def fetch(self, requests):
+        result = FetchResult()
+        chunks = list(self._chunks(requests))
+        if not chunks:
+            return result
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as pool:
+            outcomes = list(pool.map(lambda c: self._call(*c), chunks))
+
+        for (source, keys, start, end), (frame, attempts, error) in zip(chunks, outcomes):
+            for key in keys:
+                row = {'source': source, 'key': key, 'start': start, 'end': end,
+                       'attempts': attempts, 'error': None}
+                if error is not None:
+                    row.update(status='failed', error=f'{type(error).__name__}: {error}')
+                else:
+                    series = frame[key] if key in frame else pd.Series(dtype=float)
+                    result.parts.setdefault((source, key), []).append(series)
+                    row['status'] = 'ok' if series.notna().any() else 'empty'
+                result.rows.append(row)
+        return result
@@ -0,0 +1,327 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.execution_engine import FILL_COLUMNS
+from src.pnl_attribution import ATTRIBUTION_COLUMNS, PnLAttributor, factor_moves_table
+
+# One fill record: 44 bytes, symbols as codes into the store's symbol table
+FILL_DTYPE = np.dtype([
+    ('order_id', '<i8'),
+    ('timestamp', '<i8'),  # ns since epoch, UTC
+    ('symbol', '<i4'),
+    ('price', '<f8'),
+    ('shares', '<i8'),  # signed: negative for sells
+    ('mid', '<f8'),
+])
+
+# Sensitivities that are constant for every fill of an order
+ORDER_ATTRIBUTES = ['beta', 'duration', 'credit_duration', 'vega']
+
+# One order-attribute update; NaN leaves an attribute unchanged
+ORDER_DTYPE = np.dtype([('order_id', '<i8')] + [(name, '<f8') for name in ORDER_ATTRIBUTES])
+
+INITIAL_CAPACITY = 1024
+
+REPLAY_CHUNK = 1_000_000
+
+
+def _epoch_ns(timestamps):
+    ts = pd.DatetimeIndex(timestamps)
+    if ts.tz is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return ts.values.astype('datetime64[ns]').view(np.int64)
+
+
+def _latest(updates):
+    """Sorted order ids and their (orders x ORDER_ATTRIBUTES) values, later updates winning"""
+    ids = np.unique(updates['order_id'])
+    values = np.full((len(ids), len(ORDER_ATTRIBUTES)), np.nan)
+    for j, name in enumerate(ORDER_ATTRIBUTES):
+        column = updates[name]
+        rows = np.flatnonzero(~np.isnan(column))
+        # Fancy assignment keeps the last write for repeated positions
+        values[np.searchsorted(ids, updates['order_id'][rows]), j] = column[rows]
+    return ids, values
+
+
+class _Tables:
+    """Symbol table and per-order attribute updates shared by FillStore and FillLog"""
+
+    def __init__(self, symbols=()):
+        self.symbols = list(symbols)
+        self._codes = {s: i for i, s in enumerate(self.symbols)}
+        self._updates = [np.empty(0, dtype=ORDER_DTYPE)]
+        self._orders = None
+
+    def intern(self, symbols):
+        """Integer codes for ``symbols``, adding unseen ones to the table"""
+        uniques, inverse = np.unique(np.asarray(symbols, dtype=object), return_inverse=True)
+        codes = np.array([self._code(s) for s in uniques], dtype=np.int32)
+        return codes[inverse]
+
+    def _code(self, symbol):
+        code = self._codes.get(symbol)
+        if code is None:
+            code = self._codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return code
+
+    def set_order(self, order_id, **attributes):
+        """Constants (``ORDER_ATTRIBUTES``) for every fill of ``order_id``"""
+        return self.set_orders([order_id], **attributes)
+
+    def set_orders(self, order_ids, **attributes):
+        """Same as ``set_order`` for many orders; values are scalars or per-order arrays"""
+        unknown = set(attributes) - set(ORDER_ATTRIBUTES)
+        if unknown:
+            raise ValueError(f"Unknown order attributes {sorted(unknown)}")
+        rows = np.empty(len(order_ids), dtype=ORDER_DTYPE)
+        rows['order_id'] = order_ids
+        for name in ORDER_ATTRIBUTES:
+            rows[name] = attributes.get(name, np.nan)
+        self._add_updates(rows)
+        return self
+
+    def _add_updates(self, rows):
+        self._updates.append(rows)
+        self._orders = None
+
+    def order_updates(self):
+        """Every attribute update so far, oldest first"""
+        if len(self._updates) > 1:
+            self._updates = [np.concatenate(self._updates)]
+        return self._updates[0]
+
+    def orders(self):
+        """Current attributes per order as a frame indexed by order_id"""
+        ids, values = self._order_table()
+        return pd.DataFrame(values, index=pd.Index(ids, name='order_id'), columns=ORDER_ATTRIBUTES)
+
+    def _order_table(self):
+        if self._orders is None:
+            self._orders = _latest(self.order_updates())
+        return self._orders
+
+    def decode(self, records):
+        """Fill records as a frame with symbols decoded and order attributes broadcast"""
+        frame = pd.DataFrame({
+            'order_id': records['order_id'],
+            'timestamp': pd.to_datetime(records['timestamp'], unit='ns', utc=True),
+            'symbol': np.array(self.symbols, dtype=object)[records['symbol']],
+            'price': records['price'],
+            'shares': records['shares'],
+            'mid': records['mid'],
+        }, columns=FILL_COLUMNS)
+
+        ids, values = self._order_table()
+        if len(ids):
+            pos = np.clip(np.searchsorted(ids, records['order_id']), 0, len(ids) - 1)
+            known = ids[pos] == records['order_id']
+            for j, name in enumerate(ORDER_ATTRIBUTES):
+                if np.isnan(values[:, j]).all():
+                    continue
+                # One value per order, gathered into the fill rows
+                frame[name] = np.where(known, values[pos, j], np.nan)
+        return frame
+
+
+class FillStore(_Tables):
+    """Fills in a preallocated, growable NumPy structured array
+
+    Symbols are interned to int32 codes and per-order sensitivities (beta,
+    duration, ...) are stored once per order instead of once per fill.
+    Capacity doubles when full, so single-fill ``append`` is amortised O(1)
+    and ``extend`` adds whole columnar batches without a Python loop.
+    """
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        super().__init__()
+        self._records = np.empty(capacity, dtype=FILL_DTYPE)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def records(self):
+        """View of the filled part of the record array (no copy)"""
+        return self._records[:self._size]
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed <= len(self._records):
+            return
+        grown = np.empty(max(needed, 2 * len(self._records)), dtype=FILL_DTYPE)
+        grown[:self._size] = self._records[:self._size]
+        self._records = grown
+
+    def append(self, fill):
+        """Add one fill dict (e.g. an ExecutionScheduler subscriber callback)"""
+        self._reserve(1)
+        ts = fill['timestamp']
+        # Timestamp.value is already ns since epoch (UTC for tz-aware)
+        ts = ts.value if isinstance(ts, pd.Timestamp) else pd.Timestamp(ts).value
+        self._records[self._size] = (fill.get('order_id', 0), ts, self._code(fill['symbol']),
+                                     fill['price'], fill['shares'], fill['mid'])
+        self._size += 1
+        return self
+
+    def extend(self, fills):
+        """Add a frame of fills (``FILL_COLUMNS``; ``order_id`` defaults to 0)"""
+        n = len(fills)
+        self._reserve(n)
+        out = self._records[self._size:self._size + n]
+        out['order_id'] = fills['order_id'].to_numpy() if 'order_id' in fills else 0
+        out['timestamp'] = _epoch_ns(fills['timestamp'])
+        out['symbol'] = self.intern(fills['symbol'].to_numpy())
+        out['price'] = fills['price'].to_numpy()
+        out['shares'] = fills['shares'].to_numpy()
+        out['mid'] = fills['mid'].to_numpy()
+        self._size += n
+        return self
+
+    @classmethod
+    def from_frame(cls, fills, attributes=None):
+        """Store for a frame of fills; ``attributes`` apply to all its orders"""
+        store = cls(capacity=max(len(fills), 1)).extend(fills)
+        if attributes:
+            store.set_orders(np.unique(store.records['order_id']), **attributes)
+        return store
+
+    def to_frame(self):
+        return self.decode(self.records)
+
+    @property
+    def nbytes(self):
+        return self.records.nbytes
+
+
+class FillLog(_Tables):
+    """Append-only fill file read back through a memory map
+
+    Records are raw ``FILL_DTYPE`` rows in ``<path>``. Order attribute
+    updates are raw ``ORDER_DTYPE`` rows appended to ``<path>.orders`` and
+    the symbol table lives in ``<path>.json``. Both sidecars are written
+    before records are appended, so a reader never sees a code it cannot
+    decode, and a torn trailing record is ignored. Each appended store's
+    order ids are shifted past the log's highest id so orders from
+    different stores never share attributes; ``offsets`` records the
+    shift applied to each append, in order. ``replay`` and
+    ``attribute`` walk the memory map in chunks, so memory use is set by
+    ``chunk_size`` rather than by the size of the log.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        meta = {}
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+        super().__init__(meta.get('symbols', ()))
+        self.offsets = meta.get('offsets', [])
+        if os.path.exists(self._orders_path):
+            n = os.path.getsize(self._orders_path) // ORDER_DTYPE.itemsize
+            super()._add_updates(np.fromfile(self._orders_path, dtype=ORDER_DTYPE, count=n))
+        self._next_order_id = meta.get('next_order_id')
+        if self._next_order_id is None:
+            # Logs written before ids were offset: start past every stored id
+            ids = np.concatenate([self.records()['order_id'], self.order_updates()['order_id']])
+            self._next_order_id = int(ids.max()) + 1 if len(ids) else 0
+
+    @property
+    def _meta_path(self):
+        return f'{self.path}.json'
+
+    @property
+    def _orders_path(self):
+        return f'{self.path}.orders'
+
+    def __len__(self):
+        if not os.path.exists(self.path):
+            return 0
+        return os.path.getsize(self.path) // FILL_DTYPE.itemsize
+
+    @staticmethod
+    def _append_file(path, array):
+        # Drop a torn row from an interrupted write so new ones stay aligned
+        if os.path.exists(path):
+            os.truncate(path, os.path.getsize(path) // array.dtype.itemsize * array.dtype.itemsize)
+        with open(path, 'ab') as f:
+            f.write(array.tobytes())
+
+    def append(self, store):
+        """Append every fill and order attribute update of a FillStore
+
+        The store's order ids are shifted by the offset appended to
+        ``offsets``, so log id = store id + offset.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        records = store.records.copy()
+        updates = store.order_updates().copy()
+        ids = np.concatenate([records['order_id'], updates['order_id']])
+        offset = self._next_order_id
+        records['order_id'] += offset
+        updates['order_id'] += offset
+        # Re-map the store's symbol codes onto this log's table
+        mapping = self.intern(np.array(store.symbols, dtype=object)) if store.symbols else np.empty(0, np.int32)
+        records['symbol'] = mapping[records['symbol']]
+        if len(ids):
+            self._next_order_id = int(ids.max()) + offset + 1
+        self.offsets.append(offset)
+        self._write_meta()
+
+        if len(updates):
+            self._add_updates(updates)
+        self._append_file(self.path, records)
+        return self
+
+    def _write_meta(self):
+        tmp = self._meta_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'symbols': self.symbols, 'offsets': self.offsets,
+                       'next_order_id': self._next_order_id}, f)
+        os.replace(tmp, self._meta_path)
+
+    def _add_updates(self, rows):
+        # set_order(s) on the log take log ids and are persisted straight away
+        top = int(rows['order_id'].max()) + 1 if len(rows) else 0
+        if top > self._next_order_id:
+            self._next_order_id = top
+            self._write_meta()
+        self._append_file(self._orders_path, rows)
+        super()._add_updates(rows)
+
+    def records(self):
+        """All records as a read-only memory map (empty array if no log yet)"""
+        n = len(self)
+        if n == 0:
+            return np.empty(0, dtype=FILL_DTYPE)
+        return np.memmap(self.path, dtype=FILL_DTYPE, mode='r', shape=(n,))
+
+    def replay(self, chunk_size=REPLAY_CHUNK):
+        """Yield the log as decoded fill frames of at most ``chunk_size`` rows"""
+        records = self.records()
+        for start in range(0, len(records), chunk_size):
+            yield self.decode(records[start:start + chunk_size])
+
+    def attribute(self, factor_data, chunk_size=REPLAY_CHUNK, by=None):
+        """PnLAttributor totals over the whole log, one chunk in memory at a time
+
+        Returns the component totals, or per-group totals when ``by`` is
+        'symbol', 'day' or 'order'.
+        """
+        moves = factor_moves_table(factor_data)
+        totals = None
+        for fills in self.replay(chunk_size):
+            attributor = PnLAttributor(fills, factor_data, moves=moves)
+            part = attributor.attribute().sum(min_count=1) if by is None else attributor.summary(by)
+            totals = part if totals is None else totals.add(part, fill_value=0)
+        if totals is None:
+            return pd.Series(0.0, index=ATTRIBUTION_COLUMNS)
+        return totals if by is None else totals.sort_index()
@@ -0,0 +1,316 @@
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+import pandas as pd
+
+SPAN_COLUMNS = ['name', 'thread', 'parent', 'depth', 'start', 'wall_s', 'cpu_s', 'peak_mb', 'rows']
+
+# Seconds between stack samples when profiling
+PROFILE_INTERVAL = 0.005
+
+# Innermost frames kept per sampled stack
+PROFILE_DEPTH = 40
+
+_local = threading.local()
+
+# Number of enabled tracers; instrumented calls skip all lookups while it is 0
+_enabled_tracers = 0
+_count_lock = threading.Lock()
+
+
+class _NullSpan:
+    """What ``span`` returns while tracing is off: no clocks, no bookkeeping"""
+
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, rows):
+        self.tracer = tracer
+        self.record = {'name': name, 'rows': rows}
+
+    def __enter__(self):
+        self.tracer._enter(self.record)
+        return self.record
+
+    def __exit__(self, *exc):
+        self.tracer._exit(self.record)
+        return False
+
+
+class Tracer:
+    """Collects wall time, CPU time, peak memory and row counts per span
+
+    Spans nest per thread. CPU time is the span's own thread's CPU; peak
+    memory is the tracemalloc high-water mark above the span's starting
+    allocation, so it is only recorded with ``memory=True`` and is
+    process-wide when spans overlap across threads. With ``profile=True`` a
+    background thread samples the call stack of every thread inside a span
+    into collapsed stacks (``profile()``, ``export_profile()``).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.records = []
+        self.samples = Counter()
+        self._lock = threading.Lock()
+        self._epoch = time.perf_counter()
+        self._stacks = {}
+        self._sampler = None
+        self._started_tracemalloc = False
+
+    def enable(self, memory=False, profile=False, interval=PROFILE_INTERVAL):
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        elif not memory and self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        if profile and self._sampler is None:
+            self._sampler = _Sampler(self, interval)
+            self._sampler.start()
+        _count_enabled(self, True)
+        return self
+
+    def disable(self):
+        _count_enabled(self, False)
+        if self._sampler is not None:
+            self._sampler.stop()
+            self._sampler = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.memory = False
+        return self
+
+    def clear(self):
+        with self._lock:
+            self.records = []
+            self.samples = Counter()
+            self._epoch = time.perf_counter()
+        return self
+
+    def span(self, name, rows=None):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, rows)
+
+    def _enter(self, record):
+        ident = threading.get_ident()
+        stack = self._stacks.setdefault(ident, [])
+        parent = stack[-1] if stack else None
+        record.update(thread=threading.current_thread().name, depth=len(stack),
+                      parent=parent['name'] if parent else None)
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # Hand the peak so far to the parent before restarting the watermark
+            if parent is not None:
+                parent['_child_peak'] = max(parent.get('_child_peak', 0), peak)
+            tracemalloc.reset_peak()
+            record['_base'] = current
+        stack.append(record)
+        record['_cpu'] = time.thread_time()
+        record['_wall'] = time.perf_counter()
+
+    def _exit(self, record):
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        stack = self._stacks.get(threading.get_ident(), [])
+        if stack and stack[-1] is record:
+            stack.pop()
+
+        peak_mb = None
+        if '_base' in record and tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1], record.get('_child_peak', 0))
+            peak_mb = max(peak - record['_base'], 0) / 1e6
+            if stack:
+                stack[-1]['_child_peak'] = max(stack[-1].get('_child_peak', 0), peak)
+            tracemalloc.reset_peak()
+
+        row = {
+            'name': record['name'],
+            'thread': record['thread'],
+            'parent': record['parent'],
+            'depth': record['depth'],
+            'start': record['_wall'] - self._epoch,
+            'wall_s': wall - record['_wall'],
+            'cpu_s': cpu - record['_cpu'],
+            'peak_mb': peak_mb,
+            'rows': record.get('rows'),
+        }
+        with self._lock:
+            self.records.append(row)
+
+    def to_frame(self):
+        with self._lock:
+            return pd.DataFrame(self.records, columns=SPAN_COLUMNS)
+
+    def profile(self):
+        """Sampled collapsed stacks, most frequent first"""
+        with self._lock:
+            items = self.samples.most_common()
+        return pd.DataFrame(items, columns=['stack', 'samples'])
+
+    def export(self, path):
+        """Write spans to ``.json`` (with profile samples) or ``.csv``"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if path.endswith('.csv'):
+            self.to_frame().to_csv(path, index=False)
+            return path
+        with open(path, 'w') as f:
+            f.write(self.to_json())
+        return path
+
+    def to_json(self):
+        """Spans and profile samples as one JSON document"""
+        payload = {
+            'spans': json.loads(self.to_frame().to_json(orient='records')),
+            'profile': json.loads(self.profile().to_json(orient='records')),
+        }
+        return json.dumps(payload, indent=1)
+
+    def export_profile(self, path):
+        """Write samples as collapsed stacks, the flamegraph.pl / speedscope input"""
+        with open(path, 'w') as f:
+            for stack, count in self.profile().itertuples(index=False):
+                f.write(f'{stack} {count}\n')
+        return path
+
+
+def _count_enabled(tracer, enabled):
+    global _enabled_tracers
+    with _count_lock:
+        if tracer.enabled != enabled:
+            _enabled_tracers += 1 if enabled else -1
+        tracer.enabled = enabled
+
+
+class _Sampler(threading.Thread):
+    """Samples the stacks of threads that are inside a span"""
+
+    def __init__(self, tracer, interval):
+        super().__init__(name='trace-sampler', daemon=True)
+        self.tracer = tracer
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, stack in list(self.tracer._stacks.items()):
+                if not stack or ident not in frames:
+                    continue
+                names = []
+                frame = frames[ident]
+                while frame is not None and len(names) < PROFILE_DEPTH:
+                    code = frame.f_code
+                    names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                    frame = frame.f_back
+                key = ';'.join([s['name'] for s in stack] + names[::-1])
+                with self.tracer._lock:
+                    self.tracer.samples[key] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+TRACER = Tracer()
+
+
+def current_tracer():
+    """The tracer installed on this thread by ``use_tracer``, else ``TRACER``"""
+    return getattr(_local, 'tracer', None) or TRACER
+
+
+@contextlib.contextmanager
+def use_tracer(tracer):
+    """Route spans recorded on this thread to ``tracer`` (e.g. one per app session)"""
+    previous = getattr(_local, 'tracer', None)
+    _local.tracer = tracer
+    try:
+        yield tracer
+    finally:
+        _local.tracer = previous
+
+
+def span(name, rows=None):
+    """Context manager timing a block; set ``rows`` on the yielded dict"""
+    return current_tracer().span(name, rows)
+
+
+def _row_count(result):
+    if isinstance(result, (pd.DataFrame, pd.Series)) or getattr(result, 'ndim', 0) > 0:
+        return len(result)
+    return None
+
+
+def instrument(name=None, rows=None):
+    """Decorator recording a span per call
+
+    ``rows`` maps the return value to a row count; by default frames,
+    series and arrays report their length. When tracing is off the wrapper
+    only checks one flag before calling through.
+    """
+    def decorator(func):
+        label = name or func.__qualname__
+        count = rows or _row_count
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled_tracers:
+                return func(*args, **kwargs)
+            tracer = current_tracer()
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(label) as record:
+                result = func(*args, **kwargs)
+                record['rows'] = count(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def load_trace(source):
+    """Spans from a trace written by ``Tracer.export`` (a path or an open file)"""
+    name = str(getattr(source, 'name', source))
+    if name.endswith('.csv'):
+        return pd.read_csv(source)
+    if hasattr(source, 'read'):
+        payload = json.load(source)
+    else:
+        with open(source) as f:
+            payload = json.load(f)
+    return pd.DataFrame(payload['spans'], columns=SPAN_COLUMNS)
+
+
+def summarize(spans):
+    """Totals per span name: calls, wall and CPU seconds, peak MB, rows"""
+    if spans.empty:
+        return pd.DataFrame(columns=['calls', 'wall_s', 'cpu_s', 'peak_mb', 'rows'])
+    grouped = spans.groupby('name', sort=False)
+    return pd.DataFrame({
+        'calls': grouped.size(),
+        'wall_s': grouped['wall_s'].sum(),
+        'cpu_s': grouped['cpu_s'].sum(),
+        'peak_mb': grouped['peak_mb'].max(),
+        'rows': grouped['rows'].sum(min_count=1),
+    }).sort_values('wall_s', ascending=False)
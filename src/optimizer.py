@@ -0,0 +1,173 @@
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import BACKTEST_MODES, TRADING_DAYS, backtest_returns
+from src.data_loader import SIGNAL_WEIGHTS, SIGNAL_WINDOW, add_spreads
+
+# Default search grid around the hard-coded process_signals parameters
+SWEEP_WINDOWS = (63, SIGNAL_WINDOW, 252)
+SWEEP_WEIGHTS = ((0.5, 0.5), SIGNAL_WEIGHTS, (0.9, 0.1), (1.0, 0.0))
+SWEEP_CAPS = (1.0, 2.0, 3.0)
+
+# Columns of the panel shared with workers
+PANEL_COLUMNS = ['quality_spread', 'term_spread', 'target_return']
+
+SWEEP_COLUMNS = ['fold', 'window', 'weight_quality', 'weight_term', 'cap', 'train_sharpe', 'test_sharpe']
+
+# Per-process state: the attached panel and rolling z-scores by window
+_PANEL = None
+_SHM = None
+_ROLLING_CACHE = {}
+
+
+def walk_forward_folds(n, n_folds, start=0):
+    """(train, test) position slices for expanding-window walk-forward folds
+
+    Bars [start, n) are split into n_folds + 1 equal blocks; fold k trains on
+    every block up to k and tests on block k + 1.
+    """
+    edges = np.linspace(start, n, n_folds + 2).astype(np.int64)
+    return [(slice(start, edges[k + 1]), slice(edges[k + 1], edges[k + 2])) for k in range(n_folds)]
+
+
+def _sharpe(returns):
+    std = returns.std(axis=0, ddof=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(std > 0, returns.mean(axis=0) / std * np.sqrt(TRADING_DAYS), np.nan)
+
+
+def _init_worker(panel=None, shm_name=None, shape=None):
+    """Attach the panel: in-process directly, in a worker through shared memory"""
+    global _PANEL, _SHM
+    _ROLLING_CACHE.clear()
+    if shm_name is None:
+        _PANEL = panel
+        return
+    _SHM = shared_memory.SharedMemory(name=shm_name)
+    _PANEL = np.ndarray(shape, dtype=np.float64, buffer=_SHM.buf)
+
+
+def _rolling_z(window):
+    """Rolling z-scores of both spreads, computed once per window per process"""
+    if window not in _ROLLING_CACHE:
+        spreads = pd.DataFrame(_PANEL[:, :2])
+        rolling = spreads.rolling(window)
+        _ROLLING_CACHE[window] = ((spreads - rolling.mean()) / rolling.std()).to_numpy()
+    return _ROLLING_CACHE[window]
+
+
+def _evaluate(window, cap, weights, folds, cost_bps, legs):
+    """Train/test Sharpe of every weight pair for one (window, cap) on every fold"""
+    z = _rolling_z(window)
+    signals = z @ np.asarray(weights, dtype=np.float64).T
+    net = backtest_returns(signals, _PANEL[:, 2], cap, cost_bps, legs)[-1]
+
+    rows = []
+    for fold, (train, test) in enumerate(folds):
+        train_sharpe, test_sharpe = _sharpe(net[train]), _sharpe(net[test])
+        for i, (wq, wt) in enumerate(weights):
+            rows.append((fold, window, wq, wt, cap, train_sharpe[i], test_sharpe[i]))
+    return rows
+
+
+class SignalSweep:
+    """Walk-forward grid search over the composite signal's parameters
+
+    Each (window, weights, cap) combination is backtested with
+    ``backtest_returns`` and scored by Sharpe on every fold's train and test
+    bars. Folds start once the longest window has warmed up, so every
+    combination is scored on the same bars.
+
+    The spreads and target returns are placed in one shared-memory block that
+    worker processes attach to instead of receiving a pickled copy per task.
+    Tasks are (window, cap) pairs; each worker caches its rolling z-scores by
+    window and scores all weight pairs in one matrix product.
+    """
+
+    def __init__(self, raw_data, windows=SWEEP_WINDOWS, weights=SWEEP_WEIGHTS, caps=SWEEP_CAPS,
+                 n_folds=4, mode='long_short', risk_asset='HYG', hedge_asset='LQD', cost_bps=1.0):
+        if mode not in BACKTEST_MODES:
+            raise ValueError(f"Unknown backtest mode: {mode}")
+        self.windows = tuple(windows)
+        self.weights = tuple(tuple(w) for w in weights)
+        self.caps = tuple(caps)
+        self.cost_bps = cost_bps
+        self.legs = 2 if mode == 'market_neutral' else 1
+
+        data = add_spreads(raw_data.copy())
+        returns = data[[risk_asset, hedge_asset]].pct_change().fillna(0.0)
+        target = returns[risk_asset]
+        if mode == 'market_neutral':
+            target = target - returns[hedge_asset]
+        self.index = data.index
+        self.panel = np.column_stack([
+            data['quality_spread'].to_numpy(dtype=np.float64),
+            data['term_spread'].to_numpy(dtype=np.float64),
+            target.to_numpy(dtype=np.float64),
+        ])
+        self.folds = walk_forward_folds(len(data), n_folds, start=max(self.windows))
+        self.results = None
+
+    def _tasks(self):
+        return list(itertools.product(self.windows, self.caps))
+
+    def run(self, workers=None):
+        """Score the full grid; ``workers=1`` runs in-process"""
+        tasks = self._tasks()
+        args = [(w, c, self.weights, self.folds, self.cost_bps, self.legs) for w, c in tasks]
+
+        if workers == 1:
+            _init_worker(self.panel)
+            try:
+                rows = [_evaluate(*a) for a in args]
+            finally:
+                _init_worker(None)
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=self.panel.nbytes)
+            try:
+                np.ndarray(self.panel.shape, dtype=np.float64, buffer=shm.buf)[:] = self.panel
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=(None, shm.name, self.panel.shape)) as pool:
+                    rows = list(pool.map(_evaluate, *zip(*args)))
+            finally:
+                shm.close()
+                shm.unlink()
+
+        self.results = pd.DataFrame([r for chunk in rows for r in chunk], columns=SWEEP_COLUMNS)
+        return self
+
+    def best_params(self):
+        """Best-in-train parameters for each fold with their out-of-sample Sharpe
+
+        Folds where no combination has a train Sharpe are left out.
+        """
+        if self.results is None:
+            self.run()
+        scored = self.results.dropna(subset=['train_sharpe'])
+        best = scored.loc[scored.groupby('fold')['train_sharpe'].idxmax()].set_index('fold')
+        ends = pd.DataFrame({
+            'train_end': [self.index[train.stop - 1] for train, _ in self.folds],
+            'test_end': [self.index[test.stop - 1] for _, test in self.folds],
+        })
+        best[['train_end', 'test_end']] = ends.reindex(best.index)
+        return best
+
+    def scaling_curve(self, worker_counts=None):
+        """Wall time and speedup of a full sweep for each worker count"""
+        if worker_counts is None:
+            cpus = os.cpu_count() or 1
+            worker_counts = sorted({1, *[2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus], cpus})
+        timings = {}
+        for n in worker_counts:
+            start = time.perf_counter()
+            self.run(workers=n)
+            timings[n] = time.perf_counter() - start
+        curve = pd.DataFrame({'seconds': pd.Series(timings)}).rename_axis('workers')
+        curve['speedup'] = curve['seconds'].iloc[0] / curve['seconds']
+        return curve
@@ -0,0 +1,452 @@
+import bisect
+import heapq
+import itertools
+import math
+from collections import deque
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.execution_engine import MID_PRICE
+from src.fills import _epoch_ns
+
+BUY, SELL = 1, -1
+
+# Order id of anonymous market liquidity in the book
+BACKGROUND = 0
+
+TICK = 0.01
+
+# Levels per side rebuilt from each top-of-book quote: the quoted size at
+# the touch and DEPTH_SIZE shares on each level behind it
+DEPTH_LEVELS = 5
+DEPTH_SIZE = 2000
+
+# Liquidity taken by agent orders refills with this e-folding time
+RESILIENCE = timedelta(seconds=10)
+
+# Share of how far an agent order walked the book that never reverts
+PERMANENT_IMPACT = 0.25
+
+ORDER_LATENCY = timedelta(milliseconds=1)
+
+# Synthetic stream: events per second, share of trade prints, touch size
+EVENT_RATE = 100
+TRADE_SHARE = 0.3
+TOUCH_SIZE = 2000
+
+
+def _ns(delta):
+    return int(delta.total_seconds() * 1e9)
+
+
+class QuoteStream:
+    """Top-of-book quotes and trade prints as flat arrays on one ns clock
+
+    Prices are integer ticks. Trades carry the aggressor side (BUY lifts the
+    ask, SELL hits the bid).
+    """
+
+    def __init__(self, quote_time, bid, ask, bid_size, ask_size,
+                 trade_time=(), trade_price=(), trade_size=(), trade_side=(), symbol=None):
+        self.quote_time = np.asarray(quote_time, dtype=np.int64)
+        self.bid = np.asarray(bid, dtype=np.int64)
+        self.ask = np.asarray(ask, dtype=np.int64)
+        self.bid_size = np.asarray(bid_size, dtype=np.int64)
+        self.ask_size = np.asarray(ask_size, dtype=np.int64)
+        self.trade_time = np.asarray(trade_time, dtype=np.int64)
+        self.trade_price = np.asarray(trade_price, dtype=np.int64)
+        self.trade_size = np.asarray(trade_size, dtype=np.int64)
+        self.trade_side = np.asarray(trade_side, dtype=np.int64)
+        self.symbol = symbol
+
+    def __len__(self):
+        return len(self.quote_time) + len(self.trade_time)
+
+    @classmethod
+    def from_frame(cls, quotes, trades=None, symbol=None):
+        """Stream from recorded quotes (timestamp, bid, ask, bid_size, ask_size)
+        and optional trades (timestamp, price, shares, side)"""
+        quotes = quotes.sort_values('timestamp', kind='stable')
+        trade_columns = {}
+        if trades is not None and len(trades):
+            trades = trades.sort_values('timestamp', kind='stable')
+            trade_columns = {
+                'trade_time': _epoch_ns(trades['timestamp']),
+                'trade_price': np.round(trades['price'].to_numpy() / TICK),
+                'trade_size': trades['shares'].to_numpy(),
+                'trade_side': trades['side'].to_numpy(),
+            }
+        return cls(_epoch_ns(quotes['timestamp']), np.round(quotes['bid'].to_numpy() / TICK),
+                   np.round(quotes['ask'].to_numpy() / TICK), quotes['bid_size'].to_numpy(),
+                   quotes['ask_size'].to_numpy(), symbol=symbol, **trade_columns)
+
+    @classmethod
+    def synthetic(cls, n_events, seed=None, start=None, symbol=None, mid=MID_PRICE,
+                  event_rate=EVENT_RATE, trade_share=TRADE_SHARE, touch_size=TOUCH_SIZE):
+        """Random-walk quotes with Poisson arrivals, generated in one vectorized pass"""
+        rng = np.random.default_rng(seed)
+        start = pd.Timestamp(start if start is not None else '2024-01-02 14:30', tz='UTC')
+        time = start.value + np.cumsum(rng.exponential(1e9 / event_rate, n_events)).astype(np.int64)
+
+        is_trade = rng.random(n_events) < trade_share
+        # Quotes move the bid a tick at a time; the spread is one or two ticks
+        steps = np.where(is_trade, 0, rng.choice([-1, 0, 1], n_events, p=[0.01, 0.98, 0.01]))
+        bid = round(mid / TICK) + np.cumsum(steps)
+        ask = bid + np.where(rng.random(n_events) < 0.8, 1, 2)
+        bid_size = rng.integers(1, 2 * touch_size // 100, n_events) * 100
+        ask_size = rng.integers(1, 2 * touch_size // 100, n_events) * 100
+
+        side = np.where(rng.random(n_events) < 0.5, BUY, SELL)
+        trade_size = np.minimum(rng.geometric(0.3, n_events) * 100, np.where(side == BUY, ask_size, bid_size))
+        quote, trade = ~is_trade, is_trade
+        return cls(time[quote], bid[quote], ask[quote], bid_size[quote], ask_size[quote],
+                   time[trade], np.where(side == BUY, ask, bid)[trade], trade_size[trade], side[trade],
+                   symbol=symbol)
+
+
+class OrderBook:
+    """Price-level limit order book with a FIFO queue per level
+
+    Each side keeps its integer tick prices in a sorted list (bisect insert
+    and delete) and a deque of ``[order_id, shares]`` entries per price, so
+    queue position is the shares ahead in that deque. ``BACKGROUND`` entries
+    are anonymous market liquidity; other ids are agent orders.
+    """
+
+    def __init__(self):
+        self._prices = {BUY: [], SELL: []}
+        self._levels = {BUY: {}, SELL: {}}
+        # Resting agent orders: order_id -> (side, tick)
+        self.orders = {}
+
+    def best(self, side):
+        """Best bid (BUY) or ask (SELL) tick, None if that side is empty"""
+        prices = self._prices[side]
+        if not prices:
+            return None
+        return prices[-1] if side == BUY else prices[0]
+
+    def prices(self, side):
+        return list(self._prices[side])
+
+    def depth(self, side, tick):
+        return sum(entry[1] for entry in self._levels[side].get(tick, ()))
+
+    def add(self, side, tick, shares, order_id=BACKGROUND):
+        """Join the back of the queue at ``tick`` (no matching)"""
+        level = self._levels[side].get(tick)
+        if level is None:
+            level = self._levels[side][tick] = deque()
+            bisect.insort(self._prices[side], tick)
+        level.append([order_id, shares])
+        if order_id != BACKGROUND:
+            self.orders[order_id] = (side, tick)
+
+    def cancel(self, order_id):
+        """Remove a resting agent order; returns its unfilled shares"""
+        side, tick = self.orders.pop(order_id)
+        level = self._levels[side][tick]
+        for entry in level:
+            if entry[0] == order_id:
+                level.remove(entry)
+                break
+        if not level:
+            self._drop_level(side, tick)
+        return entry[1]
+
+    def queue_ahead(self, order_id):
+        """Shares in front of a resting agent order at its price"""
+        side, tick = self.orders[order_id]
+        ahead = 0
+        for entry_id, shares in self._levels[side][tick]:
+            if entry_id == order_id:
+                return ahead
+            ahead += shares
+
+    def set_background(self, side, tick, shares):
+        """Set the anonymous liquidity at one price
+
+        Additions join the back of the queue and reductions come off the
+        back, so agent orders keep their place.
+        """
+        level = self._levels[side].get(tick)
+        if level is None:
+            if shares > 0:
+                self.add(side, tick, shares)
+            return
+        current = sum(entry[1] for entry in level if entry[0] == BACKGROUND)
+        if shares > current:
+            if level[-1][0] == BACKGROUND:
+                level[-1][1] += shares - current
+            else:
+                level.append([BACKGROUND, shares - current])
+        elif shares < current:
+            excess = current - shares
+            for entry in reversed(level):
+                if entry[0] == BACKGROUND:
+                    cut = min(excess, entry[1])
+                    entry[1] -= cut
+                    excess -= cut
+                    if not excess:
+                        break
+            level = self._levels[side][tick] = deque(entry for entry in level if entry[1] > 0)
+            if not level:
+                self._drop_level(side, tick)
+
+    def take(self, side, shares, limit=None):
+        """Match an incoming ``side`` order against the opposite side
+
+        Walks price levels from the best, FIFO within a level, stopping at
+        ``limit`` (a tick; None sweeps as deep as needed). Returns the fills
+        as (resting order_id, tick, shares) and the unfilled shares.
+        """
+        book = -side
+        prices = self._prices[book]
+        levels = self._levels[book]
+        fills = []
+        while shares > 0 and prices:
+            tick = prices[-1] if book == BUY else prices[0]
+            if limit is not None and (tick > limit if side == BUY else tick < limit):
+                break
+            level = levels[tick]
+            while shares > 0 and level:
+                entry = level[0]
+                filled = min(shares, entry[1])
+                fills.append((entry[0], tick, filled))
+                entry[1] -= filled
+                shares -= filled
+                if not entry[1]:
+                    level.popleft()
+                    if entry[0] != BACKGROUND:
+                        del self.orders[entry[0]]
+            if not level:
+                self._drop_level(book, tick)
+        return fills, shares
+
+    def _drop_level(self, side, tick):
+        del self._levels[side][tick]
+        prices = self._prices[side]
+        del prices[bisect.bisect_left(prices, tick)]
+
+
+class MarketSimulator:
+    """Event-driven market replaying a QuoteStream through an OrderBook
+
+    Agents (execution algos) schedule callbacks on the simulated clock and
+    send orders with ``submit``; a heap keeps their events in time order
+    with a sequence number breaking ties. Before each agent event the stream
+    is replayed up to its time. While agent orders rest in the book, every
+    quote and trade is applied in turn, so queue position, partial fills and
+    fills from the market moving through a price follow the stream.
+    Otherwise nothing in the book can fill and the replay jumps straight to
+    the latest quote, which is what lets idle stretches of a long stream
+    pass at millions of events per second.
+
+    Each quote rebuilds ``depth_levels`` levels per side, the quoted size
+    at the touch and ``depth_size`` behind it. Liquidity taken by agent
+    orders is missing from later quotes and refills with an e-folding time
+    of ``resilience`` (temporary impact); ``permanent_impact`` of how far an
+    order walked past the touch shifts every later price in the stream.
+    """
+
+    def __init__(self, stream, depth_levels=DEPTH_LEVELS, depth_size=DEPTH_SIZE, resilience=RESILIENCE,
+                 permanent_impact=PERMANENT_IMPACT, latency=ORDER_LATENCY):
+        self.stream = stream
+        self.symbol = stream.symbol
+        self.depth_levels = depth_levels
+        self.depth_size = depth_size
+        self.resilience = _ns(resilience)
+        self.permanent_impact = permanent_impact
+        self.latency = _ns(latency)
+        self.book = OrderBook()
+        # Permanent impact in ticks, added to every stream price
+        self.offset = 0.0
+        # Stream events replayed so far
+        self.events = 0
+        self._heap = []
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._on_fill = {}
+        self._taken = {BUY: (0.0, 0), SELL: (0.0, 0)}
+        self._quote = -1
+        self._trade = 0
+        # Per side, touch of the last full rebuild (None while liquidity is missing)
+        self._touch = {BUY: None, SELL: None}
+        self.now = int(stream.quote_time[0]) if len(stream.quote_time) else 0
+        if len(stream.quote_time):
+            self.events += 1
+            self._apply_quote(0)
+
+    @property
+    def mid(self):
+        """Stream mid price including permanent impact"""
+        i = self._quote
+        return float(self.stream.bid[i] + self.stream.ask[i]) / 2 * TICK + round(self.offset) * TICK
+
+    def schedule(self, when, callback, *args):
+        """Call ``callback(*args)`` at ``when`` (ns since epoch, UTC)"""
+        heapq.heappush(self._heap, (max(when, self.now), next(self._seq), callback, args))
+
+    def submit(self, side, shares, limit=None, on_fill=None):
+        """Send an order that reaches the book after the latency; returns its id
+
+        Market orders (``limit=None``) sweep the opposite side and drop any
+        unfilled shares. The unfilled part of a limit order rests in the
+        book. ``on_fill(fill)`` gets a fill dict for every execution.
+        """
+        order_id = next(self._ids)
+        self.schedule(self.now + self.latency, self._arrive, order_id, side, shares, limit, on_fill)
+        return order_id
+
+    def cancel(self, order_id):
+        """Pull a resting order once the cancel reaches the book"""
+        self.schedule(self.now + self.latency, self._cancel, order_id)
+
+    def run(self, until=None):
+        """Process agent events in time order (up to ``until`` ns, if given)"""
+        while self._heap or until is not None:
+            when = self._heap[0][0] if self._heap else until
+            if until is not None and when > until:
+                when = until
+            if not self._advance(when):
+                # A fill scheduled an agent event before ``when``
+                continue
+            self.now = max(self.now, when)
+            if self._heap and self._heap[0][0] <= when:
+                _, _, callback, args = heapq.heappop(self._heap)
+                callback(*args)
+            else:
+                break
+        return self
+
+    def _arrive(self, order_id, side, shares, limit, on_fill):
+        tick = None if limit is None else round(limit / TICK)
+        touch = self.book.best(-side)
+        # Fills report the mid the order arrived at, before its own impact
+        mid = self.mid
+        fills, unfilled = self.book.take(side, shares, limit=tick)
+        if fills:
+            self._deplete(-side, shares - unfilled)
+            # Part of the walk through the book never reverts
+            self.offset += self.permanent_impact * (fills[-1][1] - touch)
+            for _, filled_at, filled in fills:
+                self._notify(on_fill, order_id, filled_at, filled, side, mid)
+            self._report(fills, -side, mid)
+        if unfilled and tick is not None:
+            self.book.add(side, tick, unfilled, order_id)
+            self._on_fill[order_id] = on_fill
+
+    def _cancel(self, order_id):
+        if order_id in self.book.orders:
+            self.book.cancel(order_id)
+            self._on_fill.pop(order_id, None)
+
+    def _deplete(self, side, shares):
+        self._taken[side] = (self._remaining_taken(side) + shares, self.now)
+        self._touch[side] = None
+
+    def _remaining_taken(self, side):
+        shares, since = self._taken[side]
+        if not shares:
+            return 0
+        shares = int(shares * math.exp(-(self.now - since) / self.resilience))
+        if not shares:
+            self._taken[side] = (0.0, 0)
+        return shares
+
+    def _report(self, fills, side, mid=None):
+        """Fill callbacks for the resting agent orders among ``fills``"""
+        for order_id, tick, shares in fills:
+            if order_id == BACKGROUND:
+                continue
+            if order_id in self.book.orders:
+                callback = self._on_fill.get(order_id)
+            else:
+                callback = self._on_fill.pop(order_id, None)
+            self._notify(callback, order_id, tick, shares, side, mid)
+
+    def _notify(self, callback, order_id, tick, shares, side, mid=None):
+        if callback is None:
+            return
+        callback({
+            'order_id': order_id,
+            'timestamp': pd.Timestamp(self.now, tz='UTC'),
+            'symbol': self.symbol,
+            'price': tick * TICK,
+            'shares': shares,
+            'mid': self.mid if mid is None else mid,
+            'side': side,
+        })
+
+    def _advance(self, when):
+        """Replay the stream up to ``when``; False if stopped early for an agent event"""
+        s = self.stream
+        quote_end = int(np.searchsorted(s.quote_time, when, side='right'))
+        trade_end = int(np.searchsorted(s.trade_time, when, side='right'))
+
+        # Event by event only while agent orders rest in the book
+        while self.book.orders and (self._quote + 1 < quote_end or self._trade < trade_end):
+            q = self._quote + 1
+            self.events += 1
+            if self._trade < trade_end and (q >= quote_end or s.trade_time[self._trade] <= s.quote_time[q]):
+                self._apply_trade(self._trade)
+            else:
+                self._apply_quote(q)
+            if self._heap and self._heap[0][0] < when:
+                return False
+
+        # Nothing resting can fill: only the latest quote matters
+        self.events += (quote_end - 1 - self._quote) + (trade_end - self._trade)
+        if quote_end - 1 > self._quote:
+            self._apply_quote(quote_end - 1)
+        self._trade = max(self._trade, trade_end)
+        return True
+
+    def _apply_trade(self, j):
+        s = self.stream
+        self._trade = j + 1
+        self.now = int(s.trade_time[j])
+        side = int(s.trade_side[j])
+        fills, _ = self.book.take(side, int(s.trade_size[j]), limit=int(s.trade_price[j]) + round(self.offset))
+        self._report(fills, -side)
+
+    def _apply_quote(self, i):
+        s = self.stream
+        self._quote = i
+        self.now = int(s.quote_time[i])
+        shift = round(self.offset)
+        touch = (int(s.bid[i]) + shift, int(s.ask[i]) + shift)
+        sizes = {BUY: int(s.bid_size[i]), SELL: int(s.ask_size[i])}
+        taken = {side: self._remaining_taken(side) for side in (BUY, SELL)}
+
+        levels = {}
+        for side, best in zip((BUY, SELL), touch):
+            if best == self._touch[side]:
+                # Same price and full depth behind: only the touch size changes
+                levels[side] = {best: sizes[side]}
+                continue
+            self._touch[side] = None if taken[side] else best
+            levels[side] = {}
+            for k in range(self.depth_levels):
+                size = sizes[side] if k == 0 else self.depth_size
+                # Taken liquidity is missing from the touch outwards
+                missing = min(taken[side], size)
+                taken[side] -= missing
+                levels[side][best - side * k] = size - missing
+
+        # Clear stale levels on both sides first so only agent orders can cross
+        for side in (BUY, SELL):
+            if len(levels[side]) > 1:
+                for tick in self.book.prices(side):
+                    if tick not in levels[side]:
+                        self.book.set_background(side, tick, 0)
+
+        for side in (BUY, SELL):
+            for tick, shares in levels[side].items():
+                # A quote through a resting agent order means it traded
+                if self.book.orders:
+                    fills, shares = self.book.take(side, shares, limit=tick)
+                    self._report(fills, -side)
+                self.book.set_background(side, tick, shares)
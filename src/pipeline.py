@@ -0,0 +1,290 @@
+import ast
+import functools
+import hashlib
+import importlib.util
+import inspect
+import os
+import pickle
+import textwrap
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import DEFAULT_CACHE_DIR, prune_cache
+from src.instrumentation import span
+
+DEFAULT_PIPELINE_CACHE = os.path.join(DEFAULT_CACHE_DIR, 'pipeline')
+
+# Memoized stage results kept on disk, least recently used dropped first
+DEFAULT_CACHE_ENTRIES = 256
+
+# Part of every stage key: bump to invalidate all memoized results
+CACHE_VERSION = 1
+
+REPORT_COLUMNS = ['stage', 'status', 'start', 'seconds', 'key']
+
+_MISSING = object()
+
+
+def content_hash(value):
+    """Stable digest of a stage input: frames, arrays, containers or picklable objects"""
+    h = hashlib.sha1()
+    _update_hash(h, value)
+    return h.hexdigest()
+
+
+def _update_hash(h, value):
+    h.update(type(value).__name__.encode())
+    if isinstance(value, pd.DataFrame):
+        h.update(repr(list(value.columns)).encode())
+        h.update(repr(value.dtypes.tolist()).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        h.update(repr((value.name, str(value.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(repr((value.shape, str(value.dtype))).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for k in sorted(value, key=repr):
+            _update_hash(h, k)
+            _update_hash(h, value[k])
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _update_hash(h, item)
+    elif value is None or isinstance(value, (str, bytes, int, float, bool, pd.Timestamp)):
+        h.update(repr(value).encode())
+    else:
+        h.update(pickle.dumps(value))
+
+
+def code_hash(func):
+    """Digest of a function's or module's source (its name if none is available)"""
+    try:
+        return hashlib.sha1(inspect.getsource(func).encode()).hexdigest()
+    except (OSError, TypeError):
+        return func.__qualname__
+
+
+def _imports(tree):
+    """Absolute module names an AST imports, including ``from pkg import module``"""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            yield from (alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            yield node.module
+            yield from (f'{node.module}.{alias.name}' for alias in node.names)
+
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path, mtime_ns, size):
+    """Source digest and imports of one module file, reparsed only when it changes"""
+    with open(path, 'rb') as f:
+        source = f.read()
+    return hashlib.sha1(source).hexdigest(), tuple(_imports(ast.parse(source)))
+
+
+def _local_origin(name, root):
+    """Source file of module ``name`` if it lives under ``root``, else None
+
+    Only the top-level package is looked up through the import system,
+    which imports nothing; submodules are resolved on disk, so neither
+    third-party packages nor the modules being hashed are loaded.
+    """
+    parts = name.split('.')
+    try:
+        spec = importlib.util.find_spec(parts[0])
+    except (ImportError, ValueError):
+        return None
+    if spec is None:
+        return None
+    origin, locations = spec.origin, list(spec.submodule_search_locations or [])
+    for part in parts[1:]:
+        origin, found = None, []
+        for location in locations:
+            if os.path.isfile(os.path.join(location, part + '.py')):
+                origin = os.path.join(location, part + '.py')
+                break
+            if os.path.isdir(os.path.join(location, part)):
+                found.append(os.path.join(location, part))
+                init = os.path.join(location, part, '__init__.py')
+                origin = init if os.path.isfile(init) else None
+        locations = found
+    if not origin or not origin.endswith('.py') or 'site-packages' in origin:
+        return None
+    return origin if os.path.abspath(origin).startswith(root) else None
+
+
+def _dependency_hash(func):
+    """Digest of a stage function and of the local modules it imports
+
+    Stage functions are thin wrappers that import their implementation, so
+    the source of every module under the function's own directory that it
+    imports, directly or through other such modules, is part of the digest.
+    """
+    try:
+        source = textwrap.dedent(inspect.getsource(func))
+        root = os.path.dirname(os.path.abspath(inspect.getsourcefile(func))) + os.sep
+    except (OSError, TypeError):
+        return func.__qualname__
+    h = hashlib.sha1(source.encode())
+    seen, todo = set(), list(_imports(ast.parse(source)))
+    while todo:
+        name = todo.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        origin = _local_origin(name, root)
+        if origin is None:
+            continue
+        stat = os.stat(origin)
+        digest, imports = _file_digest(origin, stat.st_mtime_ns, stat.st_size)
+        h.update(f'{name}:{digest}'.encode())
+        todo += imports
+    return h.hexdigest()
+
+
+class Stage:
+    """One pipeline step: ``func(*inputs)`` producing the named ``outputs``
+
+    A stage with several outputs returns a tuple in the same order. Stages
+    with ``cache=False`` (network reads, random simulations) always run.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=None, cache=True):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs) if outputs else (name,)
+        self.cache = cache
+
+    def key(self, values):
+        """Content hash of the stage code, the local modules it imports and its inputs"""
+        return content_hash([CACHE_VERSION, self.name, _dependency_hash(self.func),
+                             [values[i] for i in self.inputs]])
+
+
+def _call(name, func, args):
+    with span(f'stage:{name}'):
+        return func(*args)
+
+
+class Pipeline:
+    """Run stages as a DAG, in parallel where dependencies allow
+
+    A stage starts as soon as all its inputs exist, on a thread pool (or a
+    process pool with ``executor='process'``, which needs module-level stage
+    functions). Results are memoized on disk by ``Stage.key`` so a rerun
+    with unchanged inputs and code skips the stage; only the
+    ``max_entries`` most recently used results are kept. ``run`` leaves a
+    per-stage timing table in ``report``.
+    """
+
+    def __init__(self, stages, cache_dir=DEFAULT_PIPELINE_CACHE, workers=4, executor='thread',
+                 max_entries=DEFAULT_CACHE_ENTRIES):
+        self.stages = {s.name: s for s in stages}
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.workers = workers
+        self.executor = executor
+        self.report = None
+
+        self.producers = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in self.producers:
+                    raise ValueError(f"Output {output!r} produced by both {self.producers[output]} and {stage.name}")
+                self.producers[output] = stage.name
+
+    def _required(self, targets):
+        """Stages needed to produce ``targets`` (all stages if None)"""
+        if targets is None:
+            return set(self.stages)
+        needed, todo = set(), [self.producers[t] for t in targets]
+        while todo:
+            name = todo.pop()
+            if name in needed:
+                continue
+            needed.add(name)
+            todo += [self.producers[i] for i in self.stages[name].inputs if i in self.producers]
+        return needed
+
+    def _cache_path(self, stage, key):
+        return os.path.join(self.cache_dir, f'{stage.name}-{key}.pkl') if self.cache_dir else None
+
+    def _load_cached(self, stage, key):
+        path = self._cache_path(stage, key)
+        if not stage.cache or path is None or not os.path.exists(path):
+            return _MISSING
+        with open(path, 'rb') as f:
+            result = pickle.load(f)
+        os.utime(path)  # mark as recently used for pruning
+        return result
+
+    def _store(self, stage, key, result):
+        path = self._cache_path(stage, key)
+        if not stage.cache or path is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+        prune_cache(self.cache_dir, self.max_entries, suffix='.pkl')
+
+    def _publish(self, stage, result, values):
+        if len(stage.outputs) == 1:
+            result = (result,)
+        values.update(zip(stage.outputs, result))
+
+    def run(self, targets=None, **params):
+        """Run the stages needed for ``targets`` and return every value produced"""
+        values = dict(params)
+        pending = self._required(targets)
+        for name in pending:
+            missing = [i for i in self.stages[name].inputs if i not in self.producers and i not in values]
+            if missing:
+                raise ValueError(f"Stage {name} needs inputs {missing} that no stage or parameter provides")
+
+        rows, running = [], {}
+        t0 = time.perf_counter()
+        pool_cls = ProcessPoolExecutor if self.executor == 'process' else ThreadPoolExecutor
+        with pool_cls(max_workers=self.workers) as pool:
+            while pending or running:
+                ready = [n for n in sorted(pending) if all(i in values for i in self.stages[n].inputs)]
+                for name in ready:
+                    pending.discard(name)
+                    stage = self.stages[name]
+                    # Uncached stages skip hashing their (possibly large) inputs
+                    key = stage.key(values) if stage.cache and self.cache_dir else None
+                    start = time.perf_counter()
+                    cached = self._load_cached(stage, key)
+                    if cached is not _MISSING:
+                        self._publish(stage, cached, values)
+                        rows.append((name, 'cached', start - t0, time.perf_counter() - start, key))
+                        continue
+                    future = pool.submit(_call, stage.name, stage.func, [values[i] for i in stage.inputs])
+                    running[future] = (stage, key, start)
+
+                if not running:
+                    # Cached stages may have unblocked others; otherwise nothing can run
+                    if ready:
+                        continue
+                    raise RuntimeError(f"Pipeline stalled with stages {sorted(pending)} unable to run")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, key, start = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception:
+                        rows.append((stage.name, 'failed', start - t0, time.perf_counter() - start, key))
+                        self.report = pd.DataFrame(rows, columns=REPORT_COLUMNS)
+                        raise
+                    rows.append((stage.name, 'ran', start - t0, time.perf_counter() - start, key))
+                    self._store(stage, key, result)
+                    self._publish(stage, result, values)
+
+        self.report = pd.DataFrame(rows, columns=REPORT_COLUMNS).sort_values('start', ignore_index=True)
+        return values
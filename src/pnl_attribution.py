@@ -0,0 +1,312 @@
+import bisect
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import ETF_SYMBOLS, add_spreads
+from src.instrumentation import instrument
+
+# Factor PnL columns in output order
+FACTOR_COLUMNS = ['Equity', 'Rates', 'Credit', 'Vol']
+
+ATTRIBUTION_COLUMNS = ['Execution'] + FACTOR_COLUMNS + ['Residual']
+
+# Yields and spreads in the loader data are quoted in percent
+PERCENT = 0.01
+
+# Capital the streaming equity curve and its returns are measured against
+DEFAULT_CAPITAL = 1_000_000
+
+
+def _fill_days(timestamps):
+    """Calendar day of each fill as naive datetime64, matching the loader index"""
+    ts = pd.DatetimeIndex(timestamps)
+    if ts.tz is not None:
+        ts = ts.tz_convert(None)
+    return ts.normalize().values.astype('datetime64[ns]')
+
+
+def factor_moves_table(factor_data):
+    """Daily factor moves and per-symbol returns from loader data
+
+    Computed once per factor history and shareable across attributors via
+    ``PnLAttributor(..., moves=...)``.
+    """
+    data = factor_data
+    if 'quality_spread' not in data:
+        data = add_spreads(data.copy())
+    moves = pd.DataFrame({
+        'equity': data['SPY'].pct_change(),
+        'rates': data['10y_yield'].diff(),
+        'credit': data['quality_spread'].diff(),
+        'vol': data['vix'].diff(),
+    }, index=data.index)
+    symbols = [s for s in ETF_SYMBOLS if s in data]
+    return moves, data[symbols].pct_change()
+
+
+class PnLAttributor:
+    """Attribute fill PnL to execution quality and market factors
+
+    Each fill is joined to the daily factor moves of the latest date in
+    ``factor_data`` (the loader's processed data) on or before the fill's
+    day, i.e. the close-to-close move of the day it traded, the period the
+    position is held over. Attribution runs after the close, so that move
+    is known:
+
+    - Equity: notional x beta x SPY return
+    - Rates: -notional x duration x change in the 10y yield
+    - Credit: -notional x credit_duration x change in quality_spread
+    - Vol: vega x change in VIX
+
+    Execution is (mid - price) x shares, with shares signed (negative for
+    sells), so crossing the spread is a cost on either side. Residual is
+    the fill's own market PnL (notional x its symbol's return) minus the
+    four factor terms. Fills with no factor moves by their day, or whose
+    symbol has no price history, cannot be explained: ``attribute`` drops
+    them unless ``dropna=False``, which keeps them as NaN rows. Missing
+    sensitivity columns count as zero. Everything is computed as
+    whole-column array operations.
+    """
+
+    def __init__(self, trades, factor_data=None, moves=None):
+        self.trades = trades
+        self.factor_data = factor_data
+        self.moves = moves
+
+    @instrument('attribute')
+    def attribute(self, dropna=True):
+        """Attribute PnL to different factors"""
+        attribution = pd.DataFrame(index=self.trades.index)
+
+        # Execution quality
+        if 'mid' in self.trades and 'price' in self.trades and 'shares' in self.trades:
+            # Signed shares: crossing the spread costs a buy and a sell alike
+            attribution['Execution'] = (self.trades['mid'] - self.trades['price']) * self.trades['shares']
+        else:
+            attribution['Execution'] = 0.0
+
+        if self.factor_data is None or self.factor_data.empty:
+            for col in FACTOR_COLUMNS + ['Residual']:
+                attribution[col] = 0.0
+            return attribution
+
+        if self.moves is None:
+            self.moves = factor_moves_table(self.factor_data)
+        moves, symbol_returns = self.moves
+        row = self._join_rows(moves.index.values.astype('datetime64[ns]'))
+        valid = row >= 0
+
+        def gather(values):
+            out = np.full(len(row), np.nan)
+            out[valid] = values[row[valid]]
+            return out
+
+        notional = self._column('notional', None)
+        if notional is None:
+            notional = self._column('shares', 0.0) * self._column('price', 0.0)
+
+        attribution['Equity'] = notional * self._column('beta', 0.0) * gather(moves['equity'].to_numpy())
+        attribution['Rates'] = -notional * self._column('duration', 0.0) * gather(moves['rates'].to_numpy()) * PERCENT
+        attribution['Credit'] = (
+            -notional * self._column('credit_duration', 0.0) * gather(moves['credit'].to_numpy()) * PERCENT
+        )
+        attribution['Vol'] = self._column('vega', 0.0) * gather(moves['vol'].to_numpy())
+
+        # Own-symbol market move, looked up by (day, symbol) position
+        market = np.full(len(row), np.nan)
+        if 'symbol' in self.trades:
+            codes = pd.Index(symbol_returns.columns).get_indexer(self.trades['symbol'])
+            known = valid & (codes >= 0)
+            returns = symbol_returns.to_numpy()
+            market[known] = notional[known] * returns[row[known], codes[known]]
+        attribution['Residual'] = market - attribution[FACTOR_COLUMNS].sum(axis=1, skipna=False).to_numpy()
+
+        attribution = attribution[ATTRIBUTION_COLUMNS]
+        return attribution.dropna() if dropna else attribution
+
+    def _column(self, name, default):
+        if name in self.trades:
+            return self.trades[name].to_numpy(dtype=np.float64)
+        if default is None:
+            return None
+        return np.full(len(self.trades), default, dtype=np.float64)
+
+    def _join_rows(self, dates):
+        """Row of the latest factor date on or before each fill's day, -1 if none"""
+        return np.searchsorted(dates, self._days(), side='right') - 1
+
+    def _days(self):
+        if 'timestamp' in self.trades:
+            return _fill_days(self.trades['timestamp'])
+        return _fill_days(self.trades.index)
+
+    def summary(self, by='symbol'):
+        """Attribution totals grouped by 'symbol', 'day' or 'order'"""
+        attribution = self.attribute(dropna=False)
+        if by == 'day':
+            keys = self._days()
+        elif by == 'order':
+            keys = self.trades['order_id'].to_numpy()
+        else:
+            keys = self.trades[by].to_numpy()
+        return attribution.groupby(keys).sum(min_count=1)
+
+
+class StreamingPnLAttributor:
+    """Online PnL attribution with O(1)-per-fill rolling statistics
+
+    Consumes fills one at a time (a dict, e.g. as an ExecutionScheduler
+    subscriber) or in micro-batches (a frame), attributes them against factor
+    moves computed once up front, and folds the results into running state:
+    cumulative PnL per component, the equity curve of ``capital`` plus
+    cumulative PnL with its running peak and drawdown, and the running
+    mean/variance (Chan's merge of Welford moments) and win count of per-fill
+    total PnL. ``snapshot()`` reads that state without touching fill history.
+
+    A single dict fill is attributed with scalar arithmetic against the
+    precomputed move arrays and returned as a dict (None when it cannot be
+    explained), with the same results as ``PnLAttributor``; frames go
+    through ``PnLAttributor``.
+
+    ``attributes`` supplies per-order constants (beta, vega, ...) for fills
+    that do not carry them.
+    """
+
+    def __init__(self, factor_data=None, attributes=None, periods_per_year=252, capital=DEFAULT_CAPITAL):
+        self.factor_data = factor_data
+        self.attributes = attributes or {}
+        self.periods_per_year = periods_per_year
+        self.capital = capital
+        has_data = factor_data is not None and not factor_data.empty
+        self.moves = factor_moves_table(factor_data) if has_data else None
+        if self.moves is not None:
+            moves, symbol_returns = self.moves
+            self._dates = moves.index.values.astype('datetime64[ns]').astype(np.int64).tolist()
+            self._factor_rows = moves[['equity', 'rates', 'credit', 'vol']].to_numpy().tolist()
+            self._symbol_returns = symbol_returns.to_numpy().tolist()
+            self._symbol_codes = {s: i for i, s in enumerate(symbol_returns.columns)}
+
+        self._components = [0.0] * len(ATTRIBUTION_COLUMNS)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.wins = 0
+        self.cum_pnl = 0.0
+        self.peak = capital
+        self.max_drawdown = 0.0
+
+    @property
+    def components(self):
+        return pd.Series(self._components, index=ATTRIBUTION_COLUMNS)
+
+    def update(self, fills):
+        """Attribute new fills, fold them into the running state and return them"""
+        if isinstance(fills, dict):
+            return self._update_one({**self.attributes, **fills})
+        missing = {k: v for k, v in self.attributes.items() if k not in fills}
+        if missing:
+            fills = fills.assign(**missing)
+
+        attribution = PnLAttributor(fills, self.factor_data, moves=self.moves).attribute()
+        self._accumulate(attribution)
+        return attribution
+
+    def _update_one(self, fill):
+        """Scalar attribution of one fill, mirroring ``PnLAttributor.attribute``"""
+        if 'mid' in fill and 'price' in fill and 'shares' in fill:
+            execution = (fill['mid'] - fill['price']) * fill['shares']
+        else:
+            execution = 0.0
+
+        if self.moves is None:
+            values = [execution, 0.0, 0.0, 0.0, 0.0, 0.0]
+        else:
+            ts = pd.Timestamp(fill.get('timestamp', 0))
+            if ts.tz is not None:
+                ts = ts.tz_convert(None)
+            row = bisect.bisect_right(self._dates, ts.normalize().value) - 1
+            if row < 0:
+                return None
+            equity, rates, credit, vol = self._factor_rows[row]
+            if 'notional' in fill:
+                notional = float(fill['notional'])
+            else:
+                notional = float(fill.get('shares', 0.0)) * float(fill.get('price', 0.0))
+
+            factors = [
+                notional * fill.get('beta', 0.0) * equity,
+                -notional * fill.get('duration', 0.0) * rates * PERCENT,
+                -notional * fill.get('credit_duration', 0.0) * credit * PERCENT,
+                fill.get('vega', 0.0) * vol,
+            ]
+            code = self._symbol_codes.get(fill.get('symbol'))
+            if code is None:
+                return None
+            market = notional * self._symbol_returns[row][code]
+            values = [execution] + factors + [market - sum(factors)]
+            if any(v != v for v in values):  # NaN moves: not explainable
+                return None
+
+        self._accumulate_one(values)
+        return dict(zip(ATTRIBUTION_COLUMNS, values))
+
+    def _accumulate_one(self, values):
+        for i, v in enumerate(values):
+            self._components[i] += v
+        pnl = sum(values)
+
+        # Welford step for the running mean/variance
+        self.count += 1
+        delta = pnl - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (pnl - self.mean)
+
+        self.wins += pnl > 0
+        self.cum_pnl += pnl
+        equity = self.capital + self.cum_pnl
+        self.peak = max(self.peak, equity)
+        self.max_drawdown = min(self.max_drawdown, equity / self.peak - 1)
+
+    def _accumulate(self, attribution):
+        for i, v in enumerate(attribution.sum().to_numpy()):
+            self._components[i] += v
+        pnl = attribution.sum(axis=1).to_numpy()
+        n = len(pnl)
+        if n == 0:
+            return
+
+        # Merge batch moments into the running mean/variance
+        batch_mean = pnl.mean()
+        batch_m2 = ((pnl - batch_mean) ** 2).sum()
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+        self.wins += int((pnl > 0).sum())
+
+        # Dollar equity curve on top of capital; returns are relative to it
+        equity = self.capital + self.cum_pnl + np.cumsum(pnl)
+        peaks = np.maximum(np.maximum.accumulate(equity), self.peak)
+        self.max_drawdown = min(self.max_drawdown, (equity / peaks - 1).min())
+        self.cum_pnl = equity[-1] - self.capital
+        self.peak = peaks[-1]
+
+    def snapshot(self):
+        """Current running statistics; cost does not depend on fills seen"""
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+        equity = self.capital + self.cum_pnl
+        return {
+            'fills': self.count,
+            'cum_pnl': self.cum_pnl,
+            'components': self.components,
+            'total_return': self.cum_pnl / self.capital,
+            'drawdown': equity / self.peak - 1,
+            'max_drawdown': self.max_drawdown,
+            'mean': self.mean,
+            'std': std,
+            'sharpe': self.mean / std * np.sqrt(self.periods_per_year) if self.count > 1 else np.nan,
+            'win_rate': self.wins / self.count if self.count else np.nan,
+        }
@@ -1 +1,284 @@
-# Placeholder for PDF report generator
+import html
+import inspect
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import DEFAULT_CACHE_DIR, prune_cache
+from src.pipeline import code_hash, content_hash
+from src.visualization import downsample
+
+DEFAULT_REPORT_DIR = os.path.join('data', 'reports')
+DEFAULT_ARTIFACT_CACHE = os.path.join(DEFAULT_CACHE_DIR, 'reports')
+
+# Input data held in memory at once across the books of one batch
+MEMORY_BUDGET_MB = 256
+
+# Cached artifacts kept after a build, least recently used dropped first
+MAX_ARTIFACTS = 4096
+
+# Chart size in inches at 100 dpi; series are downsampled to the pixel width
+FIGURE_SIZE = (9, 3.2)
+CHART_WIDTH = int(FIGURE_SIZE[0] * 100)
+CHART_MARGINS = {'left': 0.1, 'right': 0.98, 'top': 0.9, 'bottom': 0.12}
+
+BUILD_COLUMNS = ['book', 'path', 'sections', 'rendered', 'cached', 'seconds']
+
+PAGE_STYLE = """
+body { font-family: Helvetica, Arial, sans-serif; margin: 2em auto; max-width: 960px; color: #1f2937; }
+h1 { border-bottom: 2px solid #00aeef; padding-bottom: 6px; }
+section { margin-bottom: 2em; }
+table { border-collapse: collapse; font-size: 13px; }
+th, td { padding: 4px 10px; border-bottom: 1px solid #e5e7eb; text-align: right; }
+tr.breach td { color: #ef4444; font-weight: bold; }
+svg { max-width: 100%; height: auto; }
+"""
+
+
+# ----------------------------
+# Section renderers
+# ----------------------------
+# Each takes one input and returns an HTML fragment. They run in worker
+# processes, so they are module-level and import matplotlib themselves.
+
+def _svg(plot):
+    """Draw with ``plot(ax)`` on a fresh figure and return inline SVG"""
+    from matplotlib import rc_context
+    from matplotlib.figure import Figure
+    import io
+
+    # No pyplot: figures are never registered globally, so nothing leaks
+    with rc_context({'svg.fonttype': 'none', 'svg.hashsalt': 'report'}):
+        fig = Figure(figsize=FIGURE_SIZE)
+        # Fixed margins: tight_layout costs a full extra draw per chart
+        fig.subplots_adjust(**CHART_MARGINS)
+        ax = fig.add_subplot()
+        plot(ax)
+        ax.grid(alpha=0.3)
+        buf = io.StringIO()
+        fig.savefig(buf, format='svg', metadata={'Date': None})
+    text = buf.getvalue()
+    return text[text.index('<svg'):]
+
+
+def _line_chart(frame, title):
+    def plot(ax):
+        for column in frame.columns:
+            ax.plot(frame.index, frame[column], linewidth=1, label=column)
+        ax.set_title(title)
+        ax.legend(loc='upper left', fontsize=8)
+    return _svg(plot)
+
+
+def render_signals(processed_data):
+    columns = [c for c in ('quality_spread', 'term_spread', 'signal') if c in processed_data]
+    return _line_chart(downsample(processed_data[columns], width=CHART_WIDTH), "Credit Spread, Term Spread and Signal")
+
+
+def render_pnl_chart(pnl_breakdown):
+    cumulative = pnl_breakdown.cumsum()
+    cumulative['total'] = cumulative.sum(axis=1)
+    return _line_chart(downsample(cumulative, width=CHART_WIDTH), "Cumulative PnL by Factor")
+
+
+def render_pnl_table(pnl_breakdown):
+    table = pd.DataFrame({
+        'total': pnl_breakdown.sum(),
+        'mean': pnl_breakdown.mean(),
+        'vol': pnl_breakdown.std(),
+        'worst_day': pnl_breakdown.min(),
+    })
+    table.loc['total'] = [pnl_breakdown.sum().sum(), np.nan, pnl_breakdown.sum(axis=1).std(),
+                          pnl_breakdown.sum(axis=1).min()]
+    return table.to_html(float_format='{:,.2f}'.format, na_rep='', border=0)
+
+
+def render_risk(limits):
+    """``limits`` has metric, exposure and limit columns (plus any bucket columns)"""
+    table = limits.copy()
+    table['utilisation'] = table['exposure'].abs() / table['limit']
+    rows = []
+    for _, row in table.iterrows():
+        css = ' class="breach"' if row['utilisation'] > 1 else ''
+        cells = ''.join(
+            f'<td>{v:,.2f}</td>' if isinstance(v, (int, float, np.number)) else f'<td>{html.escape(str(v))}</td>'
+            for v in row
+        )
+        rows.append(f'<tr{css}>{cells}</tr>')
+    header = ''.join(f'<th>{html.escape(str(c))}</th>' for c in table.columns)
+    return f'<table><thead><tr>{header}</tr></thead><tbody>{"".join(rows)}</tbody></table>'
+
+
+def render_stress(stress_results):
+    impact = stress_results['PnL Impact']
+
+    def plot(ax):
+        # Room for scenario names on the y axis
+        ax.figure.subplots_adjust(left=0.2)
+        ax.barh(impact.index.astype(str), impact.to_numpy(),
+                color=np.where(impact.to_numpy() < 0, '#ef4444', '#10b981'))
+        ax.set_title("Stress Scenario PnL")
+    return _svg(plot) + stress_results.to_html(float_format='{:,.0f}'.format, border=0)
+
+
+# (title, book key, renderer) in page order; books without a key skip it
+SECTIONS = [
+    ('Market Signals', 'processed_data', render_signals),
+    ('PnL Attribution', 'pnl_breakdown', render_pnl_chart),
+    ('PnL by Factor', 'pnl_breakdown', render_pnl_table),
+    ('Risk Limits', 'risk_limits', render_risk),
+    ('Stress Tests', 'stress_results', render_stress),
+]
+
+
+def risk_limit_frame(exposures, limits):
+    """Exposure against limit per metric, from BarclaysRiskSystem's dicts"""
+    return pd.DataFrame({
+        'metric': list(limits),
+        'exposure': [float(exposures.get(m, 0.0)) for m in limits],
+        'limit': [float(v) for v in limits.values()],
+    })
+
+
+def _render_artifact(renderer, data, path):
+    fragment = renderer(data)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(fragment)
+    os.replace(tmp, path)
+    return path
+
+
+def _nbytes(book):
+    total = 0
+    for value in book.values():
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            total += int(np.sum(value.memory_usage(deep=True)))
+        elif isinstance(value, np.ndarray):
+            total += value.nbytes
+    return total
+
+
+class ReportBuilder:
+    """Self-contained HTML reports for many books, rendered in parallel
+
+    A book is a dict with a ``name`` and any of the inputs in ``SECTIONS``.
+    Every chart or table is an artifact cached on disk under a content hash
+    of its renderer and input data, so a section whose data did not change
+    (e.g. the market signals shared by every book) is rendered once and
+    reused. Books are read lazily from the iterable in batches whose input
+    data stays under ``memory_mb``; each batch's missing artifacts are
+    rendered on a process pool (``workers=1`` renders in-process). After
+    each build the cache is pruned to the ``max_artifacts`` most recently
+    used artifacts.
+    """
+
+    def __init__(self, output_dir=DEFAULT_REPORT_DIR, cache_dir=DEFAULT_ARTIFACT_CACHE, workers=None,
+                 memory_mb=MEMORY_BUDGET_MB, sections=SECTIONS, max_artifacts=MAX_ARTIFACTS):
+        self.output_dir = output_dir
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.memory_mb = memory_mb
+        self.max_artifacts = max_artifacts
+        self.sections = sections
+        self.report = None
+        # Keyed on the renderer's whole module so edits to shared helpers count
+        self._code = {renderer: code_hash(inspect.getmodule(renderer)) for _, _, renderer in sections}
+
+    def build(self, book):
+        """Write one book's report and return its path"""
+        return self.build_many([book])['path'].iloc[0]
+
+    def build_many(self, books):
+        """Write a report per book; returns and keeps a per-book build table"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        rows = []
+        pool = None if self.workers == 1 else ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            for batch in self._batches(books):
+                rows += self._build_batch(batch, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        prune_cache(self.cache_dir, self.max_artifacts, suffix='.html')
+        self.report = pd.DataFrame(rows, columns=BUILD_COLUMNS)
+        return self.report
+
+    def _batches(self, books):
+        budget = self.memory_mb * 1e6
+        batch, size = [], 0
+        for book in books:
+            nbytes = _nbytes(book)
+            if batch and size + nbytes > budget:
+                yield batch
+                batch, size = [], 0
+            batch.append(book)
+            size += nbytes
+        if batch:
+            yield batch
+
+    def _artifact_path(self, renderer, data):
+        key = content_hash((renderer.__name__, self._code[renderer], data))
+        return os.path.join(self.cache_dir, f'{key}.html')
+
+    def _build_batch(self, batch, pool):
+        start = time.perf_counter()
+        plans, todo = [], {}
+        for book in batch:
+            plan = []
+            for title, key, renderer in self.sections:
+                if book.get(key) is None:
+                    continue
+                path = self._artifact_path(renderer, book[key])
+                # Sections shared by several books are rendered for the first one
+                fresh = path not in todo and not os.path.exists(path)
+                if fresh:
+                    todo[path] = (renderer, book[key])
+                elif path not in todo:
+                    os.utime(path)  # mark as recently used for pruning
+                plan.append((title, path, fresh))
+            plans.append(plan)
+
+        if pool is None:
+            for path, (renderer, data) in todo.items():
+                _render_artifact(renderer, data, path)
+        else:
+            futures = [pool.submit(_render_artifact, renderer, data, path) for path, (renderer, data) in todo.items()]
+            for future in futures:
+                future.result()
+
+        # Render time is shared across the batch; assembly is per book
+        render_seconds = (time.perf_counter() - start) / len(batch)
+        rows = []
+        for book, plan in zip(batch, plans):
+            t0 = time.perf_counter()
+            path = self._write_page(book['name'], plan)
+            rendered = sum(fresh for _, _, fresh in plan)
+            rows.append((book['name'], path, len(plan), rendered, len(plan) - rendered,
+                         render_seconds + time.perf_counter() - t0))
+        return rows
+
+    def _write_page(self, name, plan):
+        parts = [
+            '<!DOCTYPE html><html><head><meta charset="utf-8">',
+            f'<title>{html.escape(name)} - End-of-Day Report</title><style>{PAGE_STYLE}</style></head><body>',
+            f'<h1>{html.escape(name)} - End-of-Day Report</h1>',
+            f'<p>Generated {pd.Timestamp.now():%Y-%m-%d %H:%M}</p>',
+        ]
+        for title, artifact, _ in plan:
+            with open(artifact) as f:
+                parts.append(f'<section><h2>{html.escape(title)}</h2>{f.read()}</section>')
+        parts.append('</body></html>')
+
+        safe = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name)
+        if safe != name:
+            # Distinct names that sanitize alike (A/B, A_B) get distinct files
+            safe += '-' + content_hash(name)[:8]
+        path = os.path.join(self.output_dir, f'{safe}.html')
+        with open(path, 'w') as f:
+            f.write(''.join(parts))
+        return path
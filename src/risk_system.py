@@ -0,0 +1,250 @@
+import numpy as np
+import pandas as pd
+
+BP = 0.0001
+
+RISK_METRICS = ['DV01', 'CS01', 'MaxNotional']
+
+TOTAL_LEVEL = 'total'
+TOTAL_BUCKET = 'ALL'
+
+LIMIT_COLUMNS = ['level', 'bucket', 'metric', 'limit']
+
+
+class BarclaysRiskSystem:
+    def __init__(self, hierarchy=('desk',)):
+        self.limits = {
+            'DV01': 100000,   # $100k per 1bp
+            'CS01': 50000,    # $50k per 1bp credit spread move
+            'MaxNotional': 1e8 # $100MM
+        }
+        self.hierarchy = list(hierarchy)
+        self.bucket_limits = {}
+
+    def check_limits(self, positions):
+        """Check positions against risk limits"""
+        exposures = self.calculate_exposures(positions)
+        violations = {}
+
+        for metric, limit in self.limits.items():
+            if metric in exposures:
+                violations[metric] = abs(exposures[metric]) > limit
+            else:
+                violations[metric] = False
+
+        return violations
+
+    def calculate_exposures(self, positions):
+        """Calculate portfolio risk exposures"""
+        exposures = {
+            'MaxNotional': positions.get('notional', 0)
+        }
+
+        if 'notional' in positions and 'duration' in positions:
+            exposures['DV01'] = positions['notional'] * BP * positions['duration']
+        if 'notional' in positions and 'spread_duration' in positions:
+            exposures['CS01'] = positions['notional'] * BP * positions['spread_duration']
+
+        return exposures
+
+    # ----------------------------
+    # Book-level engine
+    # ----------------------------
+
+    def set_limit(self, level, bucket, metric, limit):
+        """Add a limit for one hierarchy bucket, e.g. ('desk', 'Credit', 'DV01', 2e4)"""
+        self.bucket_limits[(level, bucket, metric)] = limit
+        return self
+
+    def limits_table(self):
+        """All limits as a (level, bucket, metric, limit) table, firm-wide first"""
+        rows = [(TOTAL_LEVEL, TOTAL_BUCKET, m, v) for m, v in self.limits.items()]
+        rows += [(*key, v) for key, v in self.bucket_limits.items()]
+        return pd.DataFrame(rows, columns=LIMIT_COLUMNS)
+
+    def position_exposures(self, book):
+        """DV01, CS01 and notional for every row of a columnar positions table
+
+        Missing duration or spread_duration columns count as zero sensitivity.
+        """
+        notional = book['notional'].to_numpy(dtype=np.float64)
+        zeros = np.zeros(len(book))
+        duration = book['duration'].to_numpy(dtype=np.float64) if 'duration' in book else zeros
+        spread_duration = (
+            book['spread_duration'].to_numpy(dtype=np.float64) if 'spread_duration' in book else zeros
+        )
+        return pd.DataFrame({
+            'DV01': notional * BP * duration,
+            'CS01': notional * BP * spread_duration,
+            'MaxNotional': notional,
+        }, index=book.index)
+
+    def book_exposures(self, book):
+        """Aggregate exposures per hierarchy bucket and in total
+
+        DV01 and CS01 are netted within a bucket; notional is summed gross.
+        Returns a frame indexed by (level, bucket) with one column per metric.
+        """
+        per_position = self.position_exposures(book)
+        weights = {
+            'DV01': per_position['DV01'].to_numpy(),
+            'CS01': per_position['CS01'].to_numpy(),
+            'MaxNotional': np.abs(per_position['MaxNotional'].to_numpy()),
+        }
+
+        frames = [pd.DataFrame(
+            {m: [w.sum()] for m, w in weights.items()},
+            index=pd.MultiIndex.from_tuples([(TOTAL_LEVEL, TOTAL_BUCKET)], names=['level', 'bucket'])
+        )]
+        for level in self.hierarchy:
+            codes, buckets = pd.factorize(book[level], sort=True)
+            sums = {m: np.bincount(codes, weights=w, minlength=len(buckets)) for m, w in weights.items()}
+            frames.append(pd.DataFrame(
+                sums,
+                index=pd.MultiIndex.from_arrays(
+                    [np.full(len(buckets), level, dtype=object), buckets], names=['level', 'bucket']
+                )
+            ))
+        return pd.concat(frames)[RISK_METRICS]
+
+    def check_book_limits(self, book):
+        """Check every hierarchy limit with one array comparison
+
+        Returns a violations table with the exposure, limit and utilisation of
+        each breached (level, bucket, metric); empty when the book is clean.
+        """
+        limits = self.limits_table()
+        exposures = self.book_exposures(book).stack()
+        exposures.index = exposures.index.set_names(['level', 'bucket', 'metric'])
+
+        key = pd.MultiIndex.from_frame(limits[['level', 'bucket', 'metric']])
+        exposure = exposures.reindex(key).fillna(0.0).to_numpy()
+        limit = limits['limit'].to_numpy(dtype=np.float64)
+
+        breached = np.abs(exposure) > limit
+        violations = limits[breached].copy()
+        violations['exposure'] = exposure[breached]
+        violations['utilisation'] = np.abs(exposure[breached]) / limit[breached]
+        return violations[['level', 'bucket', 'metric', 'exposure', 'limit', 'utilisation']].reset_index(drop=True)
+
+
+class RiskBook:
+    """Running exposures per limit bucket for O(1) incremental limit checks
+
+    Holds each position's notional and sensitivities plus the aggregate
+    DV01/CS01/gross notional of every hierarchy bucket it rolls up into.
+    A fill or position delta only touches that position's buckets, so
+    updates and ``would_breach`` pre-trade checks never rescan the book.
+
+    Deltas and orders are mappings with a ``position`` id, a signed
+    ``notional`` change and, for new positions, ``duration``,
+    ``spread_duration`` and one field per hierarchy level. Execution fills
+    are keyed by ``symbol`` and booked to the position that symbol maps to.
+    """
+
+    def __init__(self, risk_system=None):
+        self.risk_system = risk_system or BarclaysRiskSystem()
+        self.hierarchy = self.risk_system.hierarchy
+        self.positions = {}
+        self.symbols = {}
+        self.exposures = {}
+        self.limits = {}
+        for level, bucket, metric, limit in self.risk_system.limits_table().itertuples(index=False):
+            self.limits.setdefault((level, bucket), []).append((RISK_METRICS.index(metric), metric, limit))
+
+    def load(self, book):
+        """Seed positions and bucket aggregates from a positions table"""
+        duration = book['duration'] if 'duration' in book else pd.Series(0.0, index=book.index)
+        spread_duration = (
+            book['spread_duration'] if 'spread_duration' in book else pd.Series(0.0, index=book.index)
+        )
+        columns = [book.index, book['notional'], duration, spread_duration] + [book[l] for l in self.hierarchy]
+        for position_id, notional, dur, sdur, *buckets in zip(*columns):
+            self.positions[position_id] = [float(notional), float(dur), float(sdur), self._keys(buckets)]
+        if 'symbol' in book:
+            self.symbols.update(zip(book['symbol'], book.index))
+
+        aggregates = self.risk_system.book_exposures(book)
+        for key, values in zip(aggregates.index, aggregates.to_numpy().tolist()):
+            self.exposures[key] = values
+        return self
+
+    def _keys(self, buckets):
+        return ((TOTAL_LEVEL, TOTAL_BUCKET),) + tuple(zip(self.hierarchy, buckets))
+
+    def _position(self, delta):
+        """Current state of the position a delta refers to, creating it if new"""
+        position = self.positions.get(delta['position'])
+        if position is None:
+            buckets = [delta[level] for level in self.hierarchy]
+            position = [0.0, delta.get('duration', 0.0), delta.get('spread_duration', 0.0), self._keys(buckets)]
+        return position
+
+    @staticmethod
+    def _contribution(notional, duration, spread_duration):
+        return (notional * BP * duration, notional * BP * spread_duration, abs(notional))
+
+    def _change(self, position, delta):
+        """Exposure change a delta would cause, per metric"""
+        notional, duration, spread_duration, _ = position
+        new_duration = delta.get('duration', duration)
+        new_spread_duration = delta.get('spread_duration', spread_duration)
+        old = self._contribution(notional, duration, spread_duration)
+        new = self._contribution(notional + delta['notional'], new_duration, new_spread_duration)
+        return [n - o for n, o in zip(new, old)], new_duration, new_spread_duration
+
+    def apply(self, delta):
+        """Apply a position delta and update the affected buckets in place"""
+        position = self._position(delta)
+        change, position[1], position[2] = self._change(position, delta)
+        position[0] += delta['notional']
+        self.positions[delta['position']] = position
+        if 'symbol' in delta:
+            self.symbols[delta['symbol']] = delta['position']
+        for key in position[3]:
+            totals = self.exposures.setdefault(key, [0.0, 0.0, 0.0])
+            for i in range(3):
+                totals[i] += change[i]
+        return self
+
+    def apply_fill(self, fill, side=1):
+        """Apply an execution fill (symbol, shares, price) to the symbol's position
+
+        The position is looked up from the ``symbol`` column of the loaded book
+        or the ``symbol`` of an earlier delta; a symbol that is itself a
+        position id is booked to that position.
+        """
+        symbol = fill['symbol']
+        position = self.symbols.get(symbol, symbol)
+        if position not in self.positions:
+            raise KeyError(f"No position to book {symbol} fills to: load or apply it with a symbol first")
+        return self.apply({
+            'position': position,
+            'notional': side * fill['shares'] * fill['price'],
+        })
+
+    def would_breach(self, order):
+        """Limits the order would breach, as (level, bucket, metric, exposure, limit)
+
+        Returns an empty list when the order is within every limit.
+        """
+        position = self._position(order)
+        change = self._change(position, order)[0]
+        breaches = []
+        for key in position[3]:
+            current = self.exposures.get(key, (0.0, 0.0, 0.0))
+            for i, metric, limit in self.limits.get(key, ()):
+                exposure = current[i] + change[i]
+                if abs(exposure) > limit:
+                    breaches.append((*key, metric, exposure, limit))
+        return breaches
+
+    def check_limits(self):
+        """Current violations of every limit from the cached aggregates"""
+        rows = []
+        for key, metrics in self.limits.items():
+            current = self.exposures.get(key, (0.0, 0.0, 0.0))
+            for i, metric, limit in metrics:
+                if abs(current[i]) > limit:
+                    rows.append((*key, metric, current[i], limit, abs(current[i]) / limit))
+        return pd.DataFrame(rows, columns=['level', 'bucket', 'metric', 'exposure', 'limit', 'utilisation'])
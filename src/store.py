@@ -0,0 +1,148 @@
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+DEFAULT_STORE_DIR = os.path.join('data', 'store')
+
+# Knowledge time of each row version, used for point-in-time reads
+WRITTEN_AT = '_written_at'
+
+# Files are partitioned by the calendar month of their rows
+PARTITIONING = ds.partitioning(pa.schema([('month', pa.string())]), flavor='hive')
+
+
+def _month(ts):
+    return pd.Timestamp(ts).strftime('%Y-%m')
+
+
+def _utcnow():
+    return pd.Timestamp.now('UTC').tz_localize(None)
+
+
+class SignalStore:
+    """Append-only, point-in-time store of daily frames as monthly Parquet parts
+
+    Each dataset lives under ``<root>/<dataset>/month=YYYY-MM/``. Writes only
+    ever add part files; every row carries the time it was written, so a
+    revised value is a new version of its date rather than an overwrite.
+
+    ``read`` only opens the month directories overlapping the date range,
+    pushes the date and ``as_of`` predicates down to Parquet row groups, and
+    only decodes the requested columns. Columns may be added over time: the
+    schema is unified across the parts read and older parts read as null.
+    With ``as_of`` it returns each date as it was known at that time, which
+    keeps backtests free of look-ahead from later revisions.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+
+    def _path(self, dataset):
+        return os.path.join(self.root, dataset)
+
+    def datasets(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(self._path(d)))
+
+    def _parts(self, dataset, start=None, end=None):
+        """Part files of the month partitions overlapping [start, end]"""
+        root = self._path(dataset)
+        lo = 'month=' + _month(start) if start is not None else ''
+        hi = 'month=' + _month(end) if end is not None else '~'
+        parts = []
+        for month in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+            if month.startswith('month=') and lo <= month <= hi:
+                directory = os.path.join(root, month)
+                names = sorted(os.listdir(directory))
+                parts += [os.path.join(directory, f) for f in names if f.endswith('.parquet') and not f.startswith('.')]
+        return parts
+
+    def _dataset(self, dataset, parts):
+        # Only the listed parts are opened, even for schema discovery; their
+        # footers are unified so columns added by later writes are kept
+        schema = pa.unify_schemas([pq.read_schema(p).remove_metadata() for p in parts])
+        schema = schema.append(PARTITIONING.schema.field('month'))
+        return ds.dataset(parts, schema=schema, format='parquet', partitioning=PARTITIONING,
+                          partition_base_dir=self._path(dataset))
+
+    def append(self, dataset, frame, written_at=None):
+        """Write a date-indexed frame as new part files, one per month touched"""
+        if frame.empty:
+            return self
+        written_at = _utcnow() if written_at is None else pd.Timestamp(written_at)
+        data = frame.sort_index().rename_axis('date').reset_index()
+        data['date'] = data['date'].astype('datetime64[ns]')
+        data[WRITTEN_AT] = written_at
+        data[WRITTEN_AT] = data[WRITTEN_AT].astype('datetime64[ns]')
+
+        name = f"part-{written_at:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}.parquet"
+        for month, rows in data.groupby(data['date'].dt.strftime('%Y-%m'), sort=True):
+            directory = os.path.join(self._path(dataset), f'month={month}')
+            os.makedirs(directory, exist_ok=True)
+            # Hidden temp name so readers never see a half-written part
+            tmp = os.path.join(directory, '.' + name)
+            pq.write_table(pa.Table.from_pandas(rows, preserve_index=False), tmp)
+            os.replace(tmp, os.path.join(directory, name))
+        return self
+
+    def sync(self, dataset, frame, written_at=None):
+        """Append only rows that are new or differ from their latest stored version"""
+        if frame.empty or not os.path.isdir(self._path(dataset)):
+            return self.append(dataset, frame, written_at)
+        stored = self.read(dataset, columns=list(frame.columns), start=frame.index.min(), end=frame.index.max())
+        stored = stored.reindex(frame.index)
+        same = ((stored == frame) | (stored.isna() & frame.isna())).all(axis=1)
+        return self.append(dataset, frame[~same.to_numpy()], written_at)
+
+    def read(self, dataset, columns=None, start=None, end=None, as_of=None, where=None):
+        """Point-in-time rows of ``dataset`` between ``start`` and ``end``
+
+        ``where`` is an optional pyarrow expression on value columns. It is
+        applied after each date is resolved to its latest version, so an
+        older version can never match in place of the current one.
+        """
+        parts = self._parts(dataset, start, end)
+        if not parts:
+            index = pd.DatetimeIndex([], dtype='datetime64[ns]', name='date')
+            return pd.DataFrame(columns=list(columns or []), index=index, dtype=np.float64)
+        data = self._dataset(dataset, parts)
+        if columns is None:
+            columns = [c for c in data.schema.names if c not in ('date', WRITTEN_AT, 'month')]
+
+        scan = ds.scalar(True)
+        if start is not None:
+            start = pd.Timestamp(start)
+            scan &= ds.field('date') >= start
+        if end is not None:
+            end = pd.Timestamp(end)
+            scan &= ds.field('date') <= end
+        if as_of is not None:
+            scan &= ds.field(WRITTEN_AT) <= pd.Timestamp(as_of)
+
+        # Columns no part has yet read as NaN
+        stored = [c for c in columns if c in data.schema.names]
+        table = data.to_table(columns=['date', WRITTEN_AT] + stored, filter=scan)
+        # Latest version of each date wins
+        table = table.take(pc.sort_indices(table, [('date', 'ascending'), (WRITTEN_AT, 'ascending')]))
+        dates = table.column('date').to_numpy()
+        latest = np.append(dates[1:] != dates[:-1], True) if len(dates) else np.zeros(0, dtype=bool)
+        table = table.filter(pa.array(latest))
+        if where is not None:
+            table = table.filter(where)
+        return table.to_pandas().set_index('date').reindex(columns=list(columns))
+
+    def versions(self, dataset, date):
+        """Every stored version of one date, oldest first"""
+        date = pd.Timestamp(date)
+        parts = self._parts(dataset, date, date)
+        if not parts:
+            return pd.DataFrame()
+        frame = self._dataset(dataset, parts).to_table(filter=ds.field('date') == date).to_pandas().drop(columns='month')
+        return frame.sort_values(WRITTEN_AT).set_index(WRITTEN_AT)
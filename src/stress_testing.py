@@ -0,0 +1,431 @@
+import hashlib
+import math
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import DEFAULT_CACHE_DIR, ETF_SYMBOLS, add_spreads, prune_cache
+from src.instrumentation import instrument
+
+# Risk factors a scenario can shock, in shock-matrix column order
+SHOCK_FACTORS = ['equity_shock', 'credit_spread_widen', 'liquidity_stress']
+
+# Scenario spread widening is quoted in percentage points (0.35 = 35bps)
+SPREAD_UNIT = 0.01
+
+# Level factors whose daily changes drive VaR alongside ETF returns
+LEVEL_FACTORS = ['quality_spread', 'term_spread', '10y_yield', '2y_yield', 'vix']
+
+# Monte Carlo VaR paths per run; one chunk, so the default runs in-process
+MC_PATHS = 100_000
+
+# Cached covariance decompositions kept on disk, least recently used dropped first
+COV_CACHE_ENTRIES = 16
+
+# RiskMetrics daily decay for the streaming covariance
+EWMA_DECAY = 0.94
+
+# Relative (Frobenius) change in covariance before its decomposition is redone;
+# one daily bar moves it by roughly 1 - EWMA_DECAY
+DRIFT_TOLERANCE = 0.2
+
+
+class CrisisSimulator:
+    SCENARIOS = {
+        '2008 Crisis': {
+            'equity_shock': -0.45,
+            'credit_spread_widen': 0.35,  # 35bps
+            'liquidity_stress': 1.0,  # full liquidity_factor haircut
+        },
+        '2020 COVID': {
+            'equity_shock': -0.35,
+            'credit_spread_widen': 0.25,
+            'liquidity_stress': 0.8,
+        },
+        '2022 Inflation': {
+            'equity_shock': -0.25,
+            'credit_spread_widen': 0.15,
+            'liquidity_stress': 0.3,
+        }
+    }
+
+    def __init__(self, portfolio):
+        self.portfolio = portfolio
+
+    @instrument('run_scenarios')
+    def run_scenarios(self):
+        """Run all defined stress scenarios"""
+        results = {}
+        for name, params in self.SCENARIOS.items():
+            shocked_portfolio = self._apply_shocks(self.portfolio.copy(), params)
+            results[name] = self._calculate_pnl_impact(shocked_portfolio)
+        return pd.DataFrame.from_dict(results, orient='index', columns=['PnL Impact'])
+
+    def _apply_shocks(self, portfolio, params):
+        """Apply shocks to portfolio positions"""
+        portfolio['price'] = portfolio['price'] * (1 + params['equity_shock'])
+        portfolio['spread'] = portfolio['spread'] + params['credit_spread_widen']
+        return portfolio
+
+    def _calculate_pnl_impact(self, portfolio):
+        """Calculate PnL impact of shocks"""
+        return (portfolio['price'] * portfolio['shares']).sum() - \
+               (self.portfolio['price'] * self.portfolio['shares']).sum()
+
+
+def shock_matrix(scenarios):
+    """Turn scenarios into a (scenarios x SHOCK_FACTORS) frame
+
+    Accepts a dict of {name: {factor: shock}} like ``CrisisSimulator.SCENARIOS``
+    or a frame with one row per scenario. Factors a scenario leaves out are
+    unshocked.
+    """
+    if not isinstance(scenarios, pd.DataFrame):
+        scenarios = pd.DataFrame.from_dict(scenarios, orient='index')
+    return scenarios.reindex(columns=SHOCK_FACTORS).fillna(0.0).astype(np.float64)
+
+
+class ScenarioEngine:
+    """Stress PnL for many scenarios as one matrix product
+
+    Positions are reduced once to a (positions x factors) sensitivity matrix:
+
+    - equity: market value x ``equity_beta`` (default 1) per unit equity shock
+    - credit: -market value x ``spread_duration`` (default 0) per point of
+      spread widening
+    - liquidity: -market value x (1 - ``liquidity_factor``) per unit of
+      ``liquidity_stress``, a first-order haircut on the unshocked value
+
+    The PnL of every scenario is then ``shocks @ sensitivities.T`` with no
+    per-scenario copies of the portfolio. A portfolio without the spread or
+    liquidity columns gets a warning, as those components are then zero.
+    """
+
+    COMPONENTS = ['Equity', 'Spread', 'Liquidity']
+
+    def __init__(self, portfolio):
+        self.portfolio = portfolio
+        missing = [c for c in ('spread_duration', 'liquidity_factor') if c not in portfolio]
+        if missing:
+            warnings.warn(f"Portfolio has no {missing} columns; their stress components will be zero")
+        self.sensitivities = self._sensitivities(portfolio)
+
+    @staticmethod
+    def _column(portfolio, name, default):
+        if name in portfolio:
+            return portfolio[name].to_numpy(dtype=np.float64)
+        return np.full(len(portfolio), default, dtype=np.float64)
+
+    def _sensitivities(self, portfolio):
+        value = self._column(portfolio, 'price', 0.0) * self._column(portfolio, 'shares', 0.0)
+        return np.column_stack([
+            value * self._column(portfolio, 'equity_beta', 1.0),
+            -value * self._column(portfolio, 'spread_duration', 0.0) * SPREAD_UNIT,
+            -value * (1 - self._column(portfolio, 'liquidity_factor', 1.0)),
+        ])
+
+    def run(self, scenarios=None):
+        """PnL per scenario split by factor, with the total in 'PnL Impact'"""
+        shocks = shock_matrix(CrisisSimulator.SCENARIOS if scenarios is None else scenarios)
+        # Each factor only loads on its own sensitivity column
+        components = shocks.to_numpy() * self.sensitivities.sum(axis=0)
+        result = pd.DataFrame(components, index=shocks.index, columns=self.COMPONENTS)
+        result['PnL Impact'] = components.sum(axis=1)
+        return result
+
+    def run_grid(self, scenarios=None, by='symbol'):
+        """Total PnL as a (scenarios x groups) grid, grouping positions by a column"""
+        shocks = shock_matrix(CrisisSimulator.SCENARIOS if scenarios is None else scenarios)
+        codes, groups = pd.factorize(self.portfolio[by], sort=True)
+        grouped = np.zeros((len(groups), len(SHOCK_FACTORS)))
+        np.add.at(grouped, codes, self.sensitivities)
+        grid = shocks.to_numpy() @ grouped.T
+        return pd.DataFrame(grid, index=shocks.index, columns=pd.Index(groups, name=by))
+
+
+def factor_moves(raw_data, dropna=True):
+    """Daily factor moves from loader raw data
+
+    ETF closes become simple returns; spreads, yields and VIX become level
+    changes. With ``dropna=False`` bars missing some factors are kept.
+    """
+    returns = raw_data[ETF_SYMBOLS].pct_change()
+    levels = add_spreads(raw_data.copy())[LEVEL_FACTORS].diff()
+    moves = pd.concat([returns, levels], axis=1)
+    return moves.dropna() if dropna else moves
+
+
+def portfolio_exposures(portfolio, factors):
+    """Dollar PnL per unit move of each factor for a symbol/shares/price portfolio"""
+    value = (portfolio['shares'] * portfolio['price']).groupby(portfolio['symbol']).sum()
+    return value.reindex(factors).fillna(0.0)
+
+
+def _tail(pnl, k):
+    """The k worst outcomes, unsorted"""
+    if k >= len(pnl):
+        return pnl
+    return np.partition(pnl, k - 1)[:k]
+
+
+def _risk_from_tail(tail, k):
+    worst = np.sort(tail)[:k]
+    return {'VaR': -worst[-1], 'ES': -worst.mean()}
+
+
+def _cholesky(cov):
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        # Constant or collinear factors: nudge onto the PD cone
+        return np.linalg.cholesky(cov + np.eye(len(cov)) * 1e-12 * np.trace(cov))
+
+
+def _mc_tail_chunk(seed_seq, n_paths, mean, chol, weights, k):
+    """Simulate one chunk of correlated factor paths and keep its k worst PnLs"""
+    rng = np.random.default_rng(seed_seq)
+    z = rng.standard_normal((n_paths, len(weights)))
+    # (z @ L.T) @ w without materialising the factor moves
+    pnl = z @ (chol.T @ weights) + mean @ weights
+    return _tail(pnl, k)
+
+
+class VaRService:
+    """Daily VaR and Expected Shortfall by historical simulation and Monte Carlo
+
+    Both methods revalue the portfolio linearly from its dollar exposure to
+    each factor in ``moves``. Monte Carlo draws correlated normal paths from
+    the Cholesky factor of the factor covariance, which is cached on disk by
+    a hash of the input data and reused across runs; only the
+    ``COV_CACHE_ENTRIES`` most recently used decompositions are kept. Paths
+    are simulated in fixed-size chunks, on a process pool when there is more
+    than one, each chunk with its own spawned seed and keeping only its worst
+    tail, so results do not depend on the number of workers and memory stays
+    bounded by the chunk size.
+    """
+
+    def __init__(self, moves, confidence=0.99, cache_dir=DEFAULT_CACHE_DIR):
+        self.moves = moves
+        self.confidence = confidence
+        self.cache_dir = cache_dir
+        self._decomposition = None
+
+    @classmethod
+    def from_loader(cls, data_loader, **kwargs):
+        """Build the service from an InstitutionalDataLoader with raw data loaded"""
+        return cls(factor_moves(data_loader.raw_data), **kwargs)
+
+    def _weights(self, exposures):
+        return pd.Series(exposures, dtype=np.float64).reindex(self.moves.columns).fillna(0.0).to_numpy()
+
+    def _tail_size(self, n):
+        # Round first so float noise in 1 - confidence cannot add a path
+        return max(1, math.ceil(round(n * (1 - self.confidence), 6)))
+
+    def historical(self, exposures):
+        """VaR and ES from replaying every historical day of factor moves"""
+        pnl = self.moves.to_numpy() @ self._weights(exposures)
+        k = self._tail_size(len(pnl))
+        return _risk_from_tail(_tail(pnl, k), k)
+
+    def decomposition(self):
+        """Factor mean, covariance and Cholesky factor, cached by data hash"""
+        if self._decomposition is not None:
+            return self._decomposition
+
+        data = np.ascontiguousarray(self.moves.to_numpy(dtype=np.float64))
+        digest = hashlib.sha1(data.tobytes() + ','.join(map(str, self.moves.columns)).encode()).hexdigest()
+        path = os.path.join(self.cache_dir, 'risk', f'cov_{digest}.npz') if self.cache_dir else None
+
+        if path and os.path.exists(path):
+            with np.load(path) as cached:
+                self._decomposition = (cached['mean'], cached['cov'], cached['chol'])
+            os.utime(path)  # mark as recently used for pruning
+            return self._decomposition
+
+        mean = data.mean(axis=0)
+        cov = np.cov(data, rowvar=False)
+        chol = _cholesky(cov)
+
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.savez(path, mean=mean, cov=cov, chol=chol)
+            prune_cache(os.path.dirname(path), COV_CACHE_ENTRIES, suffix='.npz')
+        self._decomposition = (mean, cov, chol)
+        return self._decomposition
+
+    def monte_carlo(self, exposures, n_paths=MC_PATHS, chunk_size=100_000, seed=0, workers=None):
+        """VaR and ES from correlated normal Monte Carlo paths
+
+        ``workers=1`` or a single chunk runs in-process; otherwise chunks are
+        spread over a process pool (default: one worker per CPU).
+        """
+        mean, _, chol = self.decomposition()
+        weights = self._weights(exposures)
+        k = self._tail_size(n_paths)
+
+        sizes = [chunk_size] * (n_paths // chunk_size)
+        if n_paths % chunk_size:
+            sizes.append(n_paths % chunk_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        args = [(s, n, mean, chol, weights, k) for s, n in zip(seeds, sizes)]
+
+        if workers == 1 or len(args) == 1:
+            tails = [_mc_tail_chunk(*a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                tails = list(pool.map(_mc_tail_chunk, *zip(*args)))
+        return _risk_from_tail(np.concatenate(tails), k)
+
+    def report(self, exposures, **mc_kwargs):
+        """Historical and Monte Carlo VaR/ES side by side"""
+        return pd.DataFrame({
+            'Historical': self.historical(exposures),
+            'Monte Carlo': self.monte_carlo(exposures, **mc_kwargs),
+        }).T
+
+
+class EWMACovariance:
+    """Exponentially weighted factor mean and covariance, updated bar by bar
+
+    Each new bar of factor moves costs O(k^2) for k factors:
+    ``cov = decay * (cov + (1 - decay) * d d')`` with ``d`` the bar's
+    deviation from the running mean, which matches pandas
+    ``ewm(alpha=1 - decay, adjust=False).cov(bias=True)``. The eigen and
+    Cholesky decompositions are cached and only recomputed once the
+    covariance has drifted more than ``tolerance`` (relative Frobenius norm)
+    from the one they were computed on, so portfolio volatility and factor
+    contributions stay cheap enough to refresh on every tick.
+
+    A bar missing some factors (NaN or absent keys) updates the factors it
+    has: their variances and covariances with each other as for a full bar,
+    their covariances with the missing factors decayed by sqrt(decay), which
+    keeps the matrix positive semidefinite. Missing factors' own entries are
+    unchanged and a factor's first observation only seeds its mean.
+    """
+
+    def __init__(self, factors, decay=EWMA_DECAY, tolerance=DRIFT_TOLERANCE):
+        self.factors = list(factors)
+        self._index = pd.Index(self.factors)
+        self.decay = decay
+        self.tolerance = tolerance
+        k = len(self.factors)
+        self.mean = np.zeros(k)
+        self.cov = np.zeros((k, k))
+        self.count = 0
+        # Factors observed at least once
+        self._seen = np.zeros(k, dtype=bool)
+        # Number of times the decomposition was actually recomputed
+        self.decompositions = 0
+        self._decomposed_cov = None
+        self._decomposition = None
+
+    @classmethod
+    def from_moves(cls, moves, **kwargs):
+        """Engine primed with a frame of factor moves (one row per bar)"""
+        return cls(moves.columns, **kwargs).update_many(moves)
+
+    @classmethod
+    def from_raw_data(cls, raw_data, **kwargs):
+        """Engine over the factor moves of InstitutionalDataLoader raw data"""
+        return cls.from_moves(factor_moves(raw_data), **kwargs)
+
+    def update(self, bar):
+        """Fold in one bar of factor moves (array in factor order, dict or Series)"""
+        if isinstance(bar, (dict, pd.Series)):
+            bar = pd.Series(bar, dtype=np.float64).reindex(self.factors).to_numpy()
+        x = np.asarray(bar, dtype=np.float64)
+        present = ~np.isnan(x)
+        if present.all() and self._seen.all():
+            d = x - self.mean
+            self.mean += (1 - self.decay) * d
+            self.cov += (1 - self.decay) * np.outer(d, d)
+            self.cov *= self.decay
+        elif present.any():
+            first = present & ~self._seen
+            self.mean[first] = x[first]
+            self._seen |= present
+            idx = np.flatnonzero(present)
+            d = x[idx] - self.mean[idx]
+            self.mean[idx] += (1 - self.decay) * d
+            # S cov S with S = sqrt(decay) on present factors, 1 on absent:
+            # present rows and columns decay together, so cov stays PSD
+            scale = np.where(present, np.sqrt(self.decay), 1.0)
+            self.cov *= np.outer(scale, scale)
+            self.cov[np.ix_(idx, idx)] += self.decay * (1 - self.decay) * np.outer(d, d)
+        else:
+            return self
+        self.count += 1
+        return self
+
+    def update_many(self, moves):
+        """Fold in a frame (or 2-D array) of bars in time order"""
+        if isinstance(moves, pd.DataFrame):
+            moves = moves.reindex(columns=self.factors)
+        for bar in np.asarray(moves, dtype=np.float64):
+            self.update(bar)
+        return self
+
+    def correlation(self):
+        std = np.sqrt(np.diag(self.cov))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.cov / np.outer(std, std)
+        return pd.DataFrame(corr, index=self.factors, columns=self.factors)
+
+    def drift(self):
+        """Relative change in covariance since the cached decomposition"""
+        if self._decomposed_cov is None:
+            return np.inf
+        base = np.linalg.norm(self._decomposed_cov)
+        if base == 0:
+            return np.inf
+        return np.linalg.norm(self.cov - self._decomposed_cov) / base
+
+    def decomposition(self):
+        """Eigenvalues, eigenvectors and Cholesky factor, recomputed on drift"""
+        if self._decomposition is None or self.drift() > self.tolerance:
+            eigenvalues, eigenvectors = np.linalg.eigh(self.cov)
+            self._decomposition = (np.maximum(eigenvalues, 0.0), eigenvectors, _cholesky(self.cov))
+            self._decomposed_cov = self.cov.copy()
+            self.decompositions += 1
+        return self._decomposition
+
+    def _weights(self, exposures):
+        if isinstance(exposures, np.ndarray):
+            return exposures
+        # Exposures already in factor order skip the reindex on every tick
+        if isinstance(exposures, pd.Series) and exposures.index.equals(self._index):
+            return exposures.to_numpy(dtype=np.float64)
+        return pd.Series(exposures, dtype=np.float64).reindex(self.factors).fillna(0.0).to_numpy()
+
+    def portfolio_vol(self, exposures):
+        """Parametric one-bar PnL volatility for dollar exposures per factor
+
+        ``exposures`` is a dict or Series by factor, or an array in factor order.
+        """
+        w = self._weights(exposures)
+        return float(np.sqrt(max(w @ self.cov @ w, 0.0)))
+
+    def factor_contributions(self, exposures):
+        """Each factor's share of ``portfolio_vol`` (Euler split, sums to it)"""
+        w = self._weights(exposures)
+        marginal = self.cov @ w
+        vol = np.sqrt(max(w @ marginal, 0.0))
+        contributions = w * marginal / vol if vol > 0 else np.zeros(len(w))
+        return pd.Series(contributions, index=self.factors)
+
+    def principal_contributions(self, exposures):
+        """Portfolio variance carried by each principal component, largest first"""
+        eigenvalues, eigenvectors, _ = self.decomposition()
+        loadings = eigenvectors.T @ self._weights(exposures)
+        variance = (eigenvalues * loadings ** 2)[::-1]
+        return pd.Series(variance, index=[f'PC{i + 1}' for i in range(len(variance))])
+
+    def simulate(self, n_paths, seed=None):
+        """Correlated normal factor moves drawn from the cached Cholesky factor"""
+        _, _, chol = self.decomposition()
+        z = np.random.default_rng(seed).standard_normal((n_paths, len(self.factors)))
+        return pd.DataFrame(self.mean + z @ chol.T, columns=self.factors)
@@ -0,0 +1,193 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import InstitutionalDataLoader, SIGNAL_WINDOW
+
+# Symbols per price request / per loader cache pass
+FETCH_CHUNK = 200
+
+# Instruments per rolling-feature block
+FEATURE_BLOCK = 512
+
+# Dates per cross-sectional block
+CROSS_SECTION_BLOCK = 1024
+
+UNIVERSE_FEATURES = ['momentum', 'volatility', 'zscore', 'score', 'rank']
+
+
+def read_universe(path, column='symbol'):
+    """Instrument list from a CSV with a symbol column or one symbol per line"""
+    frame = pd.read_csv(path)
+    if column in frame:
+        symbols = frame[column]
+    else:
+        symbols = pd.read_csv(path, header=None).iloc[:, 0]
+    return list(dict.fromkeys(symbols.dropna().astype(str).str.strip()))
+
+
+class PricePanel:
+    """Dense (dates x instruments) float64 prices with date and instrument indexes
+
+    Missing observations (before listing, after delisting) are NaN. Memory is
+    one float per date and instrument; everything else works on blocks.
+    """
+
+    def __init__(self, values, dates, instruments):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.dates = pd.DatetimeIndex(dates)
+        self.instruments = pd.Index(instruments, name='instrument')
+        if self.values.shape != (len(self.dates), len(self.instruments)):
+            raise ValueError(f"Panel shape {self.values.shape} does not match its indexes")
+
+    @classmethod
+    def from_frame(cls, frame):
+        return cls(frame.to_numpy(dtype=np.float64), frame.index, frame.columns)
+
+    @classmethod
+    def from_columns(cls, frames):
+        """Assemble frames of instrument columns into one panel, filling in place"""
+        dates = pd.DatetimeIndex([])
+        for frame in frames:
+            dates = dates.union(frame.index)
+        instruments = [c for frame in frames for c in frame.columns]
+        values = np.full((len(dates), len(instruments)), np.nan)
+        col = 0
+        for frame in frames:
+            rows = dates.get_indexer(frame.index)
+            values[rows, col:col + frame.shape[1]] = frame.to_numpy(dtype=np.float64)
+            col += frame.shape[1]
+        return cls(values, dates, instruments)
+
+    def column(self, symbol):
+        return self.values[:, self.instruments.get_loc(symbol)]
+
+    def to_frame(self):
+        return pd.DataFrame(self.values, index=self.dates, columns=self.instruments)
+
+    def returns(self):
+        """Simple returns; NaN where either price is missing"""
+        out = np.full_like(self.values, np.nan)
+        out[1:] = self.values[1:] / self.values[:-1] - 1
+        return out
+
+
+class UniverseLoader:
+    """Load closes for a universe of instruments into a PricePanel
+
+    Prices go through an InstitutionalDataLoader's cache (incremental
+    head/tail fetches, offline fixture replay) ``chunk_size`` symbols at a
+    time, and each chunk is written straight into the preallocated panel.
+    """
+
+    def __init__(self, symbols, data_loader=None, chunk_size=FETCH_CHUNK):
+        self.symbols = list(dict.fromkeys(symbols))
+        self.data_loader = data_loader or InstitutionalDataLoader()
+        self.chunk_size = chunk_size
+        self.panel = None
+
+    def load(self):
+        chunks = [self.symbols[i:i + self.chunk_size] for i in range(0, len(self.symbols), self.chunk_size)]
+        frames = [self.data_loader.load_series('yahoo', chunk) for chunk in chunks]
+        self.panel = PricePanel.from_columns(frames)
+        return self
+
+
+def cross_sectional_rank(values, block=CROSS_SECTION_BLOCK):
+    """Per-date percentile rank in [0, 1] across instruments, ignoring NaN
+
+    Ties are ranked by instrument position. Works ``block`` dates at a time.
+    """
+    out = np.full(values.shape, np.nan)
+    n = values.shape[1]
+    for lo in range(0, len(values), block):
+        chunk = values[lo:lo + block]
+        # NaNs sort last, so valid values get ranks 0..count-1
+        order = np.argsort(chunk, axis=1, kind='stable')
+        ranks = np.empty(chunk.shape)
+        np.put_along_axis(ranks, order, np.broadcast_to(np.arange(n, dtype=np.float64), chunk.shape), axis=1)
+        valid = ~np.isnan(chunk)
+        count = valid.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.where(count > 1, ranks / (count - 1), 0.5)
+        out[lo:lo + block] = np.where(valid, pct, np.nan)
+    return out
+
+
+def cross_sectional_zscore(values, block=CROSS_SECTION_BLOCK):
+    """Per-date z-score across instruments, ignoring NaN"""
+    out = np.full(values.shape, np.nan)
+    for lo in range(0, len(values), block):
+        chunk = values[lo:lo + block]
+        valid = ~np.isnan(chunk)
+        count = valid.sum(axis=1, keepdims=True)
+        filled = np.where(valid, chunk, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = filled.sum(axis=1, keepdims=True) / count
+            dev = np.where(valid, chunk - mean, 0.0)
+            std = np.sqrt((dev * dev).sum(axis=1, keepdims=True) / (count - 1))
+            out[lo:lo + block] = np.where(valid & (std > 0), dev / std, np.nan)
+    return out
+
+
+def _rolling_block(prices, window):
+    """Momentum, return volatility and price z-score for one block of instruments"""
+    frame = pd.DataFrame(prices)
+    returns = frame.pct_change(fill_method=None)
+    rolling = frame.rolling(window)
+    return (
+        (frame / frame.shift(window) - 1).to_numpy(),
+        returns.rolling(window).std().to_numpy(),
+        ((frame - rolling.mean()) / rolling.std()).to_numpy(),
+    )
+
+
+class UniverseSignals:
+    """Rolling and cross-sectional features for a PricePanel
+
+    Per instrument: ``window``-day momentum, return volatility and price
+    z-score, computed ``block`` instruments at a time so temporaries stay
+    bounded; blocks run on a process pool unless ``workers=1``. Across
+    instruments on each date: ``score`` is the cross-sectional z-score of
+    volatility-adjusted momentum and ``rank`` its percentile.
+    """
+
+    def __init__(self, panel, window=SIGNAL_WINDOW, block=FEATURE_BLOCK):
+        self.panel = panel
+        self.window = window
+        self.block = block
+        self.features = None
+
+    def compute(self, workers=1):
+        values = self.panel.values
+        starts = range(0, values.shape[1], self.block)
+        blocks = [values[:, lo:lo + self.block] for lo in starts]
+
+        if workers == 1:
+            results = [_rolling_block(b, self.window) for b in blocks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_rolling_block, blocks, [self.window] * len(blocks)))
+
+        features = {name: np.empty(values.shape) for name in ['momentum', 'volatility', 'zscore']}
+        for lo, result in zip(starts, results):
+            for name, arr in zip(features, result):
+                features[name][:, lo:lo + self.block] = arr
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            adjusted = features['momentum'] / (features['volatility'] * np.sqrt(self.window))
+        adjusted[~np.isfinite(adjusted)] = np.nan
+        features['score'] = cross_sectional_zscore(adjusted)
+        features['rank'] = cross_sectional_rank(features['score'])
+        self.features = features
+        return self
+
+    def frame(self, name):
+        """One feature as a (dates x instruments) frame"""
+        return pd.DataFrame(self.features[name], index=self.panel.dates, columns=self.panel.instruments)
+
+    def latest(self):
+        """Last date's features, one row per instrument"""
+        return pd.DataFrame({name: self.features[name][-1] for name in UNIVERSE_FEATURES},
+                            index=self.panel.instruments)
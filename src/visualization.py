@@ -1,6 +1,154 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Default number of points to send per chart, about one per horizontal pixel
+DEFAULT_WIDTH = 1200
+
+
+def _first_per_bucket(positions, buckets):
+    """First position of each bucket among positions sorted ascending"""
+    keep = np.ones(len(positions), dtype=bool)
+    keep[1:] = buckets[positions[1:]] != buckets[positions[:-1]]
+    return positions[keep]
+
+
+def minmax_indices(y, width=DEFAULT_WIDTH):
+    """Row positions of the min and max of y in each of width/2 equal buckets
+
+    Keeps every spike, so the line looks the same at ``width`` pixels, and
+    runs in O(n) with no Python loop. First and last points are always kept.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    n_buckets = max(width // 2, 1)
+    if n <= width:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    buckets = np.repeat(np.arange(n_buckets), np.diff(edges))
+    starts = edges[:-1]
+
+    # NaN never wins a min/max; fill them so reduceat ignores them
+    lo = np.minimum.reduceat(np.where(np.isnan(y), np.inf, y), starts)
+    hi = np.maximum.reduceat(np.where(np.isnan(y), -np.inf, y), starts)
+    mins = _first_per_bucket(np.flatnonzero(y == lo[buckets]), buckets)
+    maxs = _first_per_bucket(np.flatnonzero(y == hi[buckets]), buckets)
+
+    return np.unique(np.concatenate([[0, n - 1], mins, maxs]))
+
+
+def lttb_indices(x, y, width=DEFAULT_WIDTH):
+    """Row positions picked by Largest-Triangle-Three-Buckets
+
+    Keeps ``width`` points chosen to preserve the visual area of the line.
+    One NumPy step per output bucket.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= width or width < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, width - 1).astype(np.int64)
+    selected = np.empty(width, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(width - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket is the third triangle vertex
+        nlo, nhi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.nanargmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def _x_values(frame):
+    index = frame.index
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    if np.issubdtype(index.dtype, np.number):
+        return index.to_numpy(dtype=np.float64)
+    return np.arange(len(frame), dtype=np.float64)
+
+
+def downsample(frame, columns=None, width=DEFAULT_WIDTH, method='minmax'):
+    """Rows of ``frame`` needed to draw ``columns`` at ``width`` pixels
+
+    Rows picked for any column are kept, so other columns (sizes, colours,
+    hover fields) stay aligned with the plotted points.
+    """
+    if isinstance(frame, pd.Series):
+        return frame.iloc[_select(frame.to_frame('value'), ['value'], width, method)]
+    columns = list(frame.columns) if columns is None else list(columns)
+    return frame.iloc[_select(frame, columns, width, method)]
+
+
+def _select(frame, columns, width, method):
+    if len(frame) <= width:
+        return np.arange(len(frame))
+    # Split the point budget across the plotted columns
+    per_column = max(width // max(len(columns), 1), 4)
+    picks = []
+    for col in columns:
+        y = frame[col].to_numpy(dtype=np.float64)
+        if method == 'lttb':
+            picks.append(lttb_indices(_x_values(frame), y, per_column))
+        elif method == 'minmax':
+            picks.append(minmax_indices(y, per_column))
+        else:
+            raise ValueError(f"Unknown downsampling method: {method}")
+    return np.unique(np.concatenate(picks))
+
+
+class Downsampler:
+    """Downsampled views of one frame, cached per zoom range and width
+
+    ``view(start, end, width)`` slices the index range then downsamples it;
+    the most recent ``max_entries`` views are kept so panning back and forth
+    or re-rendering the same range is free.
+    """
+
+    def __init__(self, frame, columns=None, method='minmax', max_entries=32):
+        self.frame = frame
+        self.columns = columns
+        self.method = method
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+
+    def view(self, start=None, end=None, width=DEFAULT_WIDTH):
+        key = (start, end, width)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        result = downsample(self.frame.loc[start:end], self.columns, width, self.method)
+        self._cache[key] = result
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return result
+
+
 class PortfolioVisualizer:
     def __init__(self, pnl_df):
         self.pnl_df = pnl_df
+        self._cumulative = None
+
+    def cumulative_pnl(self, start=None, end=None, width=DEFAULT_WIDTH):
+        """Downsampled cumulative PnL per component over a zoom range"""
+        if self._cumulative is None:
+            self._cumulative = Downsampler(self.pnl_df.cumsum())
+        return self._cumulative.view(start, end, width)
+
+    def create_dashboard(self, name='portfolio', **sections):
+        """Write an HTML report of the PnL plus any other report sections
+
+        ``sections`` are extra report inputs, e.g. ``processed_data`` or
+        ``stress_results`` (see ``src.report_generator.SECTIONS``).
+        """
+        from src.report_generator import ReportBuilder
 
-    def create_dashboard(self):
-        print('Dashboard created (placeholder)')
+        return ReportBuilder(workers=1).build(dict(sections, name=name, pnl_breakdown=self.pnl_df))
@@ -1,12 +1,15 @@
+import contextlib
+
 import streamlit as st
 import pandas as pd
-import numpy as np
-import yfinance as yf
-import pandas_datareader.data as web
-import plotly.express as px
-from datetime import datetime, timedelta
-import time
-import pytz
+
+from src.data_loader import InstitutionalDataLoader
+from src.execution_engine import AdaptiveTWAP
+from src.instrumentation import Tracer, load_trace, span, summarize, use_tracer
+from src.pnl_attribution import StreamingPnLAttributor
+from src.risk_system import BarclaysRiskSystem
+from src.stress_testing import EWMACovariance, ScenarioEngine, factor_moves, portfolio_exposures
+from src.visualization import DEFAULT_WIDTH, downsample
 
 # Configure the page
 st.set_page_config(
@@ -70,185 +73,372 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ----------------------------
-# DATA LOADING AND PROCESSING
+# CACHED PIPELINE STAGES
 # ----------------------------
+# Each stage is cached on its own inputs, so changing only the trade size
+# re-runs execution and attribution but reuses loaded data and signals.
+# Entries expire after CACHE_TTL seconds and each stage keeps at most
+# CACHE_MAX_ENTRIES results (least recently used are evicted first).
 
-class InstitutionalDataLoader:
-    def __init__(self, start_date='2010-01-01'):
-        self.start_date = start_date
-        self.raw_data = None
-        self.processed_data = None
-        
-    def load_raw_data(self):
-        """Load market data from multiple sources"""
-        # ETF data
-        etfs = yf.download(['SPY', 'TLT', 'HYG', 'LQD'], start=self.start_date, progress=False)
-        
-        # Macroeconomic data from FRED
-        fred_series = {
-            'BAA10Y': 'baa_10y',
-            'AAA10Y': 'aaa_10y',
-            'DGS10': '10y_yield',
-            'DGS2': '2y_yield',
-            'VIXCLS': 'vix'
-        }
-        
-        macro = web.DataReader(list(fred_series.keys()), 'fred', self.start_date)
-        macro = macro.rename(columns=fred_series)
-        
-        # Merge datasets
-        self.raw_data = pd.concat([etfs['Close'], macro], axis=1).ffill().dropna()
-        self.raw_data.columns = ['SPY', 'TLT', 'HYG', 'LQD'] + list(fred_series.values())
-        return self
+CACHE_TTL = 3600
+CACHE_MAX_ENTRIES = 8
+
+# Fixed so a re-run after eviction reproduces the fills attribute_pnl saw
+TRADE_SEED = 0
+
+stage_cache = st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+
+
+@stage_cache
+def load_raw_data(start_date):
+    return InstitutionalDataLoader(start_date=start_date).load_raw_data().raw_data
+
+
+@stage_cache
+def process_signals(start_date):
+    data_loader = InstitutionalDataLoader(start_date=start_date)
+    data_loader.raw_data = load_raw_data(start_date)
+    return data_loader.process_signals().processed_data
+
+
+@stage_cache
+def execute_trade(symbol, trade_size):
+    executions = AdaptiveTWAP(symbol, trade_size, seed=TRADE_SEED).execute()
+    executions['credit_duration'] = 3.8
+    executions['vega'] = 25000
+    executions['beta'] = 0.8
+    executions['notional'] = 100 * executions['price']
+    executions.index = executions['timestamp']
+    return executions
+
+
+@stage_cache
+def attribute_pnl(start_date, symbol, trade_size):
+    # Attributes the cached executions the execution tab shows
+    attributor = StreamingPnLAttributor(process_signals(start_date))
+    pnl_breakdown = attributor.update(execute_trade(symbol, trade_size))
+    return pnl_breakdown, attributor.snapshot()
+
+
+def sample_portfolio():
+    return pd.DataFrame({
+        'symbol': ['SPY', 'TLT', 'HYG'],
+        'shares': [1000, 2000, 1500],
+        'price': [400, 120, 78],
+        'spread': [0.01, 0.02, 0.035],
+        'spread_duration': [0.0, 0.0, 3.5],
+        'liquidity_factor': [0.95, 0.85, 0.8],
+    })
+
+
+@stage_cache
+def run_stress_tests():
+    return ScenarioEngine(sample_portfolio()).run()
+
+
+@stage_cache
+def factor_risk(start_date):
+    # Primed once per start date; live_factor_risk rolls it forward
+    return EWMACovariance.from_raw_data(load_raw_data(start_date))
+
+
+def live_factor_risk(start_date):
+    """Session's EWMA engine, folding in bars that arrived since it was primed
+
+    Each rerun passes only the new bars to ``update`` (O(k^2) each), so a
+    fresh load_raw_data after the cache TTL never re-primes from full
+    history. Bars missing a factor still update the factors they have.
+    """
+    raw_data = load_raw_data(start_date)
+    state = st.session_state.setdefault('factor_risk', {})
+    if start_date not in state:
+        state[start_date] = (factor_risk(start_date), raw_data.index[-1])
+    covariance, last = state[start_date]
+    if raw_data.index[-1] > last:
+        # The last folded bar is kept so the first new return has a base
+        moves = factor_moves(raw_data.loc[last:], dropna=False).iloc[1:]
+        for bar in moves.to_numpy():
+            covariance.update(bar)
+        state[start_date] = (covariance, raw_data.index[-1])
+    return covariance
+
+
+# Figures are cached on the same inputs as the stage they plot, so reruns
+# reuse them instead of rebuilding from full-history frames. Series are
+# downsampled to about one point per pixel before they go to the browser.
+# plotly.express is imported where a chart is built, so the page renders
+# before the ~0.3s plotly import is paid.
+
+@stage_cache
+def signal_figure(start_date, column, title, y_label, width=DEFAULT_WIDTH):
+    import plotly.express as px
+    processed_data = downsample(process_signals(start_date), [column], width)
+    return (
+        px.line(processed_data,
+                x=processed_data.index,
+                y=column,
+                title=title,
+                labels={'value': y_label, 'index': 'Date'})
+        .update_layout(template='plotly_dark', height=400)
+    )
+
+
+@stage_cache
+def execution_figure(symbol, trade_size, width=DEFAULT_WIDTH):
+    import plotly.express as px
+    return (
+        px.scatter(downsample(execute_trade(symbol, trade_size), ['price'], width),
+                   x='timestamp',
+                   y='price',
+                   size='shares',
+                   color='shares',
+                   title="Trade Execution Prices",
+                   labels={'price': 'Execution Price', 'timestamp': 'Time'})
+        .update_traces(marker=dict(line=dict(width=1, color='DarkSlateGrey')))
+        .update_layout(template='plotly_dark', height=400)
+    )
+
+
+@stage_cache
+def cumulative_pnl_figure(start_date, symbol, trade_size, width=DEFAULT_WIDTH):
+    import plotly.express as px
+    pnl_breakdown, _ = attribute_pnl(start_date, symbol, trade_size)
+    return (
+        px.area(downsample(pnl_breakdown.sum(axis=1).cumsum(), width=width),
+                title="Cumulative PnL",
+                labels={'value': 'Cumulative PnL', 'index': 'Date'})
+        .update_layout(template='plotly_dark', height=400)
+    )
+
+# ----------------------------
+# DASHBOARD FRAGMENTS
+# ----------------------------
+# Each panel is a fragment so it can rerun on its own without re-rendering
+# the rest of the page.
+
+@st.fragment
+def render_market_signals(start_date):
+    st.header("Market Signals")
     
-    def process_signals(self):
-        """Create regime-aware features and signals"""
-        df = self.raw_data.copy()
-        
-        # Credit spreads
-        df['quality_spread'] = df['baa_10y'] - df['aaa_10y']
-        df['term_spread'] = df['10y_yield'] - df['2y_yield']
-        
-        # Z-score normalization
-        for col in ['quality_spread', 'term_spread', 'vix']:
-            df[f'{col}_z'] = (
-                df[col] - df[col].rolling(126).mean()
-            ) / df[col].rolling(126).std()
-        
-        # Composite signal
-        df['signal'] = 0.7 * df['quality_spread_z'] + 0.3 * df['term_spread_z']
-        
-        self.processed_data = df.dropna()
-        return self
-
-class AdaptiveTWAP:
-    def __init__(self, symbol, quantity, duration_min=5):
-        self.symbol = symbol
-        self.quantity = quantity
-        self.duration = timedelta(minutes=duration_min)
-        
-    def execute(self):
-        """Simulate TWAP execution with market impact"""
-        fills = []
-        remaining = self.quantity
-        start = datetime.now(pytz.UTC)
-        
-        while remaining > 0 and datetime.now(pytz.UTC) < start + self.duration:
-            # Simulate market data
-            mid_price = 100 + np.random.normal(0, 0.1)
-            spread = 0.05
-            
-            # Calculate slice size
-            slice_size = min(remaining, max(100, int(1000000 * 0.0005)))
-            
-            # Price improvement logic
-            fill_price = mid_price + np.random.uniform(-0.01, 0.01)
-            
-            # Record fill
-            fills.append({
-                'timestamp': datetime.now(pytz.UTC),
-                'symbol': self.symbol,
-                'price': fill_price,
-                'shares': slice_size,
-                'mid': mid_price
-            })
-            remaining -= slice_size
-            
-            # SEC-compliant pause
-            time.sleep(0.1)
-        
-        return pd.DataFrame(fills)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(
+            signal_figure(start_date, 'quality_spread', "Credit Spread (BAA - AAA)", 'Spread (bps)'),
+            use_container_width=True
+        )
+    
+    with col2:
+        st.plotly_chart(
+            signal_figure(start_date, 'term_spread', "Term Structure (10Y - 2Y)", 'Yield Spread (%)'),
+            use_container_width=True
+        )
+    
+    st.plotly_chart(
+        signal_figure(start_date, 'signal', "Composite Trading Signal", 'Signal Strength'),
+        use_container_width=True
+    )
+
 
-class PnLAttributor:
-    def __init__(self, trades):
-        self.trades = trades
+@st.fragment
+def render_execution(start_date, symbol, trade_size):
+    import plotly.express as px
+    st.header("Trade Execution & Performance")
     
-    def attribute(self):
-        """Attribute PnL to different factors"""
-        attribution = pd.DataFrame(index=self.trades.index)
-        
-        # Execution quality
-        if 'mid' in self.trades and 'price' in self.trades and 'shares' in self.trades:
-            attribution['Execution'] = (self.trades['price'] - self.trades['mid']) * self.trades['shares']
-        else:
-            attribution['Execution'] = 0
-        
-        # Market move
-        attribution['Market'] = np.random.normal(0, 50, len(attribution))
-        
-        return attribution.dropna()
-
-class BarclaysRiskSystem:
-    def __init__(self):
-        self.limits = {
-            'DV01': 100000,   # $100k per 1bp
-            'CS01': 50000,    # $50k per 1bp credit spread move
-            'MaxNotional': 1e8 # $100MM
-        }
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(execution_figure(symbol, trade_size), use_container_width=True)
     
-    def check_limits(self, positions):
-        """Check positions against risk limits"""
-        exposures = self.calculate_exposures(positions)
-        violations = {}
-        
-        for metric, limit in self.limits.items():
-            if metric in exposures:
-                violations[metric] = abs(exposures[metric]) > limit
-            else:
-                violations[metric] = False
-        
-        return violations
+    with col2:
+        st.plotly_chart(
+            px.bar(st.session_state.pnl_stats['components'].reset_index(),
+                  x='index', 
+                  y=0,
+                  title="PnL Attribution by Factor",
+                  labels={'index': 'Factor', '0': 'PnL Contribution'})
+            .update_layout(template='plotly_dark', height=400),
+            use_container_width=True
+        )
     
-    def calculate_exposures(self, positions):
-        """Calculate portfolio risk exposures"""
-        exposures = {
-            'MaxNotional': positions.get('notional', 0)
-        }
-        
-        if 'notional' in positions and 'duration' in positions:
-            exposures['DV01'] = positions['notional'] * 0.0001 * positions['duration']
-        if 'notional' in positions and 'spread_duration' in positions:
-            exposures['CS01'] = positions['notional'] * 0.0001 * positions['spread_duration']
-        
-        return exposures
-
-class CrisisSimulator:
-    SCENARIOS = {
-        '2008 Crisis': {
-            'equity_shock': -0.45,
-            'credit_spread_widen': 0.35,  # 35bps
-        },
-        '2020 COVID': {
-            'equity_shock': -0.35,
-            'credit_spread_widen': 0.25,
-        },
-        '2022 Inflation': {
-            'equity_shock': -0.25,
-            'credit_spread_widen': 0.15,
-        }
+    st.plotly_chart(cumulative_pnl_figure(start_date, symbol, trade_size), use_container_width=True)
+
+
+@st.fragment
+def render_risk(start_date):
+    import plotly.express as px
+    st.header("Risk Management")
+    
+    # Risk exposures
+    risk_system = BarclaysRiskSystem()
+    positions = {
+        'notional': 5000000,
+        'duration': 4.2,
+        'spread_duration': 3.8
     }
+    exposures = risk_system.calculate_exposures(positions)
+    violations = risk_system.check_limits(positions)
     
-    def __init__(self, portfolio):
-        self.portfolio = portfolio
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(
+            px.bar(x=list(exposures.keys()), 
+                  y=list(exposures.values()),
+                  title="Current Risk Exposures",
+                  labels={'x': 'Risk Metric', 'y': 'Exposure'})
+            .update_layout(template='plotly_dark', height=400),
+            use_container_width=True
+        )
     
-    def run_scenarios(self):
-        """Run all defined stress scenarios"""
-        results = {}
-        for name, params in self.SCENARIOS.items():
-            shocked_portfolio = self._apply_shocks(self.portfolio.copy(), params)
-            results[name] = self._calculate_pnl_impact(shocked_portfolio)
-        return pd.DataFrame.from_dict(results, orient='index', columns=['PnL Impact'])
+    with col2:
+        st.plotly_chart(
+            px.bar(st.session_state.stress_results.reset_index(),
+                  x='index', 
+                  y='PnL Impact',
+                  title="Stress Test Results",
+                  labels={'index': 'Scenario', 'PnL Impact': 'PnL Impact ($)'})
+            .update_layout(template='plotly_dark', height=400),
+            use_container_width=True
+        )
     
-    def _apply_shocks(self, portfolio, params):
-        """Apply shocks to portfolio positions"""
-        portfolio['price'] = portfolio['price'] * (1 + params['equity_shock'])
-        portfolio['spread'] = portfolio['spread'] + params['credit_spread_widen']
-        return portfolio
+    # Risk limits table
+    st.subheader("Risk Limit Monitoring")
+    risk_data = []
+    for metric, limit in risk_system.limits.items():
+        value = exposures.get(metric, 0)
+        status = "⚠️ Violation" if violations.get(metric, False) else "✅ Within Limit"
+        risk_data.append({
+            'Risk Metric': metric,
+            'Current Value': f"${value:,.0f}",
+            'Limit': f"${limit:,.0f}",
+            'Status': status
+        })
+        
+    risk_df = pd.DataFrame(risk_data)
+    st.dataframe(
+        risk_df.style.apply(
+            lambda x: ['background: #1f2937' if x.name % 2 == 0 else 'background: #111827'] * len(x), 
+            axis=1
+        ).applymap(
+            lambda x: 'color: #ef4444' if 'Violation' in x else 'color: #10b981',
+            subset=['Status']
+        ),
+        use_container_width=True,
+        height=200
+    )
+
+    # Parametric factor risk from the streaming EWMA covariance
+    st.subheader("Factor Risk (EWMA)")
+    covariance = live_factor_risk(start_date)
+    exposures = portfolio_exposures(sample_portfolio(), covariance.factors)
+    contributions = covariance.factor_contributions(exposures)
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.metric("Daily PnL Vol", f"${covariance.portfolio_vol(exposures):,.0f}")
+        st.metric("Factors", len(covariance.factors))
+    with col2:
+        st.plotly_chart(
+            px.bar(x=contributions.index, y=contributions.to_numpy(),
+                   title="Contribution to Daily Vol",
+                   labels={'x': 'Factor', 'y': 'Vol Contribution ($)'})
+            .update_layout(template='plotly_dark', height=350),
+            use_container_width=True
+        )
+
+
+@st.fragment
+def render_performance_summary(show_advanced):
+    import plotly.express as px
+    st.subheader("Performance Summary")
     
-    def _calculate_pnl_impact(self, portfolio):
-        """Calculate PnL impact of shocks"""
-        return (portfolio['price'] * portfolio['shares']).sum() - \
-               (self.portfolio['price'] * self.portfolio['shares']).sum()
+    col1, col2, col3, col4 = st.columns(4)
+    # Running statistics kept by the streaming attributor, no history rescan
+    pnl_stats = st.session_state.pnl_stats
+    cum_returns = pnl_stats['total_return']
+    with col1:
+        st.markdown("""
+        <div class="metric-card">
+            <div class="metric-value">{:.2%}</div>
+            <div class="metric-label">Total Return</div>
+        </div>
+        """.format(cum_returns), unsafe_allow_html=True)
+    
+    max_drawdown = pnl_stats['max_drawdown']
+    with col2:
+        st.markdown("""
+        <div class="metric-card">
+            <div class="metric-value">{:.2%}</div>
+            <div class="metric-label">Max Drawdown</div>
+        </div>
+        """.format(max_drawdown), unsafe_allow_html=True)
+    
+    sharpe_ratio = pnl_stats['sharpe']
+    with col3:
+        st.markdown("""
+        <div class="metric-card">
+            <div class="metric-value">{:.2f}</div>
+            <div class="metric-label">Sharpe Ratio</div>
+        </div>
+        """.format(sharpe_ratio), unsafe_allow_html=True)
+    
+    win_rate = pnl_stats['win_rate']
+    with col4:
+        st.markdown("""
+        <div class="metric-card">
+            <div class="metric-value">{:.2%}</div>
+            <div class="metric-label">Win Rate</div>
+        </div>
+        """.format(win_rate), unsafe_allow_html=True)
+    
+    # Advanced metrics
+    if show_advanced:
+        with st.expander("Advanced Metrics"):
+            st.plotly_chart(
+                px.line(downsample(st.session_state.pnl_breakdown),
+                      title="Daily PnL Components",
+                      labels={'value': 'PnL Contribution', 'index': 'Date'})
+                .update_layout(template='plotly_dark', height=400),
+                use_container_width=True
+            )
+        
+            st.dataframe(
+                st.session_state.pnl_breakdown.describe().T,
+                use_container_width=True
+            )
+
+
+@st.fragment
+def render_performance():
+    import plotly.express as px
+    st.subheader("Performance")
+    uploaded = st.file_uploader("Load a trace written by main.py --trace", type=['json', 'csv'])
+    tracer = st.session_state.tracer
+    spans = load_trace(uploaded) if uploaded is not None else tracer.to_frame()
+    if spans.empty:
+        st.info("Tick 'Record Performance Trace' and run the analysis, or load a trace file")
+        return
+
+    summary = summarize(spans)
+    st.plotly_chart(
+        px.bar(summary.reset_index(), x='name', y=['wall_s', 'cpu_s'], barmode='group',
+               title="Time per Stage", labels={'value': 'Seconds', 'name': 'Stage'})
+        .update_layout(template='plotly_dark', height=350),
+        use_container_width=True
+    )
+    st.dataframe(summary, use_container_width=True)
+
+    if uploaded is None:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("Download JSON Trace", tracer.to_json(), file_name='trace.json')
+        with col2:
+            st.download_button("Download CSV Trace", spans.to_csv(index=False), file_name='trace.csv')
+
+
+@contextlib.contextmanager
+def traced(name):
+    """Span recorded into this session's tracer"""
+    with use_tracer(st.session_state.tracer), span(name):
+        yield
+
 
 # ----------------------------
 # STREAMLIT DASHBOARD
@@ -260,7 +450,10 @@ if 'data_loaded' not in st.session_state:
     st.session_state.processed_data = None
     st.session_state.executions = None
     st.session_state.pnl_breakdown = None
+    st.session_state.pnl_stats = None
     st.session_state.stress_results = None
+    st.session_state.analysis_inputs = None
+    st.session_state.tracer = Tracer()
 
 # Sidebar controls
 st.sidebar.header("Quant Research")
@@ -291,6 +484,18 @@ trade_size = st.sidebar.slider(
 
 run_analysis = st.sidebar.button("Run Full Analysis")
 show_advanced = st.sidebar.checkbox("Show Advanced Metrics")
+record_trace = st.sidebar.checkbox("Record Performance Trace")
+# tracemalloc is process-wide and slows every session's allocations, so
+# memory tracing is a separate opt-in
+trace_memory = record_trace and st.sidebar.checkbox(
+    "Trace Memory", help="Peak memory per span; slows allocations for all sessions while on"
+)
+
+# Tracing off costs one flag check per instrumented call
+if record_trace:
+    st.session_state.tracer.enable(memory=trace_memory)
+else:
+    st.session_state.tracer.disable()
 
 # Main dashboard
 st.title("📈 QuantEdge Dashboard")
@@ -300,236 +505,49 @@ st.markdown("""
 
 # Run analysis when button is clicked
 if run_analysis:
-    with st.spinner("Loading market data..."):
-        data_loader = InstitutionalDataLoader(start_date=start_date)
-        data_loader.load_raw_data().process_signals()
-        st.session_state.processed_data = data_loader.processed_data
+    st.session_state.tracer.clear()
+    with traced("analysis run"):
+        with st.spinner("Loading market data..."):
+            st.session_state.processed_data = process_signals(start_date)
     
-    with st.spinner("Executing trades..."):
-        algo = AdaptiveTWAP(symbol, trade_size)
-        st.session_state.executions = algo.execute()
-        st.session_state.executions['credit_duration'] = 3.8
-        st.session_state.executions['vega'] = 25000
-        st.session_state.executions['beta'] = 0.8
-        st.session_state.executions['notional'] = 100 * st.session_state.executions['price']
-        st.session_state.executions.index = st.session_state.executions['timestamp']
+        with st.spinner("Executing trades..."):
+            st.session_state.executions = execute_trade(symbol, trade_size)
     
-    with st.spinner("Running analysis..."):
-        # PnL Attribution
-        attributor = PnLAttributor(st.session_state.executions)
-        st.session_state.pnl_breakdown = attributor.attribute()
+        with st.spinner("Running analysis..."):
+            # PnL Attribution
+            st.session_state.pnl_breakdown, st.session_state.pnl_stats = attribute_pnl(
+                start_date, symbol, trade_size
+            )
         
-        # Stress Testing
-        portfolio = pd.DataFrame({
-            'symbol': ['SPY', 'TLT'],
-            'shares': [1000, 2000],
-            'price': [400, 120],
-            'spread': [0.01, 0.02],
-        })
-        simulator = CrisisSimulator(portfolio)
-        st.session_state.stress_results = simulator.run_scenarios()
+            # Stress Testing
+            st.session_state.stress_results = run_stress_tests()
         
-        st.session_state.data_loaded = True
-        st.success("Analysis completed successfully!")
+            st.session_state.analysis_inputs = (start_date, symbol, trade_size)
+            st.session_state.data_loaded = True
+            st.success("Analysis completed successfully!")
 
 # Display results if available
 if st.session_state.data_loaded:
+    analysis_start, analysis_symbol, analysis_size = st.session_state.analysis_inputs
+
     # Tab layout
-    tab1, tab2, tab3 = st.tabs(["Market Signals", "Execution & PnL", "Risk Analysis"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Market Signals", "Execution & PnL", "Risk Analysis", "Performance"])
 
-    with tab1:
-        st.header("Market Signals")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.plotly_chart(
-                px.line(st.session_state.processed_data, 
-                        x=st.session_state.processed_data.index, 
-                        y='quality_spread',
-                        title="Credit Spread (BAA - AAA)",
-                        labels={'value': 'Spread (bps)', 'index': 'Date'})
-                .update_layout(template='plotly_dark', height=400),
-                use_container_width=True
-            )
-        
-        with col2:
-            st.plotly_chart(
-                px.line(st.session_state.processed_data, 
-                        x=st.session_state.processed_data.index, 
-                        y='term_spread',
-                        title="Term Structure (10Y - 2Y)",
-                        labels={'value': 'Yield Spread (%)', 'index': 'Date'})
-                .update_layout(template='plotly_dark', height=400),
-                use_container_width=True
-            )
-        
-        st.plotly_chart(
-            px.line(st.session_state.processed_data, 
-                    x=st.session_state.processed_data.index, 
-                    y='signal',
-                    title="Composite Trading Signal",
-                    labels={'value': 'Signal Strength', 'index': 'Date'})
-            .update_layout(template='plotly_dark', height=400),
-            use_container_width=True
-        )
+    with tab1, traced("render: market signals"):
+        render_market_signals(analysis_start)
 
-    with tab2:
-        st.header("Trade Execution & Performance")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.plotly_chart(
-                px.scatter(st.session_state.executions, 
-                          x='timestamp', 
-                          y='price',
-                          size='shares', 
-                          color='shares',
-                          title="Trade Execution Prices",
-                          labels={'price': 'Execution Price', 'timestamp': 'Time'})
-                .update_traces(marker=dict(line=dict(width=1, color='DarkSlateGrey')))
-                .update_layout(template='plotly_dark', height=400),
-                use_container_width=True
-            )
-        
-        with col2:
-            st.plotly_chart(
-                px.bar(st.session_state.pnl_breakdown.sum().reset_index(),
-                      x='index', 
-                      y=0,
-                      title="PnL Attribution by Factor",
-                      labels={'index': 'Factor', '0': 'PnL Contribution'})
-                .update_layout(template='plotly_dark', height=400),
-                use_container_width=True
-            )
-        
-        cum_pnl = st.session_state.pnl_breakdown.sum(axis=1).cumsum()
-        st.plotly_chart(
-            px.area(cum_pnl,
-                   title="Cumulative PnL",
-                   labels={'value': 'Cumulative PnL', 'index': 'Date'})
-            .update_layout(template='plotly_dark', height=400),
-            use_container_width=True
-        )
+    with tab2, traced("render: execution & pnl"):
+        render_execution(analysis_start, analysis_symbol, analysis_size)
 
-    with tab3:
-        st.header("Risk Management")
-        
-        # Risk exposures
-        risk_system = BarclaysRiskSystem()
-        positions = {
-            'notional': 5000000,
-            'duration': 4.2,
-            'spread_duration': 3.8
-        }
-        exposures = risk_system.calculate_exposures(positions)
-        violations = risk_system.check_limits(positions)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.plotly_chart(
-                px.bar(x=list(exposures.keys()), 
-                      y=list(exposures.values()),
-                      title="Current Risk Exposures",
-                      labels={'x': 'Risk Metric', 'y': 'Exposure'})
-                .update_layout(template='plotly_dark', height=400),
-                use_container_width=True
-            )
-        
-        with col2:
-            st.plotly_chart(
-                px.bar(st.session_state.stress_results.reset_index(),
-                      x='index', 
-                      y='PnL Impact',
-                      title="Stress Test Results",
-                      labels={'index': 'Scenario', 'PnL Impact': 'PnL Impact ($)'})
-                .update_layout(template='plotly_dark', height=400),
-                use_container_width=True
-            )
-        
-        # Risk limits table
-        st.subheader("Risk Limit Monitoring")
-        risk_data = []
-        for metric, limit in risk_system.limits.items():
-            value = exposures.get(metric, 0)
-            status = "⚠️ Violation" if violations.get(metric, False) else "✅ Within Limit"
-            risk_data.append({
-                'Risk Metric': metric,
-                'Current Value': f"${value:,.0f}",
-                'Limit': f"${limit:,.0f}",
-                'Status': status
-            })
-            
-        risk_df = pd.DataFrame(risk_data)
-        st.dataframe(
-            risk_df.style.apply(
-                lambda x: ['background: #1f2937' if x.name % 2 == 0 else 'background: #111827'] * len(x), 
-                axis=1
-            ).applymap(
-                lambda x: 'color: #ef4444' if 'Violation' in x else 'color: #10b981',
-                subset=['Status']
-            ),
-            use_container_width=True,
-            height=200
-        )
+    with tab3, traced("render: risk"):
+        render_risk(analysis_start)
+
+    with tab4:
+        render_performance()
 
     # Performance metrics
     st.divider()
-    st.subheader("Performance Summary")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    cum_returns = (1 + st.session_state.pnl_breakdown.sum(axis=1)).prod() - 1
-    with col1:
-        st.markdown("""
-        <div class="metric-card">
-            <div class="metric-value">{:.2%}</div>
-            <div class="metric-label">Total Return</div>
-        </div>
-        """.format(cum_returns), unsafe_allow_html=True)
-    
-    max_drawdown = (1 + st.session_state.pnl_breakdown.sum(axis=1)).cumprod().div(
-        (1 + st.session_state.pnl_breakdown.sum(axis=1)).cumprod().cummax()
-    ).sub(1).min()
-    with col2:
-        st.markdown("""
-        <div class="metric-card">
-            <div class="metric-value">{:.2%}</div>
-            <div class="metric-label">Max Drawdown</div>
-        </div>
-        """.format(max_drawdown), unsafe_allow_html=True)
-    
-    sharpe_ratio = st.session_state.pnl_breakdown.sum(axis=1).mean() / st.session_state.pnl_breakdown.sum(axis=1).std() * np.sqrt(252)
-    with col3:
-        st.markdown("""
-        <div class="metric-card">
-            <div class="metric-value">{:.2f}</div>
-            <div class="metric-label">Sharpe Ratio</div>
-        </div>
-        """.format(sharpe_ratio), unsafe_allow_html=True)
-    
-    win_rate = (st.session_state.pnl_breakdown.sum(axis=1) > 0).mean()
-    with col4:
-        st.markdown("""
-        <div class="metric-card">
-            <div class="metric-value">{:.2%}</div>
-            <div class="metric-label">Win Rate</div>
-        </div>
-        """.format(win_rate), unsafe_allow_html=True)
-
-    # Advanced metrics
-    if show_advanced:
-        with st.expander("Advanced Metrics"):
-            st.plotly_chart(
-                px.line(st.session_state.pnl_breakdown,
-                      title="Daily PnL Components",
-                      labels={'value': 'PnL Contribution', 'index': 'Date'})
-                .update_layout(template='plotly_dark', height=400),
-                use_container_width=True
-            )
-            
-            st.dataframe(
-                st.session_state.pnl_breakdown.describe().T,
-                use_container_width=True
-            )
+    render_performance_summary(show_advanced)
 
 # Initial state message
 if not st.session_state.data_loaded:
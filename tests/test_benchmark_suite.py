@@ -0,0 +1,31 @@
+import pandas as pd
+
+from benchmarks import suite, synthetic
+from src.data_loader import InstitutionalDataLoader
+
+
+def test_generators_are_seeded():
+    pd.testing.assert_frame_equal(synthetic.market_data(300, seed=3), synthetic.market_data(300, seed=3))
+    pd.testing.assert_frame_equal(synthetic.fills(100, seed=3), synthetic.fills(100, seed=3))
+    assert not synthetic.portfolio(100, seed=3).equals(synthetic.portfolio(100, seed=4))
+
+
+def test_market_data_feeds_signal_stage():
+    loader = InstitutionalDataLoader(cache_dir=None)
+    loader.raw_data = synthetic.market_data(400, seed=1)
+    loader.process_signals()
+    assert loader.processed_data['signal'].notna().any()
+    assert (loader.raw_data[['SPY', 'TLT', 'HYG', 'LQD', 'vix']] > 0).all().all()
+
+
+def test_run_and_compare_with_baseline(tmp_path):
+    results = suite.run(['stress', 'risk_limits'], sizes=[100, 10 ** 9], repeats=1)
+    # Sizes above a case's cap are skipped unless forced
+    assert list(results['rows']) == [100, 100]
+
+    path = suite.save(results, str(tmp_path / 'baseline.json'))
+    baseline = suite.load(path)
+    slower = results.assign(best_s=results['best_s'] * 2)
+    compared = suite.compare(slower, baseline, tolerance=0.25)
+    assert compared['regression'].all()
+    assert compared['ratio'].round(6).eq(2).all()
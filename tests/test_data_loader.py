@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+from src import data_loader
+from src.data_loader import (
+    ETF_SYMBOLS, FRED_SERIES, IncrementalSignalEngine, InstitutionalDataLoader, MarketDataCache
+)
+
+
+def _write_fixtures(fixture_dir, dates):
+    rng = np.random.default_rng(0)
+    for source, keys in [('yahoo', ETF_SYMBOLS), ('fred', list(FRED_SERIES))]:
+        (fixture_dir / source).mkdir(parents=True)
+        for key in keys:
+            values = 100 + rng.normal(0, 1, len(dates)).cumsum()
+            pd.Series(values, index=dates, name=key).to_csv(
+                fixture_dir / source / f'{key}.csv', index_label='date'
+            )
+
+
+def test_offline_replay_runs_full_signal_stage(tmp_path):
+    dates = pd.bdate_range('2020-01-01', periods=300)
+    _write_fixtures(tmp_path / 'fixtures', dates)
+
+    loader = InstitutionalDataLoader(
+        start_date='2020-01-01', cache_dir=None, offline=True,
+        fixture_dir=str(tmp_path / 'fixtures')
+    )
+    loader.load_raw_data().process_signals()
+
+    assert list(loader.raw_data.columns) == ETF_SYMBOLS + list(FRED_SERIES.values())
+    assert len(loader.processed_data) == 300 - 125
+
+
+def test_cache_fetches_only_missing_tail(tmp_path, monkeypatch):
+    dates = pd.bdate_range('2020-01-01', '2020-03-31')
+    calls = []
+
+    def fake_fetch(keys, start, end):
+        calls.append((start, end))
+        idx = dates[(dates >= start) & (dates <= end)]
+        return pd.DataFrame({k: np.arange(len(idx), dtype=float) for k in keys}, index=idx)
+
+    monkeypatch.setattr(data_loader, 'FETCHERS', {'yahoo': fake_fetch, 'fred': fake_fetch})
+    today = pd.Timestamp('2020-02-28')
+    monkeypatch.setattr(pd.Timestamp, 'today', classmethod(lambda cls: today))
+
+    loader = InstitutionalDataLoader(start_date='2020-01-01', cache_dir=str(tmp_path))
+    loader.load_raw_data()
+    assert calls == [(pd.Timestamp('2020-01-01'), today)] * 2
+
+    calls.clear()
+    today = pd.Timestamp('2020-03-31')
+    loader.load_raw_data()
+    assert calls == [(pd.Timestamp('2020-02-29'), today)] * 2
+    assert loader.raw_data.index[-1] == pd.Timestamp('2020-03-31')
+
+    cache = MarketDataCache(str(tmp_path))
+    assert isinstance(cache.read('yahoo', 'SPY').values.base, np.memmap)
+
+    calls.clear()
+    loader.load_raw_data()
+    assert calls == []
+
+
+def test_empty_download_is_not_cached(tmp_path, monkeypatch):
+    def failed_fetch(keys, start, end):
+        return pd.DataFrame(columns=keys, dtype=float)
+
+    monkeypatch.setattr(data_loader, 'FETCHERS', {'yahoo': failed_fetch, 'fred': failed_fetch})
+    InstitutionalDataLoader(start_date='2020-01-01', cache_dir=str(tmp_path)).load_raw_data()
+
+    assert MarketDataCache(str(tmp_path)).coverage('yahoo', 'SPY') is None
+
+
+def test_empty_head_download_keeps_cached_start(tmp_path, monkeypatch):
+    dates = pd.bdate_range('2020-01-01', '2020-03-31')
+    calls = []
+
+    def head_fails(keys, start, end):
+        calls.append((start, end))
+        idx = dates[(dates >= max(start, pd.Timestamp('2020-02-03'))) & (dates <= end)]
+        return pd.DataFrame({k: np.arange(len(idx), dtype=float) for k in keys}, index=idx)
+
+    monkeypatch.setattr(data_loader, 'FETCHERS', {'yahoo': head_fails, 'fred': head_fails})
+    monkeypatch.setattr(pd.Timestamp, 'today', classmethod(lambda cls: pd.Timestamp('2020-03-31')))
+
+    InstitutionalDataLoader(start_date='2020-02-03', cache_dir=str(tmp_path)).load_raw_data()
+    loader = InstitutionalDataLoader(start_date='2020-01-01', cache_dir=str(tmp_path))
+    loader.load_raw_data()
+    cache = MarketDataCache(str(tmp_path))
+    assert cache.coverage('yahoo', 'SPY')[0] == pd.Timestamp('2020-02-03')
+
+    # The head window is still missing, so the next run asks for it again
+    calls.clear()
+    loader.load_raw_data()
+    assert calls == [(pd.Timestamp('2020-01-01'), pd.Timestamp('2020-02-02'))] * 2
+
+
+def _raw_frame(n, seed=1):
+    rng = np.random.default_rng(seed)
+    cols = ETF_SYMBOLS + list(FRED_SERIES.values())
+    data = 5 + rng.normal(0, 0.1, (n, len(cols))).cumsum(axis=0)
+    return pd.DataFrame(data, index=pd.bdate_range('2015-01-01', periods=n), columns=cols)
+
+
+def test_incremental_signals_match_full_recompute():
+    raw = _raw_frame(1000)
+
+    full = InstitutionalDataLoader(cache_dir=None)
+    full.raw_data = raw
+    full.process_signals()
+
+    live = InstitutionalDataLoader(cache_dir=None)
+    live.raw_data = raw.iloc[:600]
+    live.process_signals()
+    live.append_raw_data(raw.iloc[600:601])
+    for i in range(601, 1000, 50):
+        live.append_raw_data(raw.iloc[i:i + 50])
+
+    # Appends are buffered as chunks until the frames are read
+    assert len(live._raw.chunks) == 10
+    pd.testing.assert_frame_equal(live.processed_data, full.processed_data, rtol=1e-9)
+    pd.testing.assert_frame_equal(live.raw_data, raw)
+    assert len(live._raw.chunks) == 1
+
+
+def test_signal_engine_cold_start_drops_warmup_rows():
+    raw = _raw_frame(200)
+    engine = IncrementalSignalEngine()
+    out = engine.update(raw.iloc[:100])
+    assert out.empty
+    out = engine.update(raw.iloc[100:])
+    assert out.index[0] == raw.index[125]
@@ -0,0 +1,76 @@
+import asyncio
+
+import numpy as np
+
+from src.execution_engine import SLICE_SIZE, AdaptiveTWAP, ExecutionScheduler, simulate_twap_batch
+
+
+def test_simulated_execution_fills_full_quantity_without_sleeping():
+    fills = AdaptiveTWAP('LQD', 10250, seed=7).execute()
+
+    assert list(fills.columns) == ['timestamp', 'symbol', 'price', 'shares', 'mid']
+    assert fills['shares'].sum() == 10250
+    assert fills['shares'].iloc[-1] == 10250 % SLICE_SIZE
+    assert (fills['timestamp'].diff().dropna().dt.total_seconds().round(6) == 0.1).all()
+
+
+def test_simulation_is_reproducible_with_seed():
+    a = AdaptiveTWAP('LQD', 5000, seed=3).execute()
+    b = AdaptiveTWAP('LQD', 5000, seed=3).execute()
+    np.testing.assert_array_equal(a['price'], b['price'])
+
+
+def test_sell_orders_fill_negative_shares():
+    fills = AdaptiveTWAP('LQD', -3000, seed=7).execute()
+    assert fills['shares'].sum() == -3000 and (fills['shares'] < 0).all()
+
+    batch = simulate_twap_batch([('LQD', 1200, 5), ('HYG', -1200, 5)], seed=1)
+    assert batch.groupby('order_id')['shares'].sum().tolist() == [1200, -1200]
+
+
+def test_batch_returns_one_columnar_table():
+    orders = [('SPY', 1200, 5), ('TLT', 10**7, 0.01), ('HYG', 0, 5)]
+    fills = simulate_twap_batch(orders, seed=1)
+
+    per_order = fills.groupby('order_id')['shares'].sum()
+    assert per_order[0] == 1200
+    # Duration caps the schedule at 6 slices of 0.6 seconds
+    assert per_order[1] == 6 * SLICE_SIZE
+    assert 2 not in per_order.index
+    assert set(fills.loc[fills['order_id'] == 1, 'symbol']) == {'TLT'}
+
+
+def test_scheduler_interleaves_orders_and_streams_fills():
+    scheduler = ExecutionScheduler(interval=0, seed=1)
+    streamed = []
+    scheduler.subscribe(streamed.append)
+    a = scheduler.submit('SPY', 1500)
+    b = scheduler.submit('TLT', -1500)
+
+    fills = asyncio.run(scheduler.run())
+
+    assert len(streamed) == len(fills) == 6
+    assert fills.groupby('order_id')['shares'].sum().to_dict() == {a: 1500, b: -1500}
+    # Slices alternate between the two orders rather than running back to back
+    assert list(fills['order_id'][:4]) == [a, b, a, b]
+    assert scheduler.orders[a].status == 'filled'
+
+
+def test_scheduler_cancel_and_amend():
+    scheduler = ExecutionScheduler(interval=0, seed=1)
+    keep = scheduler.submit('SPY', 5000)
+    stop = scheduler.submit('TLT', 5000)
+
+    def on_fill(fill):
+        if fill['order_id'] == stop:
+            scheduler.cancel(stop)
+        elif scheduler.orders[keep].filled == SLICE_SIZE:
+            scheduler.amend(keep, quantity=1200)
+
+    scheduler.subscribe(on_fill)
+    fills = asyncio.run(scheduler.run())
+
+    totals = fills.groupby('order_id')['shares'].sum()
+    assert totals[stop] == SLICE_SIZE
+    assert totals[keep] == 1200
+    assert scheduler.orders[stop].status == 'cancelled'
@@ -0,0 +1,114 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import data_loader
+from src.data_loader import InstitutionalDataLoader
+from src.fetcher import ConcurrentFetcher, FetchError, FixtureSource, RateLimiter
+
+START, END = pd.Timestamp('2020-01-01'), pd.Timestamp('2020-01-31')
+
+
+def _frame(keys, start=START, end=END):
+    idx = pd.bdate_range(start, end)
+    return pd.DataFrame({k: np.arange(len(idx), dtype=float) for k in keys}, index=idx)
+
+
+def test_transient_errors_are_retried_with_backoff():
+    calls, sleeps = [], []
+
+    def flaky(keys, start, end):
+        calls.append(keys)
+        if len(calls) < 3:
+            raise ConnectionError('reset by peer')
+        return _frame(keys)
+
+    fetcher = ConcurrentFetcher({'yahoo': flaky}, retries=3, backoff=0.5,
+                                rate_limits={}, sleep=sleeps.append)
+    result = fetcher.fetch([('yahoo', ['SPY'], START, END)])
+
+    report = result.report()
+    assert report.loc[0, 'status'] == 'ok' and report.loc[0, 'attempts'] == 3
+    assert len(sleeps) == 2 and 0.5 <= sleeps[0] < 1.0 and 1.0 <= sleeps[1] < 2.0
+    assert len(result.series('yahoo', 'SPY')) == len(pd.bdate_range(START, END))
+
+
+def test_partial_failure_is_reported_per_key():
+    def broken(keys, start, end):
+        raise TimeoutError('FRED did not answer')
+
+    fetcher = ConcurrentFetcher({'yahoo': lambda k, s, e: _frame(k), 'fred': broken},
+                                retries=1, backoff=0, sleep=lambda s: None, chunk_sizes={'yahoo': 1})
+    result = fetcher.fetch([('yahoo', ['SPY', 'TLT'], START, END), ('fred', ['DGS10', 'DGS2'], START, END)])
+
+    report = result.report().set_index('key')
+    assert list(report.loc[['SPY', 'TLT'], 'status']) == ['ok', 'ok']
+    assert list(report.loc[['DGS10', 'DGS2'], 'status']) == ['failed', 'failed']
+    assert report.loc['DGS10', 'attempts'] == 2
+    assert 'TimeoutError' in report.loc['DGS10', 'error']
+    assert result.failed() == {('fred', 'DGS10'), ('fred', 'DGS2')}
+
+
+def test_sources_are_fetched_concurrently():
+    # Each fetcher only returns once the other one is in flight
+    started = {'yahoo': threading.Event(), 'fred': threading.Event()}
+
+    def make(source, other):
+        def fetch(keys, start, end):
+            started[source].set()
+            assert started[other].wait(timeout=5)
+            return _frame(keys)
+        return fetch
+
+    fetcher = ConcurrentFetcher({'yahoo': make('yahoo', 'fred'), 'fred': make('fred', 'yahoo')}, retries=0)
+    result = fetcher.fetch([('yahoo', ['SPY'], START, END), ('fred', ['DGS10'], START, END)])
+    assert set(result.report()['status']) == {'ok'}
+
+
+def test_rate_limiter_spaces_requests_after_burst():
+    now = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(rate=2.0, burst=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(4):
+        limiter.acquire()
+    assert waits == [0.5, 0.5]
+
+
+def test_loader_reports_failures_and_falls_back_to_cache(tmp_path, monkeypatch):
+    fixtures = tmp_path / 'fixtures'
+    for source, keys in [('yahoo', data_loader.ETF_SYMBOLS), ('fred', list(data_loader.FRED_SERIES))]:
+        (fixtures / source).mkdir(parents=True)
+        for key in keys:
+            _frame([key])[key].to_csv(fixtures / source / f'{key}.csv', index_label='date')
+    monkeypatch.setattr(pd.Timestamp, 'today', classmethod(lambda cls: END))
+    replay = {s: FixtureSource(str(fixtures), s) for s in ['yahoo', 'fred']}
+    monkeypatch.setattr(data_loader, 'FETCHERS', replay)
+    monkeypatch.setattr(data_loader, 'ConcurrentFetcher',
+                        lambda fetchers, **kw: ConcurrentFetcher(fetchers, **{'sleep': lambda s: None, **kw}))
+
+    loader = InstitutionalDataLoader(start_date='2020-01-01', cache_dir=str(tmp_path / 'cache'))
+    loader.load_raw_data()
+    assert set(loader.fetch_report['status']) == {'ok'}
+
+    def down(keys, start, end):
+        raise ConnectionError('FRED is down')
+
+    # Stale cache is still served when a refresh fails
+    monkeypatch.setattr(pd.Timestamp, 'today', classmethod(lambda cls: pd.Timestamp('2020-02-14')))
+    monkeypatch.setattr(data_loader, 'FETCHERS', {'yahoo': replay['yahoo'], 'fred': down})
+    with pytest.warns(UserWarning, match='cached fred data'):
+        loader.load_raw_data()
+    assert (loader.fetch_report.query("source == 'fred'")['status'] == 'failed').all()
+    assert loader.raw_data.index[-1] == END
+
+    # Without a cache there is nothing to fall back on
+    with pytest.raises(FetchError) as info:
+        InstitutionalDataLoader(start_date='2020-01-01', cache_dir=None).load_raw_data()
+    assert info.value.report is not None
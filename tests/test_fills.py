@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+from src.execution_engine import simulate_twap_batch
+from src.fills import FillLog, FillStore
+from src.pnl_attribution import PnLAttributor
+
+
+def _factor_data():
+    index = pd.bdate_range('2024-01-01', periods=5)
+    return pd.DataFrame({
+        'SPY': [400.0, 404.0, 402.0, 405.0, 401.0],
+        'LQD': [100.0, 101.0, 100.5, 100.7, 100.2],
+        'HYG': [75.0, 75.5, 75.2, 75.1, 74.8],
+        '10y_yield': [4.00, 4.10, 4.05, 4.00, 4.20],
+        'quality_spread': [1.00, 0.90, 0.95, 0.97, 1.10],
+        'vix': [15.0, 14.0, 16.0, 15.5, 18.0],
+    }, index=index)
+
+
+def _fills():
+    return simulate_twap_batch([('LQD', 5000, 5), ('HYG', 3000, 5), ('LQD', 1200, 5)],
+                               start='2024-01-03 14:30', seed=0)
+
+
+def test_store_round_trip_with_order_constants():
+    fills = _fills()
+    store = FillStore(capacity=4).extend(fills.iloc[:7]).extend(fills.iloc[7:])
+    store.set_order(0, beta=0.8, vega=25000).set_order(1, beta=1.1)
+
+    out = store.to_frame()
+    pd.testing.assert_frame_equal(out[fills.columns], fills, check_dtype=False)
+    assert store.symbols == ['LQD', 'HYG']
+    assert store.records['symbol'].dtype == np.int32
+    assert out.loc[out['order_id'] == 1, 'beta'].eq(1.1).all()
+    assert out.loc[out['order_id'] == 2, 'beta'].isna().all()
+    assert 'duration' not in out
+
+
+def test_append_single_fills_grows_capacity():
+    fills = _fills()
+    store = FillStore(capacity=1)
+    for fill in fills.to_dict('records'):
+        store.append(fill)
+    assert len(store) == len(fills)
+    pd.testing.assert_frame_equal(store.to_frame()[fills.columns], fills, check_dtype=False)
+
+
+def test_log_replay_matches_in_memory_attribution(tmp_path):
+    fills = _fills()
+    log = FillLog(str(tmp_path / 'fills.bin'))
+    for part in (fills.iloc[:10], fills.iloc[10:]):
+        log.append(FillStore.from_frame(part, attributes={'beta': 0.8, 'duration': 7.0}))
+
+    reopened = FillLog(str(tmp_path / 'fills.bin'))
+    assert len(reopened) == len(fills)
+    assert reopened.offsets == [0, 1]
+    replayed = pd.concat(reopened.replay(chunk_size=4), ignore_index=True)
+    expected_ids = fills['order_id'] + np.where(fills.index < 10, 0, 1)
+    pd.testing.assert_frame_equal(replayed[fills.columns], fills.assign(order_id=expected_ids),
+                                  check_dtype=False)
+
+    expected = PnLAttributor(fills.assign(beta=0.8, duration=7.0), _factor_data()).attribute().sum(min_count=1)
+    totals = reopened.attribute(_factor_data(), chunk_size=4)
+    pd.testing.assert_series_equal(totals, expected, check_names=False)
+    assert list(reopened.attribute(_factor_data(), chunk_size=4, by='symbol').index) == ['HYG', 'LQD']
+
+
+def test_log_keeps_order_attributes_of_each_append_apart(tmp_path):
+    path = str(tmp_path / 'fills.bin')
+    day1 = simulate_twap_batch([('LQD', 2000, 5)], start='2024-01-03 14:30', seed=0)
+    day2 = simulate_twap_batch([('HYG', 2000, 5)], start='2024-01-04 14:30', seed=1)
+    assert day1['order_id'].eq(0).all() and day2['order_id'].eq(0).all()
+
+    log = FillLog(path)
+    log.append(FillStore.from_frame(day1, attributes={'beta': 0.8}))
+    log.append(FillStore.from_frame(day2, attributes={'beta': 1.5}))
+
+    reopened = FillLog(path)
+    assert reopened.offsets == [0, 1]
+    replayed = pd.concat(reopened.replay(), ignore_index=True)
+    assert replayed.groupby('symbol')['order_id'].unique().to_dict() == {'HYG': [1], 'LQD': [0]}
+    assert replayed.groupby('symbol')['beta'].unique().to_dict() == {'HYG': [1.5], 'LQD': [0.8]}
+
+    # A third store starting at 0 again lands past every id already logged
+    reopened.append(FillStore.from_frame(day1, attributes={'beta': 1.1}))
+    assert FillLog(path).orders()['beta'].to_dict() == {0: 0.8, 1: 1.5, 2: 1.1}
+
+
+def test_log_ignores_torn_trailing_record(tmp_path):
+    path = str(tmp_path / 'fills.bin')
+    fills = _fills()
+    FillLog(path).append(FillStore.from_frame(fills))
+    with open(path, 'ab') as f:
+        f.write(b'\x00' * 7)
+
+    log = FillLog(path)
+    assert len(log) == len(fills)
+    log.append(FillStore.from_frame(fills.iloc[:3]))
+    assert len(FillLog(path)) == len(fills) + 3
+    tail = pd.concat(FillLog(path).replay(), ignore_index=True).iloc[-3:]
+    assert tail['price'].tolist() == fills['price'].iloc[:3].tolist()
+
+
+def test_log_keeps_latest_order_attributes(tmp_path):
+    path = str(tmp_path / 'fills.bin')
+    fills = _fills()
+    FillLog(path).append(FillStore.from_frame(fills, attributes={'beta': 0.8, 'vega': 1.0}))
+    FillLog(path).set_order(1, beta=1.2)
+
+    orders = FillLog(path).orders()
+    assert orders['beta'].tolist() == [0.8, 1.2, 0.8]
+    assert orders['vega'].tolist() == [1.0, 1.0, 1.0]
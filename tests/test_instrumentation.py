@@ -0,0 +1,76 @@
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import Tracer, instrument, load_trace, span, summarize, use_tracer
+
+
+@instrument('build')
+def _build(n):
+    return pd.DataFrame({'x': np.arange(n)})
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_spans_nest_and_record_rows_and_memory():
+    tracer = Tracer().enable(memory=True)
+    with use_tracer(tracer):
+        with span('outer') as record:
+            frame = _build(1000)
+            big = np.ones(1_000_000)
+            record['rows'] = len(frame)
+        del big
+    tracer.disable()
+
+    spans = tracer.to_frame().set_index('name')
+    assert spans.loc['build', 'parent'] == 'outer' and spans.loc['build', 'depth'] == 1
+    assert spans.loc['build', 'rows'] == 1000 and spans.loc['outer', 'rows'] == 1000
+    assert spans.loc['outer', 'peak_mb'] >= 8.0
+    assert spans.loc['outer', 'wall_s'] >= spans.loc['build', 'wall_s']
+
+
+def test_memory_tracing_is_opt_in():
+    tracer = Tracer().enable()
+    assert not tracemalloc.is_tracing()
+    tracer.enable(memory=True)
+    assert tracemalloc.is_tracing()
+    # Turning memory off while still tracing spans stops tracemalloc again
+    tracer.enable(memory=False)
+    assert not tracemalloc.is_tracing() and tracer.enabled
+    tracer.disable()
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    with use_tracer(tracer):
+        with span('ignored') as record:
+            record['rows'] = 1
+        _build(10)
+    assert tracer.to_frame().empty
+
+
+def test_trace_round_trips_through_json_and_csv(tmp_path):
+    tracer = Tracer().enable(profile=True, interval=0.001)
+    with use_tracer(tracer):
+        for _ in range(2):
+            with span('hot'):
+                _spin(0.05)
+        _build(5)
+    tracer.disable()
+
+    json_spans = load_trace(tracer.export(str(tmp_path / 'trace.json')))
+    csv_spans = load_trace(tracer.export(str(tmp_path / 'trace.csv')))
+    assert list(json_spans['name']) == ['hot', 'hot', 'build']
+    pd.testing.assert_frame_equal(json_spans[['name', 'rows']], csv_spans[['name', 'rows']], check_dtype=False)
+
+    summary = summarize(json_spans)
+    assert summary.loc['hot', 'calls'] == 2 and summary.loc['hot', 'wall_s'] >= 0.1
+    profile = tracer.profile()
+    assert profile['samples'].sum() > 10
+    assert profile['stack'].iloc[0].startswith('hot;') and '_spin' in profile['stack'].iloc[0]
@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_selected_stages_skip_data_dependencies(tmp_path):
+    script = (
+        "import sys, main\n"
+        "main.main(stages=['risk', 'stress'])\n"
+        "heavy = [m for m in ('yfinance', 'pandas_datareader', 'src.store', 'src.visualization') if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+    )
+    proc = subprocess.run([sys.executable, '-c', script], cwd=tmp_path, capture_output=True, text=True,
+                          env=dict(os.environ, PYTHONPATH=ROOT))
+    assert proc.returncode == 0, proc.stderr
+    assert 'Stress Test Results' in proc.stdout
+    assert 'PnL Attribution' not in proc.stdout
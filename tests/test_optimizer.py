@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from src.backtest import FactorBacktest
+from src.data_loader import InstitutionalDataLoader, SIGNAL_WEIGHTS, SIGNAL_WINDOW
+from src.optimizer import SignalSweep, walk_forward_folds
+
+
+def _raw(n=1200, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2015-01-01', periods=n)
+    cols = ['SPY', 'TLT', 'HYG', 'LQD', '10y_yield', '2y_yield', 'baa_10y', 'aaa_10y', 'vix']
+    return pd.DataFrame(5 + np.abs(rng.normal(0, 0.02, (n, len(cols))).cumsum(axis=0)), index=index, columns=cols)
+
+
+def test_walk_forward_folds_expand_and_do_not_overlap():
+    folds = walk_forward_folds(1000, 3, start=100)
+    assert len(folds) == 3
+    for train, test in folds:
+        assert train.start == 100 and train.stop == test.start
+    assert folds[-1][1].stop == 1000
+    assert folds[0][0].stop < folds[1][0].stop < folds[2][0].stop
+
+
+def test_sweep_matches_single_backtest_and_worker_counts():
+    raw = _raw()
+    sweep = SignalSweep(raw, windows=(63, SIGNAL_WINDOW), weights=(SIGNAL_WEIGHTS, (1.0, 0.0)),
+                        caps=(2.0,), n_folds=2)
+    serial = sweep.run(workers=1).results
+    parallel = sweep.run(workers=2).results
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert len(serial) == 2 * 2 * 1 * 2
+
+    # The default parameters reproduce the loader signal's backtest
+    loader = InstitutionalDataLoader(cache_dir=None)
+    loader.raw_data = raw
+    signal = loader.process_signals().processed_data['signal'].reindex(raw.index)
+    net = FactorBacktest(signal.fillna(0.0), raw[['HYG', 'LQD']]).run().results['net_return']
+    test = sweep.folds[1][1]
+    expected = net.iloc[test].mean() / net.iloc[test].std() * np.sqrt(252)
+    row = serial.query('fold == 1 and window == @SIGNAL_WINDOW and weight_quality == 0.7')
+    assert np.isclose(row['test_sharpe'].iloc[0], expected)
+
+
+def test_best_params_one_row_per_fold():
+    best = SignalSweep(_raw(), n_folds=3).run(workers=1).best_params()
+    assert list(best.index) == [0, 1, 2]
+    assert (best['train_end'] < best['test_end']).all()
+    assert best['train_sharpe'].notna().all()
+
+
+def test_best_params_skips_folds_without_a_train_sharpe():
+    sweep = SignalSweep(_raw(), n_folds=3).run(workers=1)
+    sweep.results.loc[sweep.results['fold'] == 1, 'train_sharpe'] = np.nan
+    best = sweep.best_params()
+    assert list(best.index) == [0, 2]
+    assert best.loc[2, 'test_end'] == sweep.index[sweep.folds[2][1].stop - 1]
+    assert best.loc[0, 'train_end'] == sweep.index[sweep.folds[0][0].stop - 1]
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from src.execution_engine import AdaptiveTWAP
+from src.order_book import BACKGROUND, BUY, SELL, TICK, MarketSimulator, OrderBook, QuoteStream
+from src.pnl_attribution import PnLAttributor
+
+
+def _stream(bid_sizes=(1000, 1000, 1000), trades=()):
+    """Three quotes 100.00/100.01 one second apart, plus (second, shares, side) trades"""
+    start = pd.Timestamp('2024-01-02 14:30', tz='UTC').value
+    trades = list(trades)
+    return QuoteStream(
+        [start + i * 10**9 for i in range(3)], [10000] * 3, [10001] * 3, bid_sizes, [1000] * 3,
+        [start + int(t * 1e9) for t, _, _ in trades], [10000 if s == SELL else 10001 for _, _, s in trades],
+        [n for _, n, _ in trades], [s for _, _, s in trades], symbol='LQD',
+    )
+
+
+def test_book_matches_fifo_across_levels_with_partial_fills():
+    book = OrderBook()
+    book.add(SELL, 101, 300)
+    book.add(SELL, 101, 200, order_id=7)
+    book.add(SELL, 102, 500)
+    assert book.queue_ahead(7) == 300
+
+    fills, unfilled = book.take(BUY, 600, limit=102)
+    assert fills == [(BACKGROUND, 101, 300), (7, 101, 200), (BACKGROUND, 102, 100)]
+    assert unfilled == 0
+    assert 7 not in book.orders
+    assert book.best(SELL) == 102 and book.depth(SELL, 102) == 400
+
+    # Background cuts come off the back of the queue
+    book.add(BUY, 100, 100, order_id=8)
+    book.set_background(BUY, 100, 500)
+    book.set_background(BUY, 100, 200)
+    assert book.queue_ahead(8) == 0 and book.depth(BUY, 100) == 300
+
+
+def test_resting_order_fills_after_the_queue_ahead_trades():
+    market = MarketSimulator(_stream(trades=[(0.5, 800, SELL), (1.5, 700, SELL)]))
+    fills = []
+    market.schedule(market.now, lambda: fills.append(market.submit(BUY, 500, limit=100.0, on_fill=fills.append)))
+    market.run(until=market.now + 10**9 // 2)
+    # Joined behind the quoted 1000: 800 traded ahead of it
+    assert market.book.queue_ahead(fills[0]) == 200
+    market.run(until=int(market.stream.quote_time[-1]))
+    assert [(f['price'], f['shares']) for f in fills[1:]] == [(100.0, 500)]
+    assert not market.book.orders
+
+
+def test_market_order_walks_the_book_and_moves_later_prices():
+    market = MarketSimulator(_stream(), depth_size=1000, permanent_impact=0.5)
+    fills = []
+    market.schedule(market.now, market.submit, BUY, 2500, None, fills.append)
+    market.run()
+    assert [(round(f['price'], 2), f['shares']) for f in fills] == [(100.01, 1000), (100.02, 1000), (100.03, 500)]
+    assert market.offset == 1.0
+
+    # A second later the quote is a tick higher and 2500 * exp(-1/10) shares are still missing
+    market.run(until=int(market.stream.quote_time[1]))
+    assert market.book.best(SELL) == 10004
+    assert market.book.depth(SELL, 10004) == 3000 - 2262
+    assert market.mid == (10000 + 10001) / 2 * TICK + TICK
+
+
+def test_fills_report_the_mid_before_their_own_impact():
+    market = MarketSimulator(_stream(), depth_size=1000, permanent_impact=0.5)
+    arrival, fills = [], []
+    market.schedule(market.now, lambda: arrival.append(market.mid))
+    market.schedule(market.now, market.submit, BUY, 2500, None, fills.append)
+    market.run()
+    assert market.offset == 1.0
+    assert [f['mid'] for f in fills] == arrival * 3
+    assert arrival == [(10000 + 10001) / 2 * TICK]
+
+
+def test_twap_runs_against_the_simulator():
+    small = AdaptiveTWAP('LQD', 5000, market=MarketSimulator(QuoteStream.synthetic(50_000, seed=2))).execute()
+    assert list(small.columns) == ['timestamp', 'symbol', 'price', 'shares', 'mid']
+    assert small['shares'].sum() == 5000
+    assert (small['symbol'] == 'LQD').all()
+
+    large = AdaptiveTWAP('LQD', 200_000, market=MarketSimulator(QuoteStream.synthetic(50_000, seed=2))).execute()
+    cost = [np.average(f['price'] - f['mid'], weights=f['shares']) for f in (small, large)]
+    assert cost[1] > cost[0] > 0
+
+    # A sell hits the bid: negative shares, and execution PnL is a cost
+    sell = AdaptiveTWAP('LQD', -5000, market=MarketSimulator(QuoteStream.synthetic(50_000, seed=2))).execute()
+    assert sell['shares'].sum() == -5000
+    assert (sell['price'] < sell['mid']).all()
+    assert PnLAttributor(sell).attribute()['Execution'].sum() < 0
+    assert PnLAttributor(small).attribute()['Execution'].sum() < 0
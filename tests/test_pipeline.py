@@ -0,0 +1,121 @@
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline import Pipeline, Stage, content_hash
+
+
+def _double(frame):
+    return frame * 2
+
+
+def _total(frame):
+    return float(frame.to_numpy().sum())
+
+
+def test_content_hash_tracks_frame_contents():
+    frame = pd.DataFrame({'a': [1.0, 2.0]})
+    assert content_hash(frame) == content_hash(frame.copy())
+    assert content_hash(frame) != content_hash(frame + 1)
+    assert content_hash({'x': np.arange(3), 'y': 'z'}) == content_hash({'y': 'z', 'x': np.arange(3)})
+
+
+def test_independent_stages_run_in_parallel():
+    # Each stage only finishes once the other one has started
+    started = {'a': threading.Event(), 'b': threading.Event()}
+
+    def make(name, other):
+        def stage(x):
+            started[name].set()
+            assert started[other].wait(timeout=5)
+            return x + 1
+        return stage
+
+    pipeline = Pipeline([
+        Stage('a', make('a', 'b'), ['x'], ['a_out']),
+        Stage('b', make('b', 'a'), ['x'], ['b_out']),
+        Stage('sum', lambda a, b: a + b, ['a_out', 'b_out'], ['total']),
+    ], cache_dir=None, workers=2)
+    assert pipeline.run(x=1)['total'] == 4
+    assert list(pipeline.report['stage'])[-1] == 'sum'
+
+
+def test_unchanged_stages_are_served_from_cache(tmp_path):
+    calls = []
+
+    def load(n):
+        calls.append('load')
+        return pd.DataFrame({'v': np.arange(n, dtype=float)}), n
+
+    def summarize(frame):
+        calls.append('summarize')
+        return frame['v'].sum()
+
+    stages = [Stage('load', load, ['n'], ['frame', 'count'], cache=False),
+              Stage('summarize', summarize, ['frame'], ['total'])]
+    pipeline = Pipeline(stages, cache_dir=str(tmp_path))
+    assert pipeline.run(n=4)['total'] == 6
+    assert pipeline.run(n=4)['total'] == 6
+    assert calls == ['load', 'summarize', 'load']
+    assert dict(zip(pipeline.report['stage'], pipeline.report['status'])) == {'load': 'ran', 'summarize': 'cached'}
+    # Uncached stages are never keyed, so their inputs are not hashed
+    assert pd.isna(pipeline.report.set_index('stage').loc['load', 'key'])
+    assert Pipeline([Stage('lock', lambda lock: 1, ['lock'], cache=False)]).run(lock=threading.Lock())['lock'] == 1
+
+    pipeline.run(n=5)
+    assert calls[-1] == 'summarize'
+
+
+def test_targets_failures_and_process_pool(tmp_path):
+    def boom(x):
+        raise ValueError('bad input')
+
+    pipeline = Pipeline([Stage('double', _double, ['frame'], ['doubled']),
+                         Stage('total', _total, ['doubled']),
+                         Stage('broken', boom, ['frame'])], cache_dir=None)
+    frame = pd.DataFrame({'a': [1.0, 2.0]})
+    assert pipeline.run(['total'], frame=frame)['total'] == 6
+    assert set(pipeline.report['stage']) == {'double', 'total'}
+
+    with pytest.raises(ValueError, match='bad input'):
+        pipeline.run(frame=frame)
+    assert 'failed' in set(pipeline.report['status'])
+
+    with pytest.raises(ValueError, match='needs inputs'):
+        pipeline.run(['total'])
+
+    pooled = Pipeline([Stage('double', _double, ['frame'], ['doubled']),
+                       Stage('total', _total, ['doubled'])], cache_dir=str(tmp_path), workers=2, executor='process')
+    assert pooled.run(frame=frame)['total'] == 6
+
+
+def test_cache_key_tracks_imported_module_source(tmp_path, monkeypatch):
+    (tmp_path / 'scaling.py').write_text("def scale(x):\n    return x * 2\n")
+    (tmp_path / 'stages.py').write_text(
+        "def compute(x):\n    from scaling import scale\n    return scale(x)\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'stages', raising=False)
+    from stages import compute
+
+    pipeline = Pipeline([Stage('compute', compute, ['x'])], cache_dir=str(tmp_path / 'cache'))
+    pipeline.run(x=1)
+    pipeline.run(x=1)
+    assert list(pipeline.report['status']) == ['cached']
+
+    # Editing the imported module, not the stage function, invalidates the result
+    (tmp_path / 'scaling.py').write_text("def scale(x):\n    return x * 3\n")
+    os.utime(tmp_path / 'scaling.py', ns=(0, 0))
+    pipeline.run(x=1)
+    assert list(pipeline.report['status']) == ['ran']
+
+
+def test_cache_keeps_most_recently_used_results(tmp_path):
+    pipeline = Pipeline([Stage('total', _total, ['frame'])], cache_dir=str(tmp_path), max_entries=2)
+    for n in range(4):
+        pipeline.run(frame=pd.DataFrame({'a': [float(n)]}))
+    assert len([f for f in os.listdir(tmp_path) if f.endswith('.pkl')]) == 2
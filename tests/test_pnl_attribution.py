@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from src.pnl_attribution import ATTRIBUTION_COLUMNS, PnLAttributor, StreamingPnLAttributor
+
+
+def _factor_data():
+    index = pd.bdate_range('2024-01-01', periods=3)
+    return pd.DataFrame({
+        'SPY': [400.0, 404.0, 402.0],
+        'LQD': [100.0, 101.0, 100.5],
+        '10y_yield': [4.00, 4.10, 4.05],
+        'quality_spread': [1.00, 0.90, 0.95],
+        'vix': [15.0, 14.0, 16.0],
+    }, index=index)
+
+
+def _fills():
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(['2024-01-02 15:00', '2024-01-03 15:00', '2023-12-29 15:00'], utc=True),
+        'symbol': ['LQD', 'LQD', 'LQD'],
+        'price': [100.02, 100.0, 99.0],
+        'mid': [100.0, 100.0, 99.0],
+        'shares': [500, 500, 500],
+        'notional': [50000.0, 50000.0, 50000.0],
+        'beta': [0.8, 0.8, 0.8],
+        'duration': [8.0, 8.0, 8.0],
+        'credit_duration': [3.8, 3.8, 3.8],
+        'vega': [25000.0, 25000.0, 25000.0],
+    })
+
+
+def test_factor_contributions():
+    result = PnLAttributor(_fills(), _factor_data()).attribute()
+    # Joined to the 01-01 to 01-02 close-to-close moves of the fill's own day
+    first = result.iloc[0]
+
+    assert list(result.columns) == ATTRIBUTION_COLUMNS
+    assert np.isclose(first['Execution'], -0.02 * 500)
+    assert np.isclose(first['Equity'], 50000 * 0.8 * 0.01)
+    assert np.isclose(first['Rates'], -50000 * 8.0 * 0.10 * 0.01)
+    assert np.isclose(first['Credit'], -50000 * 3.8 * -0.10 * 0.01)
+    assert np.isclose(first['Vol'], 25000 * -1.0)
+    explained = first[['Equity', 'Rates', 'Credit', 'Vol']].sum()
+    assert np.isclose(first['Residual'], 50000 * 0.01 - explained)
+
+
+def test_fills_before_factor_history_are_unexplained():
+    result = PnLAttributor(_fills(), _factor_data()).attribute(dropna=False)
+    assert result.iloc[2][['Equity', 'Residual']].isna().all()
+    assert result.iloc[2]['Execution'] == 0
+
+    assert list(PnLAttributor(_fills(), _factor_data()).attribute().index) == [0, 1]
+
+
+def test_fills_join_the_move_of_the_day_they_are_held():
+    fills = _fills().iloc[:1].assign(timestamp=pd.Timestamp('2024-01-03 15:00', tz='UTC'))
+    # The 01-03 close-to-close move, not the 01-02 one from before the fill
+    result = PnLAttributor(fills, _factor_data()).attribute().iloc[0]
+    assert np.isclose(result['Equity'], 50000 * 0.8 * (402 / 404 - 1))
+    assert np.isclose(result[['Equity', 'Rates', 'Credit', 'Vol', 'Residual']].sum(), 50000 * (100.5 / 101 - 1))
+
+    streamed = StreamingPnLAttributor(_factor_data()).update(fills.iloc[0].to_dict())
+    assert np.isclose(streamed['Equity'], result['Equity'])
+
+    # The first day has no move yet, so its fills cannot be explained
+    fills = fills.assign(timestamp=pd.Timestamp('2024-01-01 15:00', tz='UTC'))
+    assert PnLAttributor(fills, _factor_data()).attribute().empty
+
+
+def test_crossing_the_spread_costs_buys_and_sells():
+    fills = pd.DataFrame({'price': [100.01, 99.99], 'mid': [100.0, 100.0], 'shares': [3000, -3000]})
+    np.testing.assert_allclose(PnLAttributor(fills).attribute()['Execution'], [-30.0, -30.0])
+
+    streaming = StreamingPnLAttributor()
+    assert np.isclose(streaming.update(fills.iloc[1].to_dict())['Execution'], -30.0)
+
+
+def test_summary_groups_fills():
+    fills = _fills().assign(order_id=[1, 1, 2])
+    attributor = PnLAttributor(fills, _factor_data())
+    by_order = attributor.summary(by='order')
+    by_day = attributor.summary(by='day')
+
+    assert list(by_order.index) == [1, 2]
+    assert len(by_day) == 3
+    assert np.isclose(by_order.loc[1, 'Execution'], -10.0)
+
+
+def test_without_factor_data_only_execution_is_attributed():
+    result = PnLAttributor(_fills()).attribute()
+    assert (result[['Equity', 'Residual']] == 0).all().all()
+
+
+def test_streaming_snapshot_matches_batch_statistics():
+    rng = np.random.default_rng(0)
+    n = 400
+    fills = pd.DataFrame({
+        'timestamp': pd.Timestamp('2024-01-03', tz='UTC') + pd.to_timedelta(np.arange(n), unit='s'),
+        'symbol': 'LQD',
+        'price': 100 + rng.normal(0, 0.01, n),
+        'mid': 100.0,
+        'shares': 1,
+    })
+    streaming = StreamingPnLAttributor(_factor_data(), attributes={'beta': 0.8, 'vega': 0.0})
+    streaming.update(fills.iloc[0].to_dict())
+    for start in range(1, n, 37):
+        streaming.update(fills.iloc[start:start + 37])
+    snap = streaming.snapshot()
+
+    batch = PnLAttributor(fills.assign(beta=0.8, vega=0.0), _factor_data()).attribute()
+    pnl = batch.sum(axis=1)
+    equity = 1_000_000 + pnl.cumsum()
+    assert snap['fills'] == n
+    assert np.isclose(snap['cum_pnl'], pnl.sum())
+    assert np.isclose(snap['total_return'], pnl.sum() / 1_000_000)
+    assert np.isclose(snap['max_drawdown'], (equity / equity.cummax().clip(lower=1_000_000) - 1).min())
+    assert np.isclose(snap['sharpe'], pnl.mean() / pnl.std() * np.sqrt(252))
+    assert np.isclose(snap['win_rate'], (pnl > 0).mean())
+    np.testing.assert_allclose(snap['components'], batch.sum())
+
+
+def test_single_fill_fast_path_matches_batch():
+    fills = _fills().drop(columns='credit_duration')
+    fills.loc[1, 'symbol'] = 'SPY'
+    fills = pd.concat([fills, fills.assign(timestamp=fills['timestamp'] + pd.Timedelta(days=1))],
+                      ignore_index=True)
+    one_by_one = StreamingPnLAttributor(_factor_data(), attributes={'credit_duration': 3.8}, capital=5e4)
+    rows = [one_by_one.update(fill) for fill in fills.to_dict('records')]
+    batched = StreamingPnLAttributor(_factor_data(), attributes={'credit_duration': 3.8}, capital=5e4)
+    expected = batched.update(fills)
+
+    # The fill before any factor history is dropped on both paths
+    assert [i for i, r in enumerate(rows) if r is None] == [2, 5]
+    pd.testing.assert_frame_equal(pd.DataFrame([r for r in rows if r is not None], index=expected.index),
+                                  expected)
+    single, batch = one_by_one.snapshot(), batched.snapshot()
+    for key in ['fills', 'cum_pnl', 'total_return', 'max_drawdown', 'mean', 'std', 'win_rate']:
+        assert np.isclose(single[key], batch[key]), key
+    np.testing.assert_allclose(single['components'], batch['components'])
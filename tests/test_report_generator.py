@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.report_generator import ReportBuilder, risk_limit_frame
+
+
+def _book(name, seed=0, shared=None):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2023-01-02', periods=60)
+    signals = shared if shared is not None else pd.DataFrame(
+        {'quality_spread': rng.normal(1, 0.1, 60), 'term_spread': rng.normal(0.5, 0.1, 60),
+         'signal': rng.normal(0, 1, 60)}, index=index)
+    return {
+        'name': name,
+        'processed_data': signals,
+        'pnl_breakdown': pd.DataFrame(rng.normal(0, 100, (60, 2)), index=index, columns=['rates', 'credit']),
+        'risk_limits': risk_limit_frame({'DV01': 2e5, 'CS01': 1e4}, {'DV01': 1e5, 'CS01': 5e4, 'MaxNotional': 1e8}),
+        'stress_results': pd.DataFrame({'PnL Impact': [-1e5, 2e4]}, index=['2008 Crisis', 'Rally']),
+    }
+
+
+def test_report_contains_every_section(tmp_path):
+    builder = ReportBuilder(tmp_path / 'out', tmp_path / 'cache', workers=1)
+    path = builder.build(_book('Credit/Book 1'))
+    page = open(path).read()
+    assert os.path.basename(path).startswith('Credit_Book_1-')
+    for title in ['Market Signals', 'PnL Attribution', 'PnL by Factor', 'Risk Limits', 'Stress Tests']:
+        assert f'<h2>{title}</h2>' in page
+    assert page.count('<svg') == 3
+    # DV01 is over its limit
+    assert page.count('class="breach"') == 1
+
+
+def test_unchanged_sections_come_from_cache(tmp_path):
+    builder = ReportBuilder(tmp_path / 'out', tmp_path / 'cache', workers=1)
+    first = _book('a', seed=1)
+    shared = first['processed_data']
+    report = builder.build_many([first, _book('b', seed=2, shared=shared)])
+    # Signals, risk and stress are identical across the books: rendered once
+    assert report['rendered'].tolist() == [5, 2]
+    assert report['cached'].tolist() == [0, 3]
+
+    changed = _book('a', seed=1)
+    changed['pnl_breakdown'] = changed['pnl_breakdown'] * 2
+    report = builder.build_many([changed])
+    assert report[['rendered', 'cached']].values.tolist() == [[2, 3]]
+
+
+def test_memory_budget_and_process_pool(tmp_path):
+    builder = ReportBuilder(tmp_path / 'out', tmp_path / 'cache', workers=2, memory_mb=1e-6)
+    books = (_book(f'book{i}', seed=i) for i in range(3))
+    report = builder.build_many(books)
+    assert len(report) == 3
+    assert sorted(p.name for p in (tmp_path / 'out').iterdir()) == ['book0.html', 'book1.html', 'book2.html']
+
+
+def test_names_that_sanitize_alike_get_distinct_files(tmp_path):
+    builder = ReportBuilder(tmp_path / 'out', tmp_path / 'cache', workers=1)
+    paths = [builder.build(_book(name)) for name in ['A/B', 'A_B', 'A B']]
+    assert len(set(paths)) == 3
+    assert os.path.basename(paths[1]) == 'A_B.html'
+
+
+def test_artifact_cache_is_pruned(tmp_path):
+    builder = ReportBuilder(tmp_path / 'out', tmp_path / 'cache', workers=1, max_artifacts=5)
+    builder.build_many([_book(f'book{i}', seed=i) for i in range(3)])
+    assert len(os.listdir(tmp_path / 'cache')) == 5
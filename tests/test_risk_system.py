@@ -1 +1,114 @@
-# Unit test placeholder
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.risk_system import BarclaysRiskSystem, RiskBook
+
+
+def _book(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'desk': rng.choice(['Credit', 'Rates', 'Macro'], n),
+        'book': rng.choice([f'B{i}' for i in range(20)], n),
+        'notional': rng.normal(0, 1e6, n),
+        'duration': rng.uniform(0, 10, n),
+        'spread_duration': rng.uniform(0, 8, n),
+    })
+
+
+def test_check_limits_single_position():
+    risk = BarclaysRiskSystem()
+    positions = {'notional': 5000000, 'duration': 4.2, 'spread_duration': 3.8}
+    assert risk.check_limits(positions) == {'DV01': False, 'CS01': False, 'MaxNotional': False}
+    assert risk.calculate_exposures(positions)['DV01'] == 5000000 * 0.0001 * 4.2
+
+
+def test_book_exposures_match_groupby():
+    book = _book(5000)
+    risk = BarclaysRiskSystem(hierarchy=['desk', 'book'])
+    exposures = risk.book_exposures(book)
+
+    per_position = risk.position_exposures(book)
+    expected = per_position['DV01'].groupby(book['desk']).sum()
+    np.testing.assert_allclose(exposures.loc['desk', 'DV01'].to_numpy(), expected.to_numpy())
+    assert exposures.loc[('total', 'ALL'), 'MaxNotional'] == book['notional'].abs().sum()
+
+
+def test_book_limit_violations_table():
+    book = _book(1000)
+    risk = BarclaysRiskSystem(hierarchy=['desk'])
+    risk.set_limit('desk', 'Credit', 'DV01', 1.0)
+    risk.set_limit('desk', 'Rates', 'CS01', 1e12)
+
+    violations = risk.check_book_limits(book)
+
+    breached = set(zip(violations['level'], violations['bucket'], violations['metric']))
+    assert ('desk', 'Credit', 'DV01') in breached
+    assert ('desk', 'Rates', 'CS01') not in breached
+    assert (violations['utilisation'] > 1).all()
+
+
+def test_book_limit_check_on_large_book():
+    book = _book(300_000)
+    risk = BarclaysRiskSystem(hierarchy=['desk', 'book'])
+    risk.set_limit('book', 'B0', 'DV01', 1.0)
+
+    violations = risk.check_book_limits(book).set_index(['level', 'bucket', 'metric'])
+
+    dv01 = risk.position_exposures(book)['DV01'].groupby(book['book']).sum()
+    assert violations.loc[('book', 'B0', 'DV01'), 'exposure'] == pytest.approx(dv01['B0'])
+    assert list(violations.loc['book'].index) == [('B0', 'DV01')]
+
+
+def test_risk_book_incremental_matches_full_recompute():
+    book = _book(2000)
+    risk = BarclaysRiskSystem(hierarchy=['desk', 'book'])
+    risk_book = RiskBook(risk).load(book.iloc[:1500])
+    for position_id, row in book.iloc[1500:].iterrows():
+        risk_book.apply({'position': position_id, **row.to_dict()})
+    risk_book.apply({'position': 0, 'notional': -2 * book.loc[0, 'notional']})
+
+    updated = book.copy()
+    updated.loc[0, 'notional'] *= -1
+    expected = risk.book_exposures(updated)
+    for key, values in zip(expected.index, expected.to_numpy()):
+        np.testing.assert_allclose(risk_book.exposures[key], values, rtol=1e-9)
+
+
+def test_would_breach_is_pre_trade_only():
+    book = _book(100)
+    risk = BarclaysRiskSystem(hierarchy=['desk'])
+    risk.set_limit('desk', 'Rates', 'DV01', 1e5)
+    risk_book = RiskBook(risk).load(book)
+    before = list(risk_book.exposures[('desk', 'Rates')])
+
+    order = {'position': 'NEW', 'desk': 'Rates', 'notional': 1e9, 'duration': 5.0}
+    breaches = risk_book.would_breach(order)
+
+    assert ('desk', 'Rates', 'DV01') in [b[:3] for b in breaches]
+    assert risk_book.exposures[('desk', 'Rates')] == before
+    assert risk_book.would_breach({**order, 'notional': 1.0}) == []
+
+
+def test_risk_book_applies_execution_fills():
+    risk_book = RiskBook(BarclaysRiskSystem(hierarchy=['desk']))
+    risk_book.apply({'position': 'LQD', 'desk': 'Credit', 'notional': 0.0, 'duration': 8.0})
+    risk_book.apply_fill({'symbol': 'LQD', 'shares': 500, 'price': 100.0})
+    risk_book.apply_fill({'symbol': 'LQD', 'shares': 500, 'price': 100.0})
+    assert risk_book.exposures[('desk', 'Credit')][0] == 100000 * 0.0001 * 8.0
+
+
+def test_fills_are_booked_to_the_symbol_position():
+    book = pd.DataFrame({
+        'desk': ['Credit', 'Rates'], 'symbol': ['LQD', 'TLT'],
+        'notional': [0.0, 0.0], 'duration': [8.0, 17.0],
+    }, index=[101, 102])
+    risk_book = RiskBook(BarclaysRiskSystem(hierarchy=['desk'])).load(book)
+
+    risk_book.apply_fill({'symbol': 'TLT', 'shares': 100, 'price': 100.0})
+    assert risk_book.positions[102][0] == 10000
+    assert risk_book.exposures[('desk', 'Rates')][0] == 10000 * 0.0001 * 17.0
+
+    with pytest.raises(KeyError, match='HYG'):
+        risk_book.apply_fill({'symbol': 'HYG', 'shares': 100, 'price': 80.0})
+    assert 'HYG' not in risk_book.positions
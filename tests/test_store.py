@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from src.store import SignalStore
+
+
+def _signals(start='2020-01-01', periods=120, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(start, periods=periods).astype('datetime64[ns]')
+    return pd.DataFrame({'signal': rng.normal(0, 1, periods), 'vix': rng.uniform(10, 30, periods)}, index=index)
+
+
+def test_append_partitions_by_month_and_reads_round_trip(tmp_path):
+    store = SignalStore(str(tmp_path))
+    frame = _signals()
+    store.append('processed', frame)
+
+    months = sorted(os.listdir(tmp_path / 'processed'))
+    assert months[0] == 'month=2020-01' and len(months) == 6
+    read = store.read('processed')
+    pd.testing.assert_frame_equal(read, frame.rename_axis('date'), check_freq=False)
+    assert store.datasets() == ['processed']
+
+
+def test_month_read_touches_only_its_partition(tmp_path):
+    store = SignalStore(str(tmp_path))
+    frame = _signals()
+    store.append('processed', frame)
+
+    # Corrupt every other month: a pruned read never opens them
+    for month in os.listdir(tmp_path / 'processed'):
+        if month != 'month=2020-03':
+            for name in os.listdir(tmp_path / 'processed' / month):
+                (tmp_path / 'processed' / month / name).write_bytes(b'not parquet')
+
+    march = store.read('processed', columns=['signal'], start='2020-03-01', end='2020-03-31')
+    assert list(march.columns) == ['signal']
+    pd.testing.assert_series_equal(march['signal'], frame.loc['2020-03', 'signal'].rename_axis('date'),
+                                   check_freq=False)
+
+
+def test_as_of_reads_ignore_later_revisions(tmp_path):
+    store = SignalStore(str(tmp_path))
+    frame = _signals(periods=20)
+    store.append('processed', frame, written_at='2021-01-01')
+
+    revised = frame.iloc[5:10] + 1
+    store.sync('processed', pd.concat([frame.iloc[:5], revised]), written_at='2021-06-01')
+
+    # Only the five changed rows were written again
+    day = frame.index[7]
+    assert len(store.versions('processed', day)) == 2
+    assert len(store.versions('processed', frame.index[2])) == 1
+
+    before = store.read('processed', as_of='2021-03-01')
+    after = store.read('processed')
+    pd.testing.assert_frame_equal(before, frame.rename_axis('date'), check_freq=False)
+    assert np.isclose(after.loc[day, 'signal'], frame.loc[day, 'signal'] + 1)
+    assert store.read('processed', as_of='2020-12-31').empty
+
+    # Value filters see only the latest version of each date
+    old_value = frame.loc[day, 'signal']
+    hits = store.read('processed', where=ds.field('signal') == old_value)
+    assert day not in hits.index
+
+
+def test_sync_evolves_schema_when_a_column_is_added(tmp_path):
+    store = SignalStore(str(tmp_path))
+    frame = _signals(periods=20)
+    store.append('processed', frame[['signal']], written_at='2021-01-01')
+    store.sync('processed', frame, written_at='2021-06-01')
+
+    pd.testing.assert_frame_equal(store.read('processed'), frame.rename_axis('date'), check_freq=False)
+    before = store.read('processed', as_of='2021-03-01')
+    assert list(before.columns) == ['signal', 'vix'] and before['vix'].isna().all()
+
+    # Unchanged rows are not written again once both columns are stored
+    store.sync('processed', frame, written_at='2021-09-01')
+    assert len(store.versions('processed', frame.index[0])) == 2
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The dashboard script is named streamlit.py, so it is loaded from a separate
+# process that imports the library before the repo root is on sys.path.
+LOAD_APP = (
+    "import importlib.util, sys\n"
+    "import streamlit\n"
+    f"sys.path.append({ROOT!r})\n"
+    f"spec = importlib.util.spec_from_file_location('dashboard', {os.path.join(ROOT, 'streamlit.py')!r})\n"
+    "app = importlib.util.module_from_spec(spec)\n"
+    "spec.loader.exec_module(app)\n"
+)
+
+
+def _run(script, tmp_path):
+    proc = subprocess.run([sys.executable, '-c', LOAD_APP + script], cwd=tmp_path,
+                          capture_output=True, text=True, env={**os.environ, 'PYTHONPATH': ''})
+    assert proc.returncode == 0, proc.stderr
+
+
+def test_execute_trade_is_reproducible_after_eviction(tmp_path):
+    _run(
+        "first = app.execute_trade('LQD', 3000)\n"
+        "app.execute_trade.clear()\n"
+        "again = app.execute_trade('LQD', 3000)\n"
+        "columns = ['price', 'mid', 'shares', 'notional']\n"
+        "assert (first[columns].to_numpy() == again[columns].to_numpy()).all()\n",
+        tmp_path,
+    )
+
+
+def test_attribute_pnl_uses_the_cached_executions(tmp_path):
+    _run(
+        "import numpy as np, pandas as pd\n"
+        "from benchmarks import synthetic\n"
+        "from src.data_loader import InstitutionalDataLoader\n"
+        "loader = InstitutionalDataLoader(cache_dir=None)\n"
+        "start = pd.Timestamp.today().normalize() - pd.offsets.BDay(299)\n"
+        "loader.raw_data = synthetic.market_data(300, start=start)\n"
+        "processed = loader.process_signals().processed_data\n"
+        "app.process_signals = lambda start_date: processed\n"
+        "executions = app.execute_trade('LQD', 3000)\n"
+        "pnl, stats = app.attribute_pnl('2020-01-01', 'LQD', 3000)\n"
+        "assert stats['fills'] == len(pnl) == len(executions)\n"
+        "expected = (executions['mid'] - executions['price']) * executions['shares']\n"
+        "np.testing.assert_allclose(pnl['Execution'], expected)\n",
+        tmp_path,
+    )
+
+
+def test_factor_risk_folds_in_new_bars(tmp_path):
+    _run(
+        "import numpy as np\n"
+        "from benchmarks import synthetic\n"
+        "from src.stress_testing import EWMACovariance\n"
+        "raw = synthetic.market_data(300)\n"
+        "app.load_raw_data = lambda start_date: raw.iloc[:250]\n"
+        "primed = app.live_factor_risk('2020-01-01')\n"
+        "app.load_raw_data = lambda start_date: raw\n"
+        "live = app.live_factor_risk('2020-01-01')\n"
+        "full = EWMACovariance.from_raw_data(raw)\n"
+        "assert live is primed and live.count == full.count\n"
+        "np.testing.assert_allclose(live.cov, full.cov, rtol=1e-10)\n",
+        tmp_path,
+    )
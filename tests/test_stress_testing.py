@@ -0,0 +1,193 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import stress_testing
+from src.data_loader import ETF_SYMBOLS, FRED_SERIES
+from src.stress_testing import (
+    CrisisSimulator, EWMACovariance, ScenarioEngine, VaRService, factor_moves, portfolio_exposures, shock_matrix
+)
+
+
+def _portfolio():
+    return pd.DataFrame({
+        'symbol': ['SPY', 'TLT', 'SPY'],
+        'shares': [1000, 2000, 500],
+        'price': [400, 120, 400],
+        'spread': [0.01, 0.02, 0.01],
+        'spread_duration': [0.0, 0.0, 0.0],
+        'liquidity_factor': [0.95, 0.85, 0.95],
+    })
+
+
+def test_equity_component_matches_crisis_simulator():
+    portfolio = _portfolio()
+    legacy = CrisisSimulator(portfolio).run_scenarios()
+    result = ScenarioEngine(portfolio).run()
+    np.testing.assert_allclose(result['Equity'], legacy['PnL Impact'])
+
+
+def test_spread_and_liquidity_components():
+    portfolio = _portfolio().assign(spread_duration=[0.0, 5.0, 0.0])
+    scenarios = {'wide': {'credit_spread_widen': 0.35, 'liquidity_stress': 1.0}}
+    result = ScenarioEngine(portfolio).run(scenarios).loc['wide']
+
+    assert result['Equity'] == 0
+    assert np.isclose(result['Spread'], -240000 * 5.0 * 0.0035)
+    value = portfolio['shares'] * portfolio['price']
+    assert np.isclose(result['Liquidity'], -(value * (1 - portfolio['liquidity_factor'])).sum())
+    assert np.isclose(result['PnL Impact'], result['Spread'] + result['Liquidity'])
+
+
+def test_grid_groups_positions():
+    grid = ScenarioEngine(_portfolio()).run_grid(by='symbol')
+    assert list(grid.columns) == ['SPY', 'TLT']
+    # Equity shock plus the full 5% liquidity haircut
+    assert np.isclose(grid.loc['2008 Crisis', 'SPY'], -0.45 * 600000 - 0.05 * 600000)
+
+
+def test_missing_sensitivity_columns_warn():
+    portfolio = _portfolio().drop(columns=['spread_duration', 'liquidity_factor'])
+    with pytest.warns(UserWarning, match='spread_duration'):
+        result = ScenarioEngine(portfolio).run()
+    assert (result[['Spread', 'Liquidity']] == 0).all().all()
+
+
+def test_shock_matrix_fills_missing_factors():
+    shocks = shock_matrix({'eq': {'equity_shock': -0.1}})
+    assert shocks.loc['eq'].tolist() == [-0.1, 0.0, 0.0]
+
+
+def _moves(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    cov = np.array([[1.0, 0.6], [0.6, 2.0]]) * 1e-4
+    data = rng.multivariate_normal([0, 0], cov, n)
+    return pd.DataFrame(data, columns=['SPY', 'TLT'])
+
+
+def test_factor_moves_from_raw_data():
+    cols = ETF_SYMBOLS + list(FRED_SERIES.values())
+    raw = pd.DataFrame(
+        np.arange(1, 28, dtype=float).reshape(3, 9), columns=cols,
+        index=pd.bdate_range('2020-01-01', periods=3)
+    )
+    moves = factor_moves(raw)
+    assert len(moves) == 2
+    assert np.isclose(moves['SPY'].iloc[0], 9.0)
+    assert moves['vix'].iloc[0] == 9
+
+
+def test_historical_var_and_es():
+    moves = _moves()
+    service = VaRService(moves, cache_dir=None)
+    result = service.historical({'SPY': 1e6})
+
+    pnl = np.sort(moves['SPY'].to_numpy() * 1e6)
+    assert np.isclose(result['VaR'], -pnl[19])
+    assert np.isclose(result['ES'], -pnl[:20].mean())
+    assert result['ES'] >= result['VaR']
+
+
+def test_monte_carlo_reproducible_and_close_to_normal(tmp_path):
+    moves = _moves()
+    exposures = pd.Series({'SPY': 1e6, 'TLT': -5e5})
+    service = VaRService(moves, cache_dir=str(tmp_path))
+
+    in_process = service.monte_carlo(exposures, n_paths=200_000, chunk_size=30_000, seed=4, workers=1)
+    pooled = service.monte_carlo(exposures, n_paths=200_000, chunk_size=30_000, seed=4, workers=2)
+    assert in_process == pooled
+
+    _, cov, _ = service.decomposition()
+    w = exposures.to_numpy()
+    sigma = np.sqrt(w @ cov @ w)
+    assert np.isclose(in_process['VaR'], 2.326 * sigma, rtol=0.03)
+
+    # Second service over the same data reads the cached decomposition
+    assert len(list((tmp_path / 'risk').iterdir())) == 1
+    cached = VaRService(moves, cache_dir=str(tmp_path)).decomposition()
+    np.testing.assert_array_equal(cached[2], service.decomposition()[2])
+
+
+def test_covariance_cache_keeps_most_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(stress_testing, 'COV_CACHE_ENTRIES', 2)
+    risk_dir = tmp_path / 'risk'
+    VaRService(_moves(n=100, seed=0), cache_dir=str(tmp_path)).decomposition()
+    (oldest,) = risk_dir.iterdir()
+    os.utime(oldest, (1, 1))
+    VaRService(_moves(n=100, seed=1), cache_dir=str(tmp_path)).decomposition()
+    (newer,) = set(risk_dir.iterdir()) - {oldest}
+    os.utime(newer, (2, 2))
+
+    # A hit on the oldest entry marks it as used, so the next write evicts the other
+    VaRService(_moves(n=100, seed=0), cache_dir=str(tmp_path)).decomposition()
+    VaRService(_moves(n=100, seed=2), cache_dir=str(tmp_path)).decomposition()
+    assert oldest.exists() and not newer.exists()
+    assert len(list(risk_dir.iterdir())) == 2
+
+
+def test_portfolio_exposures_by_symbol():
+    exposures = portfolio_exposures(_portfolio(), ['SPY', 'TLT', 'HYG'])
+    assert exposures.tolist() == [600000, 240000, 0]
+
+
+def test_ewma_covariance_matches_pandas_and_splits_vol():
+    moves = _moves(500)
+    engine = EWMACovariance.from_moves(moves.iloc[:300]).update_many(moves.iloc[300:])
+    expected = moves.ewm(alpha=0.06, adjust=False).cov(bias=True).loc[moves.index[-1]]
+    np.testing.assert_allclose(engine.cov, expected.to_numpy(), rtol=1e-10)
+
+    exposures = {'SPY': 1e6, 'TLT': -5e5}
+    w = np.array([1e6, -5e5])
+    vol = engine.portfolio_vol(exposures)
+    assert np.isclose(vol, np.sqrt(w @ expected.to_numpy() @ w))
+    assert np.isclose(engine.factor_contributions(exposures).sum(), vol)
+    assert np.isclose(engine.principal_contributions(exposures).sum(), vol ** 2)
+    assert np.isclose(engine.correlation().loc['SPY', 'TLT'], 0.6 / np.sqrt(2), atol=0.15)
+
+
+def test_ewma_partial_bars_update_the_factors_present():
+    moves = _moves(300)
+    engine = EWMACovariance.from_moves(moves.iloc[:200])
+    tlt_var, tlt_mean = engine.cov[1, 1], engine.mean[1]
+    for spy in moves['SPY'].iloc[200:]:
+        engine.update({'SPY': spy})
+
+    # SPY alone evolves exactly as a one-factor engine; TLT is left untouched
+    alone = EWMACovariance.from_moves(moves[['SPY']])
+    assert np.isclose(engine.cov[0, 0], alone.cov[0, 0], rtol=1e-12)
+    assert np.isclose(engine.mean[0], alone.mean[0], rtol=1e-12)
+    assert (engine.cov[1, 1], engine.mean[1]) == (tlt_var, tlt_mean)
+    assert engine.count == 300
+
+    # Present x absent terms decay too, so the matrix stays PSD and factorable
+    for _ in range(60):
+        engine.update({'SPY': 0.0})
+    assert np.linalg.eigvalsh(engine.cov).min() >= -1e-18
+    assert abs(engine.correlation().loc['SPY', 'TLT']) <= 1
+    _, _, chol = engine.decomposition()
+    np.testing.assert_allclose(chol @ chol.T, engine.cov, atol=1e-15)
+    assert np.isfinite(engine.simulate(100, seed=0).to_numpy()).all()
+
+    # A factor first seen late is seeded from that bar, not from zero
+    late = EWMACovariance(['SPY', 'TLT']).update([0.01, np.nan]).update([0.02, 0.03])
+    assert late.mean[1] == 0.03 and late.cov[1, 1] == 0.0 and late.cov[0, 0] > 0
+
+
+def test_ewma_decomposition_recomputed_only_on_drift():
+    moves = _moves(1000)
+    engine = EWMACovariance.from_moves(moves.iloc[:500], tolerance=0.5)
+    engine.decomposition()
+    for _, bar in moves.iloc[500:503].iterrows():
+        engine.update(bar)
+        engine.decomposition()
+    assert engine.decompositions == 1
+
+    # A volatility shock moves the covariance well past the tolerance
+    for _ in range(10):
+        engine.update({'SPY': 0.05, 'TLT': -0.05})
+    assert engine.drift() > 0.5
+    _, _, chol = engine.decomposition()
+    assert engine.decompositions == 2
+    np.testing.assert_allclose(chol @ chol.T, engine.cov, atol=1e-12)
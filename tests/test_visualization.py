@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.visualization import Downsampler, PortfolioVisualizer, downsample, lttb_indices, minmax_indices
+
+
+def _frame(n=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2020-01-01', periods=n, freq='min')
+    return pd.DataFrame({'a': rng.normal(0, 1, n).cumsum(), 'b': rng.normal(0, 1, n)}, index=index)
+
+
+def test_minmax_keeps_extremes_and_endpoints():
+    frame = _frame()
+    frame.iloc[12345, 0] = 1e6
+    idx = minmax_indices(frame['a'], width=500)
+
+    assert len(idx) <= 502
+    assert idx[0] == 0 and idx[-1] == len(frame) - 1
+    assert 12345 in idx
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_returns_requested_points_in_order():
+    frame = _frame()
+    idx = lttb_indices(np.arange(len(frame)), frame['a'], width=300)
+    assert len(idx) == 300
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_downsample_keeps_rows_aligned_and_short_frames_untouched():
+    frame = _frame()
+    reduced = downsample(frame, ['a'], width=400)
+    pd.testing.assert_frame_equal(reduced, frame.loc[reduced.index])
+    assert downsample(frame.iloc[:100], width=400).equals(frame.iloc[:100])
+
+    with pytest.raises(ValueError):
+        downsample(frame, ['a'], width=400, method='bogus')
+
+
+def test_downsampler_caches_zoom_ranges():
+    frame = _frame()
+    sampler = Downsampler(frame, ['a'], max_entries=2)
+    first = sampler.view('2020-01-10', '2020-01-20', width=200)
+    assert sampler.view('2020-01-10', '2020-01-20', width=200) is first
+    sampler.view(None, None, 200)
+    sampler.view('2020-01-01', '2020-01-02', 200)
+    assert sampler.view('2020-01-10', '2020-01-20', width=200) is not first
+
+
+def test_visualizer_cumulative_pnl_is_downsampled():
+    pnl = _frame()
+    view = PortfolioVisualizer(pnl).cumulative_pnl(width=200)
+    assert len(view) <= 204
+    assert np.isclose(view['a'].iloc[-1], pnl['a'].sum())